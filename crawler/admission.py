@@ -0,0 +1,82 @@
+"""
+팬아웃 엔드포인트 동시 실행 제한 (admission control / load shedding)
+
+엔드포인트마다 "업스트림 연결 단위" 용량을 두고, 요청은 자신의 팬아웃 비용(weight)만큼
+용량을 점유한 동안만 실행된다. 용량이 부족하면 제한된 대기열에서 잠시 기다리고,
+대기열이 가득 찼거나 대기 시간이 지나면 즉시 Saturated를 발생시킨다.
+(server.py에서 503 + Retry-After로 변환)
+
+  limiter = WeightedLimiter("daangn_multi_search", capacity=200)
+  with limiter.admit(weight=18):
+      ...  # 동 18개 병렬 검색
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Saturated(Exception):
+    """용량 초과로 요청을 거절할 때 발생. retry_after: 재시도 권장 초"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} 동시 실행 한도 초과")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class WeightedLimiter:
+    """가중치 기반 세마포어 + 제한된 대기열"""
+
+    def __init__(self, name: str, capacity: int, max_waiting: int = 20, wait_timeout: float = 2.0):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._in_use = 0
+        self._waiting = 0
+        self._avg_hold = 1.0  # 점유 시간 EWMA (초) — Retry-After 추정용
+        self._cond = threading.Condition()
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_hold))
+
+    @contextmanager
+    def admit(self, weight: int = 1):
+        """weight만큼 용량을 점유한 채 블록 실행. 점유 불가 시 Saturated"""
+        weight = max(1, min(weight, self.capacity))
+
+        with self._cond:
+            if self._in_use + weight > self.capacity:
+                if self._waiting >= self.max_waiting:
+                    raise Saturated(self.name, self._retry_after())
+                self._waiting += 1
+                try:
+                    admitted = self._cond.wait_for(
+                        lambda: self._in_use + weight <= self.capacity, timeout=self.wait_timeout
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    raise Saturated(self.name, self._retry_after())
+            self._in_use += weight
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - start
+            with self._cond:
+                self._in_use -= weight
+                self._avg_hold = 0.8 * self._avg_hold + 0.2 * held
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "avg_hold_seconds": round(self._avg_hold, 2),
+            }
@@ -0,0 +1,144 @@
+"""
+배치 키워드 검색 — 여러 {source, keyword, filters} 쿼리를 한 번에 병렬 실행
+
+백엔드가 사용자 저장 키워드를 재확인할 때 키워드마다 HTTP 요청을 보내는 대신,
+쿼리 목록을 한 번에 보내면 플랫폼별 동시 실행 한도 안에서 병렬로 검색한다.
+스크래퍼의 CRAWLER_DELAY 대기도 쿼리끼리 겹쳐서 진행되므로 직렬 합계만큼 걸리지 않는다.
+같은 (source, keyword, filters) 쿼리는 1번만 실행하고 결과를 공유한다.
+
+쿼리 형식:
+  {"id": "u12-k3", "source": "bunjang", "keyword": "닌텐도",
+   "filters": {"page": 1, "count": 20, "min_price": 10000, "max_price": 300000, "sort": "recent"}}
+
+  id는 선택 — 없으면 "{source}:{keyword}"(필터가 있으면 "{source}:{keyword}?{필터}")를 결과 키로 사용.
+  서로 다른 쿼리가 같은 키가 되면 400 (id를 지정해야 함)
+  daangn 필터: location_id, page, count
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+MAX_QUERIES = 200
+
+SOURCE_LIMITS = {
+    "bunjang": int(os.getenv("BATCH_BUNJANG_CONCURRENCY", "8")),
+    "joongna": int(os.getenv("BATCH_JOONGNA_CONCURRENCY", "4")),
+    "daangn": int(os.getenv("BATCH_DAANGN_CONCURRENCY", "8")),
+}
+
+_FILTER_KEYS = {
+    "bunjang": {"page", "count", "min_price", "max_price", "sort"},
+    "joongna": {"page", "count", "min_price", "max_price", "sort"},
+    "daangn": {"location_id", "page", "count"},
+}
+
+_semaphores = {source: threading.BoundedSemaphore(limit) for source, limit in SOURCE_LIMITS.items()}
+
+
+# ── 쿼리 검증 ─────────────────────────────────────────────────────────────────
+
+
+def _default_key(source: str, keyword: str, filters: dict) -> str:
+    """id가 없는 쿼리의 결과 키 — 필터가 다르면 키도 다르다"""
+    key = f"{source}:{keyword}"
+    if filters:
+        key += "?" + "&".join(f"{k}={filters[k]}" for k in sorted(filters))
+    return key
+
+
+def validate(queries) -> list[dict]:
+    """
+    요청 본문의 queries 검증 및 정규화.
+
+    Raises:
+        ValueError: 형식이 잘못되었을 때 (메시지는 그대로 사용자에게 반환)
+    """
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("queries는 비어 있지 않은 배열이어야 합니다.")
+    if len(queries) > MAX_QUERIES:
+        raise ValueError(f"queries는 최대 {MAX_QUERIES}개까지 요청할 수 있습니다.")
+
+    normalized = []
+    seen: dict[str, dict] = {}
+    for i, q in enumerate(queries):
+        if not isinstance(q, dict):
+            raise ValueError(f"queries[{i}]는 객체여야 합니다.")
+        source = str(q.get("source", "")).strip()
+        keyword = str(q.get("keyword", "")).strip()
+        if source not in SOURCE_LIMITS:
+            raise ValueError(f"queries[{i}].source는 {sorted(SOURCE_LIMITS)} 중 하나여야 합니다.")
+        if not keyword:
+            raise ValueError(f"queries[{i}].keyword가 필요합니다.")
+
+        filters = q.get("filters") or {}
+        if not isinstance(filters, dict):
+            raise ValueError(f"queries[{i}].filters는 객체여야 합니다.")
+        unknown = set(filters) - _FILTER_KEYS[source]
+        if unknown:
+            raise ValueError(f"queries[{i}].filters에 지원하지 않는 항목이 있습니다: {sorted(unknown)}")
+
+        try:
+            filters = {k: (str(v) if k == "sort" else int(v)) for k, v in filters.items() if v is not None}
+        except (TypeError, ValueError):
+            raise ValueError(f"queries[{i}].filters의 숫자 항목이 올바르지 않습니다.")
+
+        key = str(q.get("id") or _default_key(source, keyword, filters))
+        query = {"key": key, "source": source, "keyword": keyword, "filters": filters}
+        previous = seen.setdefault(key, query)
+        if (previous["source"], previous["keyword"], previous["filters"]) != (source, keyword, filters):
+            raise ValueError(f"queries[{i}]의 결과 키 '{key}'가 다른 쿼리와 겹칩니다. 쿼리마다 다른 id를 지정하세요.")
+        normalized.append(query)
+    return normalized
+
+
+# ── 실행 ──────────────────────────────────────────────────────────────────────
+
+
+def _run_one(source: str, keyword: str, filters: dict) -> dict:
+    """플랫폼 동시 실행 한도 안에서 단일 검색 실행"""
+    if source == "bunjang":
+        from scrapers.bunjang_scraper import search
+    elif source == "joongna":
+        from scrapers.joongna_scraper import search
+    else:
+        from scrapers.daangn_scraper import search
+
+    with _semaphores[source]:
+        try:
+            result = search(keyword=keyword, **filters)
+        except Exception as e:
+            logger.error("[batch_search] %s 검색 실패 (keyword=%s): %s", source, keyword, e)
+            return {"ok": False, "error": "검색에 실패했습니다.", "items": [], "total": 0}
+    return {"ok": True, "items": result["items"], "total": result["total"]}
+
+
+def run_batch(queries: list[dict]) -> dict[str, dict]:
+    """
+    validate()로 정규화된 쿼리 목록을 병렬 실행.
+
+    Returns: {쿼리 key: {"ok", "source", "keyword", "items", "total"}}
+    """
+    unique: dict[str, tuple] = {}
+    for q in queries:
+        sig = json.dumps([q["source"], q["keyword"], q["filters"]], sort_keys=True, ensure_ascii=False)
+        unique.setdefault(sig, (q["source"], q["keyword"], q["filters"]))
+
+    workers = min(len(unique), sum(SOURCE_LIMITS.values()))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-search") as pool:
+        futures = {sig: pool.submit(_run_one, *args) for sig, args in unique.items()}
+        outcomes = {sig: f.result() for sig, f in futures.items()}
+
+    results = {}
+    for q in queries:
+        sig = json.dumps([q["source"], q["keyword"], q["filters"]], sort_keys=True, ensure_ascii=False)
+        results[q["key"]] = {"source": q["source"], "keyword": q["keyword"], **outcomes[sig]}
+
+    logger.info("[batch_search] 쿼리 %d개 (고유 %d개) 완료", len(queries), len(unique))
+    return results
@@ -0,0 +1,254 @@
+"""
+수집 워커 — API 서버와 분리된 스케줄러 전용 프로세스
+
+  python collector.py
+
+전국 매물 수집의 JSON 디코딩 / seen_ids 비교는 CPU를 많이 쓰므로, API 서버와 같은 프로세스에서
+돌리면 요청 처리 스레드와 GIL을 다툰다. API 서버를 CRAWLER_RUN_SCHEDULERS=false로 실행하면
+수집 부하 없이 요청만 처리하고, 수집은 이 워커가 맡는다. 두 쪽을 따로 확장할 수 있다
+(워커 여러 개 → 리더 선출 / DAANGN_LISTING_SHARDS shard lease로 중복 없이 분담).
+
+스케줄러 시작/종료 코드는 server.py와 공유한다 (start_schedulers / stop_schedulers).
+시작은 Redis 연결을 기다리지 않으며, 최초 지역 수집은 백그라운드 스레드에서 실행한다.
+
+종료: SIGTERM/SIGINT → 새 job 중단, 진행 중인 수집이 끝날 때까지 기다린 뒤
+      shard lease / 리더 lease / heartbeat 키를 반납한다.
+
+Redis 키:
+  crawler:collectors           — 살아있는 워커 (ZSET, member=workerId, score=마지막 heartbeat epoch)
+  crawler:collector:{workerId} — 워커 상태 (JSON, TTL HEARTBEAT_TTL초, HEARTBEAT_INTERVAL초마다 갱신)
+"""
+
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import leader  # noqa: E402 — .env 로드 후 import (REDIS_URL 등)
+import lease  # noqa: E402
+import redis_conn  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+WORKERS_KEY = "crawler:collectors"
+HEARTBEAT_PREFIX = "crawler:collector:"
+HEARTBEAT_INTERVAL = 10
+HEARTBEAT_TTL = 30
+
+
+# ── 스케줄러 시작 / 종료 (server.py와 공유) ───────────────────────────────────
+
+_elector = None
+_schedulers: list = []
+_initial_collect = "pending"  # pending | running | done | skipped | failed
+
+
+def _initial_region_collect(elector):
+    """
+    백그라운드 최초 지역 수집 — Redis 연결을 기다린 뒤, 리더이고 지역 데이터가 없을 때만 수집.
+    수 분 걸릴 수 있으므로 시작 경로(API 수신 시작, heartbeat)를 막지 않게 별도 스레드에서 실행한다.
+    """
+    global _initial_collect
+    from region_scheduler import collect_all_regions
+
+    while not redis_conn.check():
+        time.sleep(redis_conn.MONITOR_INTERVAL)
+    # 첫 lease 갱신 주기까지 기다려 리더 여부를 확정
+    time.sleep(leader.RENEW_INTERVAL)
+
+    if not elector.is_leader or redis_conn.client().exists("daangn:regions:all"):
+        _initial_collect = "skipped"
+        return
+    _initial_collect = "running"
+    logger.info("Redis에 지역 데이터 없음 — 최초 수집 시작 (백그라운드)")
+    try:
+        collect_all_regions(fence_token=elector.token)
+        _initial_collect = "done"
+    except Exception as e:
+        _initial_collect = "failed"
+        logger.warning("최초 지역 수집 실패: %s", e)
+
+
+def start_schedulers():
+    """
+    리더 선출 + 지역/매물/최신 매물 스케줄러 시작. Redis 연결을 기다리지 않는다.
+
+    리더 선출은 Redis가 뜨면 백그라운드 갱신 스레드에서 자동으로 이루어지고,
+    Redis에 지역 데이터가 없으면 리더가 백그라운드에서 1회 수집한다.
+    지역 스케줄러 쪽이 실패해도 매물 스케줄러는 시작한다.
+
+    Returns: (LeaderElector 또는 None, 시작된 스케줄러 목록)
+    """
+    global _elector
+
+    try:
+        from region_scheduler import create_region_scheduler
+
+        _elector = leader.LeaderElector(redis_conn.client())
+        _elector.start()
+        logger.info("리더 선출 시작 (owner=%s, 리더=%s)", _elector.owner, _elector.is_leader)
+
+        region_scheduler = create_region_scheduler(_elector)
+        region_scheduler.start()
+        _schedulers.append(region_scheduler)
+        logger.info("당근 지역 스케줄러 시작 (매일 04:00 실행)")
+
+        threading.Thread(
+            target=_initial_region_collect, args=(_elector,), name="initial-region-collect", daemon=True
+        ).start()
+    except Exception as e:
+        logger.warning("당근 지역 스케줄러 시작 실패: %s", e)
+
+    # 당근 매물 수집 스케줄러 시작 (매분 정각 실행)
+    try:
+        from listing_scheduler import create_listing_scheduler
+
+        listing_scheduler = create_listing_scheduler(_elector)
+        listing_scheduler.start()
+        _schedulers.append(listing_scheduler)
+        logger.info("당근 매물 수집 스케줄러 시작 (매분 정각 실행)")
+    except Exception as e:
+        logger.warning("당근 매물 수집 스케줄러 시작 실패: %s", e)
+
+    # 번개장터/중고나라 최신 매물 수집 스케줄러 시작 (매분 30초 실행)
+    try:
+        from recent_poller import create_recent_scheduler
+
+        recent_scheduler = create_recent_scheduler(_elector)
+        recent_scheduler.start()
+        _schedulers.append(recent_scheduler)
+        logger.info("번개장터/중고나라 최신 매물 수집 스케줄러 시작 (매분 30초 실행)")
+    except Exception as e:
+        logger.warning("번개장터/중고나라 최신 매물 수집 스케줄러 시작 실패: %s", e)
+
+    return _elector, list(_schedulers)
+
+
+def start_in_background() -> threading.Thread:
+    """start_schedulers()를 백그라운드 스레드에서 실행 (API 서버가 즉시 요청을 받도록)"""
+    thread = threading.Thread(target=start_schedulers, name="scheduler-startup", daemon=True)
+    thread.start()
+    return thread
+
+
+def stop_schedulers(wait: bool = True):
+    """
+    시작된 스케줄러 종료 + shard lease / 리더 lease 반납.
+
+    wait=True면 진행 중인 job(수집)이 끝날 때까지 기다린다.
+    """
+    for scheduler in _schedulers:
+        try:
+            scheduler.shutdown(wait=wait)
+        except Exception as e:
+            logger.warning("스케줄러 종료 실패: %s", e)
+
+    if _schedulers:
+        try:
+            from listing_scheduler import release_shards
+
+            release_shards()
+        except Exception as e:
+            logger.warning("shard lease 반납 실패: %s", e)
+
+    if _elector is not None:
+        _elector.stop()
+
+
+def status() -> dict:
+    """이 프로세스의 스케줄러 상태 (/health용 — Redis 호출 없음)"""
+    return {
+        "running": [
+            {"id": job.id, "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None}
+            for scheduler in _schedulers
+            if scheduler.running
+            for job in scheduler.get_jobs()
+        ],
+        "is_leader": bool(_elector and _elector.is_leader),
+        "initial_region_collect": _initial_collect,
+    }
+
+
+def heartbeats(r) -> list[dict]:
+    """살아있는 수집 워커(collector.py) heartbeat 목록 (ZRANGEBYSCORE + MGET — 키 공간 스캔 없음)"""
+    workers = r.zrangebyscore(WORKERS_KEY, time.time() - HEARTBEAT_TTL, "+inf")
+    if not workers:
+        return []
+    return [json.loads(raw) for raw in r.mget([f"{HEARTBEAT_PREFIX}{w}" for w in workers]) if raw]
+
+
+# ── heartbeat ─────────────────────────────────────────────────────────────────
+
+
+def _heartbeat(worker: str, started_at: float):
+    """워커 상태를 heartbeat 키에 기록 + 워커 ZSET 갱신 (TTL 안에 갱신되지 않으면 죽은 워커)"""
+    now = time.time()
+    payload = {
+        "worker_id": worker,
+        "started_at": round(started_at, 3),
+        "heartbeat_at": round(now, 3),
+        **status(),
+    }
+    try:
+        pipe = redis_conn.client().pipeline(transaction=False)
+        pipe.set(f"{HEARTBEAT_PREFIX}{worker}", json.dumps(payload, ensure_ascii=False), ex=HEARTBEAT_TTL)
+        pipe.zadd(WORKERS_KEY, {worker: now})
+        pipe.zremrangebyscore(WORKERS_KEY, "-inf", now - HEARTBEAT_TTL)  # 종료 처리 없이 죽은 워커 정리
+        pipe.execute()
+    except Exception as e:
+        logger.warning("[collector] heartbeat 기록 실패: %s", e)
+
+
+# ── 직접 실행 ─────────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+
+    # 메모리 계측 (MEMORY_PROFILE=1일 때만 tracemalloc 추적)
+    import memory_profile
+    memory_profile.start()
+
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame):
+        logger.info("[collector] 종료 신호 수신 (%s) — 진행 중인 수집 완료 후 종료", signal.Signals(signum).name)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+
+    started_at = time.time()
+    worker = lease.worker_id()
+    _, schedulers = start_schedulers()
+    logger.info("[collector] 수집 워커 시작 (worker=%s, 스케줄러 %d개)", worker, len(schedulers))
+
+    while not stop.is_set():
+        _heartbeat(worker, started_at)
+        stop.wait(HEARTBEAT_INTERVAL)
+
+    stop_schedulers(wait=True)
+    try:
+        pipe = redis_conn.client().pipeline(transaction=False)
+        pipe.delete(f"{HEARTBEAT_PREFIX}{worker}")
+        pipe.zrem(WORKERS_KEY, worker)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("[collector] heartbeat 키 삭제 실패: %s", e)
+    logger.info("[collector] 수집 워커 종료")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+구/군별 응답 지연 통계 — 매물 수집 timeout / 재시도 순서 자동 조정
+
+구/군마다 최근 SAMPLE_MAX회의 응답 시간(ms)과 실패를 Redis LIST에 기록하고,
+다음 수집 때 그 p95로 요청 timeout을 정한다.
+
+timeout으로 끊긴 요청은 "적어도 timeout만큼 걸림"인 censored 표본(x{ms})으로 기록해 p95에 포함한다.
+성공 표본만 보면 timeout이 잦은 구/군의 p95가 실제보다 작게 잡혀 timeout이 계속 짧게 유지되므로,
+timeout이 반복되면 p95가 그 timeout까지 올라가 다음 timeout이 (TIMEOUT_FACTOR배로) 늘어난다.
+
+  timeout = clamp(p95 × TIMEOUT_FACTOR + TIMEOUT_PADDING, MIN_TIMEOUT, MAX_TIMEOUT)
+
+  - 200ms에 응답하는 구/군은 짧은 timeout → 멈춘 요청이 배치 전체를 붙잡지 않음
+  - 큰 구/군은 p95에 맞춘 긴 timeout → 매번 재시도 라운드로 밀리지 않음
+  - 표본이 MIN_SAMPLES 미만이면 DEFAULT_TIMEOUT
+
+재시도 라운드는 p95가 짧은 구/군부터 요청하여, 데드라인 안에 끝낼 수 있는 구/군을 먼저 처리한다.
+
+Redis 키:
+  daangn:listing:latency:{regionId} — 최근 응답 기록 (LIST, 최신이 앞, TTL 7일)
+                                      "ms" 성공 / "x{ms}" timeout (ms = 사용한 timeout) / "x" 그 밖의 실패
+"""
+
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+KEY_PREFIX = "daangn:listing:latency:"
+SAMPLE_MAX = 50
+TTL = 86400 * 7
+FAILURE = "x"
+
+MIN_SAMPLES = 5
+DEFAULT_TIMEOUT = 3.0
+MIN_TIMEOUT = 0.5
+MAX_TIMEOUT = 8.0
+TIMEOUT_FACTOR = 2.0
+TIMEOUT_PADDING = 0.2
+
+
+# ── 통계 ──────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class DistrictLatency:
+    """단일 구/군의 최근 응답 통계"""
+
+    samples: int
+    p95: float | None  # 초 (timeout 표본 포함). 시간 표본이 없으면 None
+    failure_rate: float
+
+    @property
+    def timeout(self) -> float:
+        if self.samples < MIN_SAMPLES or self.p95 is None:
+            return DEFAULT_TIMEOUT
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, self.p95 * TIMEOUT_FACTOR + TIMEOUT_PADDING))
+
+    @property
+    def priority(self) -> float:
+        """재시도 순서 (작을수록 먼저) — 예상 소요 시간"""
+        return self.p95 if self.p95 is not None else DEFAULT_TIMEOUT
+
+
+_UNKNOWN = DistrictLatency(samples=0, p95=None, failure_rate=0.0)
+
+
+def _summarize(raw: list[str]) -> DistrictLatency:
+    if not raw:
+        return _UNKNOWN
+    latencies = []
+    failures = 0
+    for v in raw:
+        if v.startswith(FAILURE):
+            failures += 1
+            if len(v) > len(FAILURE):
+                latencies.append(int(v[len(FAILURE):]))  # timeout (censored) — 적어도 이만큼 걸림
+        else:
+            latencies.append(int(v))
+    latencies.sort()
+    p95 = None
+    if latencies:
+        rank = max(1, -(-len(latencies) * 95 // 100))
+        p95 = latencies[rank - 1] / 1000
+    return DistrictLatency(samples=len(raw), p95=p95, failure_rate=round(failures / len(raw), 3))
+
+
+async def load(ar, region_ids: list[int]) -> dict[int, DistrictLatency]:
+    """
+    구/군별 통계 일괄 조회 (pipeline 1회, 비동기 클라이언트 — 수집 이벤트 루프 안에서 사용).
+    Redis 오류 시 빈 dict (기본 timeout 사용)
+    """
+    if ar is None or not region_ids:
+        return {}
+    try:
+        pipe = ar.pipeline(transaction=False)
+        for rid in region_ids:
+            pipe.lrange(f"{KEY_PREFIX}{rid}", 0, SAMPLE_MAX - 1)
+        rows = await pipe.execute()
+    except Exception as e:
+        logger.warning("[district_latency] 통계 조회 실패 (기본 timeout 사용): %s", e)
+        return {}
+    return {rid: _summarize(raw) for rid, raw in zip(region_ids, rows)}
+
+
+def get(stats: dict[int, DistrictLatency], region_id: int) -> DistrictLatency:
+    return stats.get(region_id, _UNKNOWN)
+
+
+async def record(ar, samples: list[tuple[int, float | None, bool]]):
+    """
+    이번 수집의 응답 기록 추가 (pipeline 1회, 비동기 클라이언트).
+
+    samples: [(regionId, 걸린 시간(초) 또는 None, 성공 여부)] — 재시도도 각각 기록.
+             실패인데 시간이 있으면 timeout으로 끊긴 요청 (censored 표본)
+    """
+    if ar is None or not samples:
+        return
+    try:
+        pipe = ar.pipeline(transaction=False)
+        for rid, elapsed, ok in samples:
+            key = f"{KEY_PREFIX}{rid}"
+            if ok:
+                pipe.lpush(key, int(elapsed * 1000))
+            else:
+                pipe.lpush(key, FAILURE if elapsed is None else f"{FAILURE}{int(elapsed * 1000)}")
+        for rid in {rid for rid, _, _ in samples}:
+            key = f"{KEY_PREFIX}{rid}"
+            pipe.ltrim(key, 0, SAMPLE_MAX - 1)
+            pipe.expire(key, TTL)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning("[district_latency] 통계 기록 실패: %s", e)
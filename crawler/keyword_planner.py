@@ -0,0 +1,190 @@
+"""
+당근 키워드 우선 수집 플래너 — 전국 스윕 vs 키워드별 전국 검색
+
+전국 스윕은 279개 구/군의 최신 매물을 매분 모두 받아 그중 키워드에 맞는 몇 건을 찾는다.
+구독 키워드가 적으면 키워드마다 전국 키워드 검색(_data loader, search=키워드, in 없음)으로
+관련 매물만 받는 편이 요청 수가 훨씬 적다. 플래너는 매분 두 방식의 요청 수를 추정해 더 싼 쪽을 고른다.
+
+비용 모델 (분당 업스트림 요청 수):
+  스윕  S   = 직전 스윕의 전체 구/군 수 + 추가 페이지 수 (한 번에 모든 키워드를 커버)
+  타겟  T_k = max(1, ceil(매칭 수_k × SAFETY / PAGE_SIZE))
+  매칭 수_k = 키워드 k의 분당 새 매물 수 (EWMA). 스윕 모드에서는 스윕의 1분 이내 새 매물 중 매칭 수,
+             타겟 모드에서는 타겟 검색이 감지한 1분 이내 새 매물 수로 갱신한다 (두 모드 모두 같은 기준).
+
+결정 (키워드별 사유는 플랜에 기록):
+  - 구독자가 MIN_SUBSCRIBERS명 미만인 키워드는 알림 대상이 아니므로 제외 (ignored)
+  - 매칭 수를 아직 모르거나(unmeasured) T_k > MAX_PAGES(타겟 검색이 놓침 없이 따라갈 수 없음, too_busy)인
+    키워드가 있으면 스윕이 매분 돌아야 한다. 스윕 1번이 모든 키워드를 커버하므로 이때 일부 키워드만
+    타겟으로 빼면 요청만 늘어난다 → 전부 스윕
+  - 아니면 ΣT_k + S / SWEEP_RELAXED_MINUTES 가 S보다 싸면 타겟 모드 (전환은 S × SWITCH_RATIO 이하일 때만 —
+    경계에서 모드가 매분 뒤집히지 않도록). 타겟 모드의 스윕은 SWEEP_RELAXED_MINUTES분마다만 실행되어
+    색인/시세/seen_ids를 유지한다 (적응형 페이지로 그 사이 올라온 매물도 따라잡음)
+
+Redis 키:
+  daangn:keywords:subscribers    — 키워드별 구독자 수 (Hash, 백엔드가 PUT /api/daangn/keywords/subscribers로 동기화)
+  daangn:plan:match_rate         — 키워드별 분당 새 매물 매칭 수 (Hash, EWMA)
+  daangn:plan:current            — 최근 플랜 (JSON)
+  daangn:targeted:seen:{keyword} — 타겟 검색 커서 (seen_store, TTL 24h)
+  daangn:targeted:last_run       — 최근 타겟 검색 상태 요약
+"""
+
+import json
+import logging
+import math
+import os
+import time
+
+from listing_index import normalize
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+SUBSCRIBERS_KEY = "daangn:keywords:subscribers"
+MATCH_RATE_KEY = "daangn:plan:match_rate"
+PLAN_KEY = "daangn:plan:current"
+TARGETED_SEEN_PREFIX = "daangn:targeted:seen:"
+TARGETED_LAST_RUN_KEY = "daangn:targeted:last_run"
+
+MIN_SUBSCRIBERS = int(os.getenv("DAANGN_PLAN_MIN_SUBSCRIBERS", "1"))
+SWEEP_RELAXED_MINUTES = int(os.getenv("DAANGN_PLAN_SWEEP_RELAXED_MINUTES", "5"))
+MAX_PAGES = int(os.getenv("DAANGN_TARGETED_MAX_PAGES", "3"))  # 타겟 검색 키워드당 최대 페이지 (적응형)
+PAGE_SIZE = 300  # _data loader 1페이지 최대 매물 수
+SAFETY = 2.0  # 매칭 수 추정 여유 (분당 변동)
+SWITCH_RATIO = 0.8
+PLAN_STALE_SECONDS = 180  # 플랜 갱신이 멈추면(리더 교체 등) 플랜을 무시하고 매분 스윕
+EWMA_ALPHA = 0.3
+
+MODE_SWEEP = "sweep"
+MODE_TARGETED = "targeted"
+
+
+def seen_key(keyword: str) -> str:
+    return f"{TARGETED_SEEN_PREFIX}{keyword}"
+
+
+# ── 구독자 / 매칭 수 ──────────────────────────────────────────────────────────
+
+
+def subscribers(r) -> dict[str, int]:
+    return {k: int(v) for k, v in r.hgetall(SUBSCRIBERS_KEY).items()}
+
+
+def set_subscribers(r, counts: dict[str, int]) -> dict[str, int]:
+    """키워드별 구독자 수를 통째로 교체 (구독자 0명 키워드는 삭제). 정규화된 목록 반환"""
+    normalized: dict[str, int] = {}
+    for keyword, count in counts.items():
+        keyword = normalize(keyword)
+        if keyword and count > 0:
+            normalized[keyword] = normalized.get(keyword, 0) + count
+    pipe = r.pipeline()
+    pipe.delete(SUBSCRIBERS_KEY)
+    if normalized:
+        pipe.hset(SUBSCRIBERS_KEY, mapping=normalized)
+    pipe.execute()
+    return normalized
+
+
+def record_matches(r, observed: dict[str, float]):
+    """키워드별 분당 새 매물 매칭 수 관측값을 EWMA로 반영"""
+    if not observed:
+        return
+    keywords = list(observed)
+    previous = r.hmget(MATCH_RATE_KEY, keywords)
+    rates = {
+        k: observed[k] if prev is None else EWMA_ALPHA * observed[k] + (1 - EWMA_ALPHA) * float(prev)
+        for k, prev in zip(keywords, previous)
+    }
+    r.hset(MATCH_RATE_KEY, mapping={k: round(v, 3) for k, v in rates.items()})
+
+
+# ── 플랜 ──────────────────────────────────────────────────────────────────────
+
+
+def _targeted_pages(rate: float) -> int:
+    return max(1, math.ceil(rate * SAFETY / PAGE_SIZE))
+
+
+def make_plan(r, sweep_cost: int | None) -> dict:
+    """
+    구독자 수 / 매칭 수 / 스윕 비용으로 이번 분의 수집 플랜을 정하고 저장.
+
+    Args:
+        sweep_cost: 직전 스윕의 요청 수 (전체 구/군 + 추가 페이지). 스윕 기록이 없으면 None → 스윕 모드
+
+    Returns:
+        {"mode", "sweep_cost", "targeted_cost", "computed_at",
+         "keywords": {keyword: {"subscribers", "match_rate", "pages", "mode", "reason"}}}
+    """
+    previous = current(r)
+    counts = subscribers(r)
+    alert_keywords = sorted(k for k, n in counts.items() if n >= MIN_SUBSCRIBERS)
+    rates = dict(zip(alert_keywords, r.hmget(MATCH_RATE_KEY, alert_keywords))) if alert_keywords else {}
+
+    keywords: dict[str, dict] = {}
+    blocked = False
+    for k, n in sorted(counts.items()):
+        rate = rates.get(k)
+        entry = {"subscribers": n, "match_rate": None if rate is None else float(rate), "pages": None}
+        if n < MIN_SUBSCRIBERS:
+            entry["reason"] = "ignored"
+        elif rate is None:
+            entry["reason"] = "unmeasured"
+        else:
+            entry["pages"] = _targeted_pages(float(rate))
+            entry["reason"] = "too_busy" if entry["pages"] > MAX_PAGES else "eligible"
+        blocked = blocked or entry["reason"] in ("unmeasured", "too_busy")
+        keywords[k] = entry
+
+    targeted_cost = sum(e["pages"] for e in keywords.values() if e["reason"] == "eligible")
+    mode = MODE_SWEEP
+    if alert_keywords and sweep_cost and not blocked:
+        relaxed_cost = targeted_cost + sweep_cost / SWEEP_RELAXED_MINUTES
+        threshold = sweep_cost if previous and previous["mode"] == MODE_TARGETED else sweep_cost * SWITCH_RATIO
+        mode = MODE_TARGETED if relaxed_cost <= threshold else MODE_SWEEP
+
+    for entry in keywords.values():
+        if entry["reason"] == "ignored":
+            entry["mode"] = None
+        else:
+            entry["mode"] = mode
+            if entry["reason"] == "eligible" and mode == MODE_SWEEP:
+                entry["reason"] = "sweep_cheaper" if not blocked else "sweep_required"
+
+    plan = {
+        "mode": mode,
+        "sweep_cost": sweep_cost,
+        "targeted_cost": targeted_cost,
+        "computed_at": round(time.time(), 3),
+        "keywords": keywords,
+    }
+    if not previous or previous["mode"] != mode:
+        logger.info(
+            "[keyword_planner] 수집 모드: %s (키워드 %d개, 스윕 %s요청/분, 타겟 %d요청/분)",
+            mode, len(alert_keywords), sweep_cost, targeted_cost,
+        )
+    r.set(PLAN_KEY, json.dumps(plan, ensure_ascii=False))
+    return plan
+
+
+def current(r) -> dict | None:
+    raw = r.get(PLAN_KEY)
+    return json.loads(raw) if raw else None
+
+
+def keywords_in(plan: dict | None, mode: str) -> list[str]:
+    """플랜에서 mode로 커버되는 알림 키워드 (플랜이 없으면 빈 목록)"""
+    if not plan:
+        return []
+    return [k for k, e in plan["keywords"].items() if e["mode"] == mode]
+
+
+def sweep_due(plan: dict | None, last_sweep_at: float | None, now: float | None = None) -> bool:
+    """스케줄된 스윕을 이번 분에 실행할지 — 타겟 모드에서는 SWEEP_RELAXED_MINUTES분마다만"""
+    now = time.time() if now is None else now
+    if not plan or plan["mode"] != MODE_TARGETED or last_sweep_at is None:
+        return True
+    if now - plan["computed_at"] > PLAN_STALE_SECONDS:
+        return True
+    # 정각 tick 지터를 감안해 30초 여유
+    return now - last_sweep_at >= SWEEP_RELAXED_MINUTES * 60 - 30
@@ -0,0 +1,154 @@
+"""
+Redis 기반 리더 선출 (스케줄러 단일 실행 보장)
+
+API 서버를 여러 개 띄워도 스케줄 job(지역 수집, 매물 수집)은 리더 1개 프로세스에서만 실행된다.
+APScheduler의 max_instances=1은 프로세스 내부 중복만 막으므로, 프로세스 간에는 이 모듈을 사용한다.
+
+동작:
+  - 모든 인스턴스가 RENEW_INTERVAL(2초)마다 리더 lease 획득/갱신을 시도
+  - 리더가 죽으면 LEADER_TTL(10초) 이내에 다른 인스턴스가 리더가 됨
+  - 리더가 바뀔 때마다 fencing token을 1 증가시킨다.
+    job은 획득 시점의 token을 받아, Redis에 쓰기 전에 token이 여전히 최신인지 확인한다.
+    (GC 정지·네트워크 단절로 lease를 잃은 옛 리더의 늦은 쓰기를 차단)
+
+Redis 키:
+  crawler:leader        — 현재 리더 워커 ID (TTL 10s)
+  crawler:leader:fence  — fencing token (리더 교체 시 INCR)
+"""
+
+import functools
+import logging
+import threading
+
+import lease
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+LEADER_KEY = "crawler:leader"
+FENCE_KEY = "crawler:leader:fence"
+LEADER_TTL = 10
+RENEW_INTERVAL = 2
+
+# lease 획득과 fencing token 증가를 원자적으로 수행
+_ACQUIRE_LUA = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+
+# ── fencing ───────────────────────────────────────────────────────────────────
+
+
+def is_fence_current(r, token: int) -> bool:
+    """token이 현재 리더의 fencing token과 같은지 확인 (다르면 리더 권한 상실)"""
+    try:
+        return r.get(FENCE_KEY) == str(token)
+    except Exception as e:
+        logger.warning("[leader] fencing token 확인 실패: %s", e)
+        return False
+
+
+async def is_fence_current_async(r, token: int) -> bool:
+    """is_fence_current()의 비동기 버전 (redis.asyncio 클라이언트용)"""
+    try:
+        return await r.get(FENCE_KEY) == str(token)
+    except Exception as e:
+        logger.warning("[leader] fencing token 확인 실패: %s", e)
+        return False
+
+
+# ── 리더 선출 ─────────────────────────────────────────────────────────────────
+
+
+class LeaderElector:
+    """
+    백그라운드 스레드에서 리더 lease를 주기적으로 획득/갱신한다.
+
+    사용 예:
+        elector = LeaderElector(r)
+        elector.start()
+        scheduler.add_job(elector.guard(collect_listings), ...)
+    """
+
+    def __init__(self, r, owner: str | None = None):
+        self._redis = r
+        self.owner = owner or lease.worker_id()
+        self._token: int | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        with self._lock:
+            return self._token is not None
+
+    @property
+    def token(self) -> int | None:
+        """리더일 때 fencing token, 아니면 None"""
+        with self._lock:
+            return self._token
+
+    def _tick(self):
+        """lease 1회 획득/갱신 시도"""
+        try:
+            if self._token is not None:
+                if lease.renew(self._redis, LEADER_KEY, self.owner, LEADER_TTL):
+                    return
+                logger.warning("[leader] 리더 lease 상실 (owner=%s)", self.owner)
+                with self._lock:
+                    self._token = None
+
+            token = int(self._redis.eval(_ACQUIRE_LUA, 2, LEADER_KEY, FENCE_KEY, self.owner, LEADER_TTL))
+            if token:
+                with self._lock:
+                    self._token = token
+                logger.info("[leader] 리더 선출됨 (owner=%s, token=%d)", self.owner, token)
+        except Exception as e:
+            # Redis 장애 시 리더 권한을 유지한다고 가정하지 않는다
+            with self._lock:
+                if self._token is not None:
+                    logger.warning("[leader] Redis 오류로 리더 권한 해제: %s", e)
+                self._token = None
+
+    def _run(self):
+        while not self._stop.wait(RENEW_INTERVAL):
+            self._tick()
+
+    def start(self):
+        """최초 1회 즉시 시도 후 백그라운드 갱신 스레드 시작"""
+        self._tick()
+        self._thread = threading.Thread(target=self._run, name="leader-elector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """갱신 중단 + 보유 lease 즉시 반납 (다른 인스턴스가 바로 리더가 됨)"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=RENEW_INTERVAL + 1)
+        with self._lock:
+            was_leader = self._token is not None
+            self._token = None
+        if was_leader:
+            try:
+                lease.release(self._redis, LEADER_KEY, self.owner)
+                logger.info("[leader] 리더 lease 반납 (owner=%s)", self.owner)
+            except Exception as e:
+                logger.warning("[leader] 리더 lease 반납 실패: %s", e)
+
+    def guard(self, func):
+        """리더일 때만 func을 실행하고 fence_token을 전달하는 job 래퍼"""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = self.token
+            if token is None:
+                logger.debug("[leader] 리더 아님 — %s 건너뜀", func.__name__)
+                return None
+            return func(*args, fence_token=token, **kwargs)
+
+        return wrapper
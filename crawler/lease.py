@@ -0,0 +1,56 @@
+"""
+Redis 기반 분산 lease 유틸리티
+
+여러 프로세스/노드가 같은 자원을 동시에 처리하지 않도록 Redis 키에 소유자 ID를 기록한다.
+lease는 TTL로 만료되므로 소유자 프로세스가 죽으면 다른 워커가 자동으로 회수할 수 있다.
+
+  acquire(r, key, owner, ttl) — 비어 있을 때만 획득 (SET NX EX)
+  renew(r, key, owner, ttl)   — 본인 소유일 때만 TTL 연장
+  release(r, key, owner)      — 본인 소유일 때만 해제
+
+renew/release는 Lua 스크립트로 "소유자 확인 + 변경"을 원자적으로 수행한다.
+"""
+
+import os
+import socket
+
+# ── Lua 스크립트 ──────────────────────────────────────────────────────────────
+
+_RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# ── lease 함수 ────────────────────────────────────────────────────────────────
+
+
+def worker_id() -> str:
+    """현재 프로세스의 고유 워커 ID (호스트명:PID)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire(r, key: str, owner: str, ttl: int) -> bool:
+    """lease가 비어 있으면 owner로 획득. 이미 owner 소유면 TTL만 연장."""
+    if r.set(key, owner, nx=True, ex=ttl):
+        return True
+    return renew(r, key, owner, ttl)
+
+
+def renew(r, key: str, owner: str, ttl: int) -> bool:
+    """owner가 보유 중인 lease의 TTL 연장. 소유자가 다르면 False."""
+    return bool(r.eval(_RENEW_LUA, 1, key, owner, ttl))
+
+
+def release(r, key: str, owner: str) -> bool:
+    """owner가 보유 중인 lease 해제. 소유자가 다르면 아무것도 하지 않음."""
+    return bool(r.eval(_RELEASE_LUA, 1, key, owner))
@@ -0,0 +1,150 @@
+"""
+당근 수집 매물 로컬 전문 검색 인덱스 (Redis 역색인)
+
+매분 전국 매물 수집(listing_scheduler)이 감지한 새 매물을 구/군별 역색인에 추가하고,
+키워드 + 구/군 검색을 업스트림 요청 없이 Redis에서 바로 응답한다.
+
+토큰화 (한국어 대응):
+  - 한글 단어: 2글자 단위 n-gram (예: "닌텐도" → "닌텐", "텐도") — 조사/복합어가 붙어도 부분 일치
+  - 영문/숫자 단어: 소문자 단어 그대로 (예: "PS5" → "ps5")
+  - 1글자 한글 단어는 색인하지 않는다 (검색어도 2글자 이상이어야 함)
+  n-gram 교집합으로 후보를 찾은 뒤, 검색어의 각 단어가 본문에 실제로 포함된 매물만 반환한다.
+
+보존 한도:
+  - 나이: createdAt 기준 MAX_AGE_SECONDS 이내 매물만 색인 (문서/포스팅 키 TTL 동일)
+  - 크기: 구/군 × 토큰 포스팅은 최신 MAX_POSTING개까지만 유지
+
+Redis 키:
+  daangn:index:doc:{productId}          — 표준 스키마 아이템 + 검색용 본문 (JSON, TTL = MAX_AGE_SECONDS)
+  daangn:index:tok:{regionId}:{token}   — 포스팅 (ZSET, member=productId, score=createdAt epoch)
+"""
+
+import json
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+DOC_PREFIX = "daangn:index:doc:"
+TOKEN_PREFIX = "daangn:index:tok:"
+
+MAX_AGE_SECONDS = int(os.getenv("DAANGN_INDEX_MAX_AGE_HOURS", "24")) * 3600
+MAX_POSTING = int(os.getenv("DAANGN_INDEX_MAX_POSTING", "2000"))
+CONTENT_CHARS = 100  # 본문은 앞부분만 색인 (문서당 토큰 수 제한)
+MAX_CANDIDATES = 500
+
+_WORD_RE = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+# ── 토큰화 ────────────────────────────────────────────────────────────────────
+
+
+def normalize(text: str) -> str:
+    """검색/색인 공통 정규화 (소문자, 공백 정리)"""
+    return " ".join(text.lower().split())
+
+
+def tokenize(text: str) -> set[str]:
+    """정규화된 텍스트 → 색인 토큰 집합 (한글 2-gram + 영문/숫자 단어)"""
+    tokens = set()
+    for word in _WORD_RE.findall(text):
+        if "가" <= word[0] <= "힣":
+            tokens.update(word[i : i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.add(word)
+    return tokens
+
+
+def to_item(article: dict) -> dict:
+    """
+    _data loader 매물 → 표준 스키마 아이템 (daangn_scraper._parse_item).
+
+    검색 API(daangn_scraper)와 같은 변환을 써서 색인/시세의 status, location이 검색 결과와 일치하도록 한다.
+    """
+    from scrapers.daangn_scraper import _parse_item  # 색인만 쓰는 프로세스가 스크래퍼 의존성을 미리 로드하지 않도록
+
+    return _parse_item(article)
+
+
+# ── 색인 (수집기) ─────────────────────────────────────────────────────────────
+
+
+async def index_articles(ar, region_id: int, articles: list[dict]) -> int:
+    """
+    새 매물을 구/군 역색인에 추가 (redis.asyncio 클라이언트, pipeline 1회).
+    articles에는 listing_scheduler가 계산한 ts가 있어야 한다.
+
+    Returns: 색인한 매물 수
+    """
+    cutoff = time.time() - MAX_AGE_SECONDS
+    pipe = ar.pipeline(transaction=False)
+    touched = set()
+    indexed = 0
+
+    for a in articles:
+        ts = a.get("ts", 0)
+        if ts < cutoff:
+            continue
+        item = to_item(a)
+        text = normalize(f"{item['title']} {str(a.get('content') or '')[:CONTENT_CHARS]}")
+        pipe.set(f"{DOC_PREFIX}{item['id']}", json.dumps({"item": item, "text": text}, ensure_ascii=False), ex=MAX_AGE_SECONDS)
+        for token in tokenize(text):
+            key = f"{TOKEN_PREFIX}{region_id}:{token}"
+            pipe.zadd(key, {item["id"]: ts})
+            touched.add(key)
+        indexed += 1
+
+    if not indexed:
+        return 0
+    for key in touched:
+        pipe.zremrangebyscore(key, 0, cutoff)
+        pipe.zremrangebyrank(key, 0, -(MAX_POSTING + 1))
+        pipe.expire(key, MAX_AGE_SECONDS)
+    await pipe.execute()
+    return indexed
+
+
+# ── 검색 (API) ────────────────────────────────────────────────────────────────
+
+
+def search(r, keyword: str, region_ids: list[int], limit: int = 20) -> list[dict]:
+    """
+    키워드 + 구/군 검색 (업스트림 요청 없음). 최신순 표준 스키마 아이템 목록 반환.
+
+    Raises:
+        ValueError: 색인 가능한 토큰이 없는 검색어 (1글자 한글 등)
+    """
+    query = normalize(keyword)
+    tokens = tokenize(query)
+    if not tokens:
+        raise ValueError("검색어는 2글자 이상의 한글 또는 영문/숫자를 포함해야 합니다.")
+
+    cutoff = time.time() - MAX_AGE_SECONDS
+    pipe = r.pipeline(transaction=False)
+    for rid in region_ids:
+        pipe.zinter([f"{TOKEN_PREFIX}{rid}:{t}" for t in sorted(tokens)], aggregate="MAX", withscores=True)
+    candidates = {}
+    for rows in pipe.execute():
+        for pid, ts in rows:
+            if ts >= cutoff:
+                candidates[pid] = ts
+    if not candidates:
+        return []
+
+    ordered = sorted(candidates, key=candidates.get, reverse=True)[:MAX_CANDIDATES]
+    words = query.split()
+    items = []
+    for raw in r.mget([f"{DOC_PREFIX}{pid}" for pid in ordered]):
+        if not raw:
+            continue
+        doc = json.loads(raw)
+        # n-gram 교집합은 다른 단어에 걸친 거짓 일치가 있을 수 있으므로 본문으로 확인
+        if all(w in doc["text"] for w in words):
+            items.append(doc["item"])
+            if len(items) >= limit:
+                break
+    return items
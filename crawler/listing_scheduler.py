@@ -8,12 +8,33 @@
   4. 1분 이내 등록된 새 매물 필터
   5. 키워드 매칭 → 알림 발송
 
+데드라인: 각 실행은 RUN_DEADLINE_SECONDS 안에 끝난다 (다음 정각 tick이 max_instances=1로
+건너뛰어지지 않도록). 데드라인에 남은 새 매물 감지(추가 페이지 포함)는 취소하며,
+끝내지 못한 구/군(미수집 또는 감지 실패/취소)은 carryover에 기록되어 다음 실행에서 가장 먼저 수집되고,
+그 구/군의 1분 필터 창은 이월된 시간만큼 넓어진다.
+
 새 매물 감지: seen_ids 비교로 "이전에 없던 매물"을 감지한 뒤,
 createdAt 기준 1분 이내 등록된 매물만 알림 대상으로 필터링한다.
+seen_ids 조회/갱신은 비동기 Redis 클라이언트로 수행하여, 먼저 끝난 배치의 감지가
+다음 배치의 HTTP 요청과 겹쳐 진행된다 (수집 후 구/군마다 직렬로 Redis를 왕복하지 않음).
+
+키워드 우선 수집 (keyword_planner): 구독 키워드가 적으면 키워드마다 전국 키워드 검색 1번이 스윕보다
+요청이 적다. 매분 플랜을 갱신해 타겟 모드면 키워드 검색으로 알림 키워드를 커버하고,
+전국 스윕은 DAANGN_PLAN_SWEEP_RELAXED_MINUTES분마다만 실행한다.
+
+분산 모드 (DAANGN_LISTING_SHARDS > 1):
+  구/군을 regionId % SHARD_COUNT 로 shard에 나누고, 각 워커는 Redis lease로
+  공정 몫(ceil(shard 수 / 살아있는 워커 수))만큼 shard를 점유하여 수집한다.
+  워커가 죽으면 lease TTL 만료 후 다른 워커가 회수한다.
+  한 구/군은 항상 한 shard에만 속하므로 seen_ids 감지는 워커 간에도 일관된다.
 
 Redis 키:
   daangn:listing:seen:{regionId}  — 구/군별 확인된 매물 ID 목록 (TTL 24h)
   daangn:listing:last_run         — 최근 수집 상태 요약
+  daangn:listing:runs             — 실행 요약 시계열 (ZSET, score=시작 epoch, 최근 7일 / 최대 20,000건)
+  daangn:listing:carryover        — 데드라인/재시도 초과로 미수집된 구/군 (ZSET, score=최초 이월 epoch)
+  daangn:listing:shard:{n}        — shard lease 소유 워커 ID (TTL 90s, 분산 모드)
+  daangn:listing:workers          — 살아있는 워커 heartbeat (ZSET, score=epoch, 분산 모드)
 """
 
 import asyncio
@@ -21,10 +42,23 @@ import json
 import logging
 import os
 import time
-from datetime import datetime, timedelta, timezone
+from collections.abc import Awaitable, Callable
 
 import aiohttp
-import redis
+import redis.asyncio as aioredis
+
+import district_latency
+import keyword_planner
+import lease
+import leader
+import listing_index
+import memory_profile
+import price_rollup
+import redis_codec
+import redis_conn
+import seen_store
+import upstream_budget
+from scrapers.daangn_scraper import _to_epoch
 
 logger = logging.getLogger(__name__)
 
@@ -45,83 +79,140 @@ HEADERS = {
 }
 
 BATCH_SIZE = 50
-TTL_24H = 86400
 INTERVAL_MINUTES = 1
 MAX_RETRY = 2
+FENCE_CHECK_INTERVAL = 1.0  # 수집 중 seen_ids 쓰기 전 fencing token 재확인 주기 (초)
+MAX_PAGE_DEPTH = int(os.getenv("DAANGN_LISTING_MAX_PAGES", "5"))  # 구/군당 최대 페이지 (적응형)
+
+# 다음 정각 tick 전에 감지/Redis 쓰기를 끝낼 여유를 남긴 수집 데드라인
+DEADLINE_MARGIN_SECONDS = 10
+RUN_DEADLINE_SECONDS = INTERVAL_MINUTES * 60 - DEADLINE_MARGIN_SECONDS
+CARRYOVER_KEY = "daangn:listing:carryover"
+
+# 실행 이력 (용량 계획용 백분위 통계)
+LAST_RUN_KEY = "daangn:listing:last_run"
+RUNS_KEY = "daangn:listing:runs"
+RUN_HISTORY_SECONDS = 86400 * 7
+RUN_HISTORY_MAX = 20000
 
-KST = timezone(timedelta(hours=9))
 
-# ── Redis 연결 ────────────────────────────────────────────────────────────────
+# ── 분산 모드 (shard lease) ───────────────────────────────────────────────────
 
-_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SHARD_COUNT = int(os.getenv("DAANGN_LISTING_SHARDS", "1"))
+SHARD_LEASE_TTL = 90  # 1분 주기 + 여유. 죽은 워커의 shard는 최대 90초 후 회수
+SHARD_KEY_PREFIX = "daangn:listing:shard:"
+WORKERS_KEY = "daangn:listing:workers"
+WORKER_ID = lease.worker_id()
 
-try:
-    _redis = redis.from_url(_REDIS_URL, decode_responses=True)
-    _redis.ping()
-    logger.info("[listing_scheduler] Redis 연결 성공: %s", _REDIS_URL)
-except Exception as e:
-    logger.warning("[listing_scheduler] Redis 연결 실패: %s", e)
-    _redis = None
+# ── Redis 연결 (공유 지연 연결 — import 시 네트워크 연결 없음) ───────────────
+
+_redis = redis_conn.client()
 
 
 # ── 매물 수집 ─────────────────────────────────────────────────────────────────
 
 
 async def _fetch_listings_for_district(
-    session: aiohttp.ClientSession, region_id: int
-) -> tuple[int, list[dict], bool, bool]:
+    session: aiohttp.ClientSession,
+    region_id: int | None,
+    timeout: float = district_latency.DEFAULT_TIMEOUT,
+    page: int = 1,
+    keyword: str | None = None,
+) -> tuple[int | None, list[dict], bool, bool, float | None]:
     """
     단일 구/군의 최신 매물 수집 (Remix _data loader로 JSON 직접 수신).
 
-    Returns: (region_id, articles, rate_limited, ok)
+    timeout: 구/군별 응답 통계로 정한 요청 timeout (district_latency)
+    page:    페이지 번호 (1-based). 2 이상은 _detect_new_listings의 적응형 추가 페이지
+    keyword: 지정 시 키워드 검색 (region_id=None이면 전국 — 키워드 우선 수집)
+
+    Returns: (region_id, articles, rate_limited, ok, 응답 시간(초) — timeout이면 걸린 시간, 그 밖의 실패는 None)
     """
+    started = time.monotonic()
     try:
-        params = {
-            "in": region_id,
-            "_data": "routes/kr.buy-sell.s",
-        }
-        timeout = aiohttp.ClientTimeout(total=3)
-        async with session.get(SEARCH_DATA_URL, params=params, timeout=timeout) as resp:
+        params = {"_data": "routes/kr.buy-sell.s"}
+        if region_id is not None:
+            params["in"] = region_id
+        if keyword:
+            params["search"] = keyword
+        if page > 1:
+            params["page"] = page
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with session.get(SEARCH_DATA_URL, params=params, timeout=client_timeout) as resp:
             if resp.status == 429:
-                return region_id, [], True, False
+                return region_id, [], True, False, None
             if resp.status != 200:
-                return region_id, [], False, False
+                return region_id, [], False, False, None
 
             data = await resp.json(content_type=None)
             if not data:
-                return region_id, [], False
+                return region_id, [], False, False, None
+        elapsed = time.monotonic() - started
 
         articles = (
             data.get("allPage", {})
             .get("fleamarketArticles", [])
         )
+        # createdAt → epoch 초를 수집 시점에 1회 계산 (이후 필터/정렬은 정수 비교)
+        for a in articles:
+            a["ts"] = _to_epoch(a.get("createdAt"))
         # HTTP 200이면 articles=[]이어도 성공 (매물이 없는 지역)
-        return region_id, articles, False, True
+        return region_id, articles, False, True, elapsed
 
+    except asyncio.TimeoutError:
+        logger.warning("[listing_scheduler] 매물 수집 timeout %.1fs (regionId=%s, keyword=%s)", timeout, region_id, keyword)
+        return region_id, [], False, False, time.monotonic() - started
     except Exception as e:
-        logger.warning("[listing_scheduler] 매물 수집 실패 (regionId=%s): %s", region_id, e)
-        return region_id, [], False, False
+        logger.warning("[listing_scheduler] 매물 수집 실패 (regionId=%s, keyword=%s): %s", region_id, keyword, e)
+        return region_id, [], False, False, None
 
 
-async def _collect_all_listings(districts: list[dict]) -> dict[int, list[dict]]:
+async def _collect_all_listings(
+    districts: list[dict],
+    latency: dict[int, district_latency.DistrictLatency],
+    samples: list[tuple[int, float | None, bool]],
+    deadline: float | None = None,
+    on_success: Callable[[aiohttp.ClientSession, int, list[dict]], Awaitable[None]] | None = None,
+) -> tuple[dict[int, list[dict]], int]:
     """
     전국 구/군 매물을 배치로 병렬 수집.
 
     100% 성공을 목표로 최대 MAX_RETRY회 재시도.
     Rate limit(429) 감지 시 delay를 자동 증가.
+    배치마다 전역 업스트림 예산(background 레인)에서 요청 수만큼 토큰을 받은 뒤 요청한다.
+
+    deadline(time.monotonic 기준)이 지나면 새 배치/재시도를 시작하지 않고,
+    진행 중인 요청도 취소한 뒤 그때까지의 결과만 반환한다.
+    반환값에 없는 구/군은 호출자가 다음 주기로 이월한다.
+
+    요청 timeout은 구/군별 최근 p95(latency — district_latency.load)로 정하고, 재시도 라운드는
+    p95가 짧은 구/군부터 요청하며 timeout을 attempt배로 늘린다. 응답 시간/실패는 samples에 추가하고
+    호출자가 후속 작업(추가 페이지)의 표본과 함께 기록한다.
+
+    on_success(session, region_id, articles)는 구/군 수집 성공 즉시 task로 예약되어
+    이후 배치의 요청과 겹쳐 실행되고, 반환 전에 데드라인까지 완료를 기다린다 (남은 task는 취소).
+
+    Returns: ({regionId: articles}, 전체 429 응답 수)
     """
     all_results = {}
+    followups: list[asyncio.Task] = []
+    rate_limited_total = 0
     pending_ids = [d["regionId"] for d in districts]
     delay = 0.5
 
+    def _remaining() -> float:
+        return float("inf") if deadline is None else deadline - time.monotonic()
+
     connector = aiohttp.TCPConnector(limit=BATCH_SIZE)
     async with aiohttp.ClientSession(
         connector=connector, headers=HEADERS
     ) as session:
 
         for attempt in range(1, MAX_RETRY + 1):
-            if not pending_ids:
+            if not pending_ids or _remaining() <= 0:
                 break
+            if attempt > 1:
+                pending_ids.sort(key=lambda rid: district_latency.get(latency, rid).priority)
 
             batch_size = BATCH_SIZE if attempt <= 2 else max(5, BATCH_SIZE // attempt)
             total_batches = (len(pending_ids) + batch_size - 1) // batch_size
@@ -130,24 +221,53 @@ async def _collect_all_listings(districts: list[dict]) -> dict[int, list[dict]]:
 
             for i in range(0, len(pending_ids), batch_size):
                 batch_ids = pending_ids[i : i + batch_size]
+                # 전역 업스트림 예산 (background 레인 — 사용자 검색 몫을 남기고 여유분만 사용)
+                granted = await upstream_budget.acquire_async(
+                    redis_conn.get(),
+                    len(batch_ids),
+                    upstream_budget.LANE_BACKGROUND,
+                    timeout=None if deadline is None else max(0.0, _remaining()),
+                )
+                remaining = _remaining()
+                if not granted or remaining <= 0:
+                    # 예산 소진 / 데드라인 초과: 남은 구/군은 시도하지 않고 이월
+                    next_pending.extend(pending_ids[i:])
+                    break
+
                 tasks = [
-                    _fetch_listings_for_district(session, rid)
+                    asyncio.ensure_future(_fetch_listings_for_district(
+                        session,
+                        rid,
+                        min(district_latency.MAX_TIMEOUT, district_latency.get(latency, rid).timeout * attempt),
+                    ))
                     for rid in batch_ids
                 ]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                done, not_done = await asyncio.wait(
+                    tasks, timeout=None if deadline is None else remaining
+                )
+                for t in not_done:
+                    t.cancel()
+                results = [t.result() for t in done if not t.cancelled() and t.exception() is None]
 
                 batch_success = 0
+                finished = set()
                 for r in results:
-                    if isinstance(r, tuple) and len(r) == 4:
-                        region_id, articles, rate_limited, ok = r
+                    if isinstance(r, tuple) and len(r) == 5:
+                        region_id, articles, rate_limited, ok, elapsed = r
+                        finished.add(region_id)
+                        if not rate_limited:
+                            samples.append((region_id, elapsed, ok))
                         if ok:
                             all_results[region_id] = articles
                             batch_success += 1
+                            if on_success is not None:
+                                followups.append(asyncio.ensure_future(on_success(session, region_id, articles)))
                         elif rate_limited:
                             next_pending.append(region_id)
                             rate_limited_count += 1
                         else:
                             next_pending.append(region_id)
+                next_pending.extend(rid for rid in batch_ids if rid not in finished)
 
                 batch_num = i // batch_size + 1
                 if attempt == 1 and batch_num % 3 == 0:
@@ -161,72 +281,289 @@ async def _collect_all_listings(districts: list[dict]) -> dict[int, list[dict]]:
                     delay = min(delay + 0.3, 3.0)
 
                 if i + batch_size < len(pending_ids):
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(max(0.0, min(delay, _remaining())))
 
+            rate_limited_total += rate_limited_count
             logger.info(
                 "[listing_scheduler] %d차 수집 완료: 성공 %d / 실패 %d (rate-limited %d), delay=%.1fs",
                 attempt, len(all_results), len(next_pending), rate_limited_count, delay,
             )
 
             pending_ids = next_pending
-            if pending_ids:
-                wait = 3.0 * attempt
+            if pending_ids and attempt < MAX_RETRY:
+                wait = min(3.0 * attempt, _remaining())
+                if wait <= 0:
+                    break
                 logger.info("[listing_scheduler] %.0f초 대기 후 %d개 재시도", wait, len(pending_ids))
                 await asyncio.sleep(wait)
                 delay = max(1.5, delay)
 
+        # 후속 작업(감지 + 추가 페이지 요청)이 세션을 쓰므로 세션을 닫기 전에 기다린다.
+        # 데드라인이 지나면 남은 후속 작업은 취소한다 (감지하지 못한 구/군은 호출자가 이월)
+        if followups:
+            _, unfinished = await asyncio.wait(
+                followups, timeout=None if deadline is None else max(0.0, _remaining())
+            )
+            for t in unfinished:
+                t.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+                logger.warning("[listing_scheduler] 데드라인 초과 — 새 매물 감지 %d건 취소", len(unfinished))
+
     if pending_ids:
         logger.warning(
-            "[listing_scheduler] %d개 구/군 수집 실패 (최대 재시도 초과)", len(pending_ids)
+            "[listing_scheduler] %d개 구/군 미수집 (재시도 초과 또는 데드라인) — 다음 주기로 이월",
+            len(pending_ids),
         )
 
-    return all_results
+    return all_results, rate_limited_total
+
+
+# ── shard 점유 (분산 모드) ────────────────────────────────────────────────────
+
+
+def _claim_shards() -> list[int]:
+    """
+    살아있는 워커 수 기준 공정 몫만큼 shard lease를 갱신/반납/획득.
+
+    1. 자신의 heartbeat 기록 + 만료된 워커 정리
+    2. 보유 중인 lease 갱신
+    3. 공정 몫 초과분 반납 (새 워커 합류 시 재분배)
+    4. 빈 shard 획득 (죽은 워커의 lease는 TTL 만료 후 빈 상태가 됨)
+
+    Returns: 이번 주기에 수집할 shard 번호 목록
+    """
+    now = time.time()
+    _redis.zadd(WORKERS_KEY, {WORKER_ID: now})
+    _redis.zremrangebyscore(WORKERS_KEY, 0, now - SHARD_LEASE_TTL)
+    alive = max(1, _redis.zcard(WORKERS_KEY))
+    fair_share = -(-SHARD_COUNT // alive)
+
+    owned = [
+        shard
+        for shard in range(SHARD_COUNT)
+        if lease.renew(_redis, f"{SHARD_KEY_PREFIX}{shard}", WORKER_ID, SHARD_LEASE_TTL)
+    ]
+
+    while len(owned) > fair_share:
+        shard = owned.pop()
+        lease.release(_redis, f"{SHARD_KEY_PREFIX}{shard}", WORKER_ID)
+
+    # 워커마다 다른 위치에서 탐색을 시작해 동시 획득 경합을 줄인다
+    offset = sum(WORKER_ID.encode()) % SHARD_COUNT
+    for i in range(SHARD_COUNT):
+        if len(owned) >= fair_share:
+            break
+        shard = (offset + i) % SHARD_COUNT
+        if shard in owned:
+            continue
+        if lease.acquire(_redis, f"{SHARD_KEY_PREFIX}{shard}", WORKER_ID, SHARD_LEASE_TTL):
+            owned.append(shard)
+
+    return sorted(owned)
+
+
+def release_shards():
+    """종료 시 보유 중인 shard lease와 heartbeat를 즉시 반납 (다른 워커가 바로 회수)"""
+    if SHARD_COUNT <= 1 or not redis_conn.available():
+        return
+    for shard in range(SHARD_COUNT):
+        lease.release(_redis, f"{SHARD_KEY_PREFIX}{shard}", WORKER_ID)
+    _redis.zrem(WORKERS_KEY, WORKER_ID)
+    logger.info("[listing_scheduler] shard lease 반납 완료 (worker=%s)", WORKER_ID)
+
+
+# ── 미수집 구/군 이월 ─────────────────────────────────────────────────────────
+
+
+async def _load_carryover(ar: aioredis.Redis, districts: list[dict], all_region_ids: set[int]) -> dict[int, float]:
+    """
+    이전 실행에서 이월된 구/군 로드 (이번 수집 대상에 속한 것만).
+
+    현재 구/군 목록(all_region_ids, 분산 모드에서도 전체)에 없는 구/군은 폐지·통합된 것이므로
+    이월 목록에서 지운다 — 남겨 두면 어느 실행도 수집하지 않아 영원히 쌓인다.
+
+    Returns: {regionId: 최초 이월 epoch}
+    """
+    region_ids = {d["regionId"] for d in districts}
+    carried = {}
+    stale = []
+    for member, since in await ar.zrange(CARRYOVER_KEY, 0, -1, withscores=True):
+        region_id = int(member)
+        if region_id in region_ids:
+            carried[region_id] = since
+        elif region_id not in all_region_ids:
+            stale.append(member)
+    if stale:
+        await ar.zrem(CARRYOVER_KEY, *stale)
+        logger.info("[listing_scheduler] 목록에서 사라진 이월 구/군 %d개 제거", len(stale))
+    return carried
+
+
+def _carryover_window(start_time: float, since: float) -> int:
+    """
+    이월된 구/군의 1분 이내 필터 창 (분) — 처음 이월된 뒤 놓친 주기만큼 넓힌다.
+
+    seen_ids 커서는 seen_store.TTL이 지나면 사라져 그 구/군은 다시 최초 수집(알림 없음)이 되므로,
+    그보다 오래 이월됐어도 창은 TTL 범위까지만 넓힌다.
+    """
+    missed = int((start_time - since) // 60) + 1
+    return INTERVAL_MINUTES + min(missed, seen_store.TTL // 60)
+
+
+def _save_carryover(carried: dict[int, float], finished: set[int], unfinished: list[int], now: float):
+    """수집된 이월 구/군은 제거하고, 이번에 끝내지 못한 구/군은 최초 이월 시각을 유지한 채 추가"""
+    pipe = _redis.pipeline(transaction=False)
+    done = [rid for rid in carried if rid in finished]
+    if done:
+        pipe.zrem(CARRYOVER_KEY, *done)
+    if unfinished:
+        pipe.zadd(CARRYOVER_KEY, {rid: now for rid in unfinished}, nx=True)
+    pipe.execute()
 
 
 # ── 새 매물 감지 ──────────────────────────────────────────────────────────────
 
 
-def _detect_new_listings(region_id: int, articles: list[dict]) -> list[dict]:
-    """Redis seen_ids와 비교하여 새 매물 감지"""
-    if not _redis or not articles:
-        return []
+async def _detect_new_listings(
+    ar: aioredis.Redis,
+    region_id: int,
+    articles: list[dict],
+    fetch_page: Callable[[int], Awaitable[list[dict] | None]] | None = None,
+) -> tuple[list[dict], int]:
+    """
+    Redis seen_ids와 비교하여 새 매물 감지 (비동기 클라이언트, seen_store.Scan).
+
+    적응형 페이지 깊이: 현재 페이지의 매물이 모두 새 매물이면 fetch_page(n)로 다음 페이지를 읽는다
+    (MAX_PAGE_DEPTH까지). 한가한 구/군은 1페이지에서 멈추고, 1분 사이 매물이 1페이지를 넘게
+    올라오는 구/군만 더 읽는다. seen_ids가 아직 없는 구/군(최초 수집)은 추가 페이지를 읽지 않는다.
 
-    seen_key = f"daangn:listing:seen:{region_id}"
-    seen_raw = _redis.get(seen_key)
-    seen_ids = set(json.loads(seen_raw)) if seen_raw else set()
+    추가 페이지의 매물은 articles에 이어 붙인다 (호출자의 전체 매물 집계에 반영).
 
-    current_ids = {a["id"] for a in articles}
-    new_ids = current_ids - seen_ids
+    Returns: (새 매물, 추가로 요청한 페이지 수)
+    """
+    if not articles:
+        return [], 0
 
-    new_articles = [a for a in articles if a["id"] in new_ids]
+    seen_key = f"daangn:listing:seen:{region_id}"
+    scan = seen_store.Scan(await ar.get(seen_key))
+    scan.add_page(articles)
+    while fetch_page is not None and scan.more and scan.pages < MAX_PAGE_DEPTH:
+        articles.extend(scan.add_page(await fetch_page(scan.pages + 1) or []))
 
     # seen_ids 갱신
-    _redis.setex(seen_key, TTL_24H, json.dumps(list(current_ids), ensure_ascii=False))
+    await ar.setex(seen_key, seen_store.TTL, scan.dumps())
 
-    return new_articles
+    return scan.new, scan.pages - 1
 
 
-# ── 1분 이내 매물 필터 ────────────────────────────────────────────────────────
+async def _sweep(
+    districts: list[dict], all_region_ids: set[int], deadline: float, fence_token: int | None
+) -> tuple[dict[int, list[dict]], int, dict[int, list[dict]], int, bool, dict[int, float]]:
+    """
+    수집 + 새 매물 감지를 하나의 이벤트 루프에서 실행.
 
+    이전 실행에서 이월된 구/군(_load_carryover)을 가장 오래된 것부터 먼저 수집한다.
 
-def _filter_recent(articles: list[dict], minutes: int = INTERVAL_MINUTES) -> list[dict]:
-    """createdAt 기준으로 최근 N분 이내 등록된 매물만 반환"""
-    now = datetime.now(KST)
-    cutoff = now - timedelta(minutes=minutes)
-    recent = []
+    구/군 수집이 성공하면 바로 비동기 Redis로 seen_ids를 비교·갱신하고,
+    새 매물을 로컬 검색 색인(listing_index)과 시세 롤업(price_rollup)에 추가한다.
+    fence_token이 주어지면 FENCE_CHECK_INTERVAL초마다 리더 권한을 재확인하고,
+    권한을 잃은 뒤에는 seen_ids를 쓰지 않는다.
 
-    for a in articles:
-        created_str = a.get("createdAt", "")
-        if not created_str:
-            continue
+    추가 페이지 요청도 전역 업스트림 예산(background 레인)을 받고, 데드라인이 지나면 하지 않는다.
+
+    Returns: ({regionId: articles}, 429 응답 수, {regionId: 새 매물}, 추가 페이지 요청 수, 리더 권한 유지 여부,
+              {이월된 regionId: 최초 이월 epoch})
+    """
+    pool = aioredis.BlockingConnectionPool.from_url(
+        redis_conn.URL,
+        max_connections=BATCH_SIZE,
+        decode_responses=True,
+        socket_connect_timeout=redis_conn.CONNECT_TIMEOUT,
+    )
+    ar = aioredis.Redis.from_pool(pool)
+    detected: dict[int, list[dict]] = {}
+    extra_pages = 0
+    price_keywords: list[str] = []
+    latency: dict[int, district_latency.DistrictLatency] = {}
+    samples: list[tuple[int, float | None, bool]] = []
+    fence_ok = True
+    fence_checked_at = 0.0
+
+    async def _fence_ok() -> bool:
+        nonlocal fence_ok, fence_checked_at
+        if fence_token is None or not fence_ok:
+            return fence_ok
+        if time.monotonic() - fence_checked_at >= FENCE_CHECK_INTERVAL:
+            fence_checked_at = time.monotonic()
+            fence_ok = await leader.is_fence_current_async(ar, fence_token)
+        return fence_ok
+
+    async def _on_success(session: aiohttp.ClientSession, region_id: int, articles: list[dict]):
+        nonlocal extra_pages
+
+        async def _fetch_page(page: int) -> list[dict] | None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if not await upstream_budget.acquire_async(
+                redis_conn.get(), 1, upstream_budget.LANE_BACKGROUND, timeout=remaining
+            ):
+                return None
+            _, page_articles, rate_limited, ok, elapsed = await _fetch_listings_for_district(
+                session, region_id, district_latency.get(latency, region_id).timeout, page=page
+            )
+            if not rate_limited:
+                samples.append((region_id, elapsed, ok))
+            return page_articles if ok else None
+
+        if not await _fence_ok():
+            return
         try:
-            created = datetime.fromisoformat(created_str)
-            if created >= cutoff:
-                recent.append(a)
-        except (ValueError, TypeError):
-            continue
+            detected[region_id], pages = await _detect_new_listings(ar, region_id, articles, _fetch_page)
+            extra_pages += pages
+        except Exception as e:
+            logger.warning("[listing_scheduler] 새 매물 감지 실패 (regionId=%s): %s", region_id, e)
+            return
+        try:
+            await listing_index.index_articles(ar, region_id, detected[region_id])
+        except Exception as e:
+            logger.warning("[listing_scheduler] 검색 색인 실패 (regionId=%s): %s", region_id, e)
+        try:
+            await price_rollup.add_articles(ar, region_id, detected[region_id], price_keywords)
+        except Exception as e:
+            logger.warning("[listing_scheduler] 시세 집계 실패 (regionId=%s): %s", region_id, e)
+
+    try:
+        carried = await _load_carryover(ar, districts, all_region_ids)
+        if carried:
+            districts = sorted(districts, key=lambda d: carried.get(d["regionId"], float("inf")))
+            logger.info("[listing_scheduler] 이월된 구/군 %d개 우선 수집", len(carried))
+        try:
+            price_keywords = await price_rollup.tracked_keywords(ar)
+        except Exception as e:
+            logger.warning("[listing_scheduler] 시세 추적 키워드 조회 실패: %s", e)
+        latency = await district_latency.load(ar, [d["regionId"] for d in districts])
+        all_listings, rate_limited = await _collect_all_listings(
+            districts, latency, samples, deadline=deadline, on_success=_on_success
+        )
+        # 추가 페이지 요청 표본까지 모은 뒤 기록 (후속 작업은 _collect_all_listings 안에서 끝남)
+        await district_latency.record(ar, samples)
+        # 마지막 감지 이후 리더가 바뀌었는지 최종 확인
+        fence_checked_at = 0.0
+        await _fence_ok()
+    finally:
+        await ar.aclose()
+    return all_listings, rate_limited, detected, extra_pages, fence_ok, carried
+
+
+# ── 1분 이내 매물 필터 ────────────────────────────────────────────────────────
+
 
-    return recent
+def _filter_recent(articles: list[dict], minutes: int = INTERVAL_MINUTES) -> list[dict]:
+    """createdAt(epoch ts) 기준으로 최근 N분 이내 등록된 매물만 반환"""
+    cutoff = time.time() - minutes * 60
+    return [a for a in articles if a.get("ts", 0) >= cutoff]
 
 
 # ── 키워드 매칭 ───────────────────────────────────────────────────────────────
@@ -243,23 +580,90 @@ def _match_keywords(articles: list[dict], keyword: str) -> list[dict]:
     return matched
 
 
+# ── 실행 이력 / 통계 ──────────────────────────────────────────────────────────
+
+
+def _record_run(summary: dict, started_at: float):
+    """최근 상태(last_run) 덮어쓰기 + 실행 이력 ZSET에 추가 (기간/건수 제한으로 정리)"""
+    entry = json.dumps({**summary, "started_at": round(started_at, 3)}, ensure_ascii=False)
+    pipe = _redis.pipeline(transaction=False)
+    pipe.set(LAST_RUN_KEY, json.dumps(summary, ensure_ascii=False))
+    pipe.zadd(RUNS_KEY, {entry: started_at})
+    pipe.zremrangebyscore(RUNS_KEY, 0, started_at - RUN_HISTORY_SECONDS)
+    pipe.zremrangebyrank(RUNS_KEY, 0, -(RUN_HISTORY_MAX + 1))
+    pipe.execute()
+
+
+def _percentile(sorted_values: list[float], p: float) -> float | None:
+    """nearest-rank 백분위 (정렬된 목록 기준)"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def run_stats(window_minutes: int) -> dict:
+    """
+    최근 window_minutes분 동안의 실행 이력 통계.
+
+    Returns:
+        runs, duration_p50/p95/p99, success_rate(구/군 성공 비율),
+        new_listings_per_minute, rate_limited 합계, carried_over 평균
+    """
+    since = time.time() - window_minutes * 60
+    runs = [json.loads(raw) for raw in _redis.zrangebyscore(RUNS_KEY, since, "+inf")]
+
+    durations = sorted(r.get("duration_seconds", 0) for r in runs)
+    checked = sum(r.get("districts_checked", 0) for r in runs)
+    success = sum(r.get("districts_success", 0) for r in runs)
+    new_listings = sum(r.get("new_listings", 0) for r in runs)
+
+    return {
+        "window_minutes": window_minutes,
+        "runs": len(runs),
+        "duration_p50": _percentile(durations, 50),
+        "duration_p95": _percentile(durations, 95),
+        "duration_p99": _percentile(durations, 99),
+        "duration_max": durations[-1] if durations else None,
+        "success_rate": round(success / checked, 4) if checked else None,
+        "new_listings": new_listings,
+        "new_listings_per_minute": round(new_listings / window_minutes, 2) if window_minutes else None,
+        "rate_limited": sum(r.get("rate_limited", 0) for r in runs),
+        "carried_over_avg": round(sum(r.get("carried_over", 0) for r in runs) / len(runs), 2) if runs else None,
+    }
+
+
 # ── 메인 수집 함수 ────────────────────────────────────────────────────────────
 
 
-def collect_listings(test_keyword: str | None = None) -> dict:
+def collect_listings(
+    test_keyword: str | None = None, fence_token: int | None = None, deadline: float | None = None
+) -> dict:
     """
     전국 매물 수집 → seen_ids 기반 새 매물 감지 → 1분 이내 필터 → 키워드 매칭.
 
     Args:
         test_keyword: 테스트용 키워드. 지정 시 새 매물 중 매칭 결과도 반환.
+        fence_token:  리더 선출 fencing token (LeaderElector.guard가 전달).
+                      지정 시 Redis 쓰기 전에 token이 최신인지 확인하고, 아니면 결과를 버린다.
+        deadline:     time.monotonic 기준 마감 (기본: 지금부터 RUN_DEADLINE_SECONDS).
+                      run_collection이 같은 분의 타겟 검색과 데드라인을 나눠 쓸 때 전달한다.
 
     Returns:
         수집 결과 요약 dict
     """
-    if not _redis:
+    if not redis_conn.available():
         logger.error("[listing_scheduler] Redis 연결 없음 — 수집 중단")
         return {"error": "Redis 연결 없음"}
 
+    with memory_profile.run("listing") as mem:
+        return _collect_listings(test_keyword, fence_token, deadline, mem)
+
+
+def _collect_listings(
+    test_keyword: str | None, fence_token: int | None, deadline: float | None, mem: memory_profile.Run
+) -> dict:
+    """collect_listings 본문 — 조기 반환해도 memory_profile.run이 실행을 마감한다"""
     start_time = time.time()
 
     # 1. 구/군 목록 로드
@@ -268,25 +672,57 @@ def collect_listings(test_keyword: str | None = None) -> dict:
         logger.error("[listing_scheduler] 구/군 목록 없음 — 지역 스케줄러 실행 필요")
         return {"error": "구/군 목록 없음 (daangn:districts:all)"}
 
-    districts = json.loads(districts_json)
+    districts = redis_codec.loads(districts_json)
+    districts_total = len(districts)
+    all_region_ids = {d["regionId"] for d in districts}
+
+    # 1-1. 분산 모드: 점유한 shard에 속한 구/군만 수집
+    shards = None
+    if SHARD_COUNT > 1:
+        shards = _claim_shards()
+        if not shards:
+            logger.info("[listing_scheduler] 점유 가능한 shard 없음 — 이번 주기 건너뜀 (worker=%s)", WORKER_ID)
+            return {"error": "점유 가능한 shard 없음 (다른 워커가 모두 점유 중)"}
+        shard_set = set(shards)
+        districts = [d for d in districts if d["regionId"] % SHARD_COUNT in shard_set]
+        logger.info(
+            "[listing_scheduler] shard %s 점유 (worker=%s): %d/%d 구/군",
+            shards, WORKER_ID, len(districts), districts_total,
+        )
 
-    # 2. 전국 매물 수집
-    all_listings = asyncio.run(_collect_all_listings(districts))
+    # 2. 전국 매물 수집 + 3. 새 매물 감지 (seen_ids 비교, 수집과 겹쳐 진행)
+    #    이월된 구/군을 가장 오래된 것부터 우선 수집, 다음 정각 tick 전 데드라인
+    if deadline is None:
+        deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+    all_listings, rate_limited, detected, extra_pages, fence_ok, carried = asyncio.run(
+        _sweep(districts, all_region_ids, deadline, fence_token)
+    )
+
+    # 3-1. 수집 중 리더가 바뀌었으면 이후 Redis 쓰기를 하지 않는다
+    if not fence_ok:
+        logger.warning("[listing_scheduler] 리더 권한 상실 (token=%s) — 수집 결과 폐기", fence_token)
+        return {"error": "리더 권한 상실 — 수집 결과 폐기"}
+
+    # 3-2. 끝내지 못한 구/군(미수집, 또는 수집했지만 새 매물 감지 실패/취소)은 다음 실행으로 이월
+    #      감지하지 못한 구/군은 seen_ids가 그대로이므로 다음 실행에서 넓힌 창으로 다시 감지된다
+    finished = {rid for rid in all_listings if rid in detected}
+    unfinished = [d["regionId"] for d in districts if d["regionId"] not in finished]
+    _save_carryover(carried, finished, unfinished, start_time)
 
-    # 3. 새 매물 감지 (seen_ids 비교)
+    # 4. 1분 이내 등록된 새 매물만 필터 (이월된 구/군은 놓친 주기만큼 창을 넓힘)
     total_articles = 0
     total_new = 0
-    all_new_articles = []
+    recent_articles = []
 
     for region_id, articles in all_listings.items():
         total_articles += len(articles)
-        new_articles = _detect_new_listings(region_id, articles)
+        new_articles = detected.get(region_id, [])
         if new_articles:
             total_new += len(new_articles)
-            all_new_articles.extend(new_articles)
-
-    # 4. 1분 이내 등록된 새 매물만 필터
-    recent_articles = _filter_recent(all_new_articles, INTERVAL_MINUTES)
+            window = INTERVAL_MINUTES
+            if region_id in carried:
+                window = _carryover_window(start_time, carried[region_id])
+            recent_articles.extend(_filter_recent(new_articles, window))
 
     duration = round(time.time() - start_time, 2)
 
@@ -295,6 +731,14 @@ def collect_listings(test_keyword: str | None = None) -> dict:
     if test_keyword and recent_articles:
         keyword_matched = _match_keywords(recent_articles, test_keyword)
 
+    # 5-1. 키워드 플래너: 스윕으로 커버하는 구독 키워드의 분당 매칭 수 갱신
+    #      (분산 모드는 워커마다 일부 구/군만 보므로 측정하지 않음 → 플래너는 계속 스윕 모드)
+    sweep_keywords = keyword_planner.keywords_in(keyword_planner.current(_redis), keyword_planner.MODE_SWEEP)
+    if sweep_keywords and shards is None:
+        keyword_planner.record_matches(_redis, {
+            k: len(_match_keywords(recent_articles, k)) / INTERVAL_MINUTES for k in sweep_keywords
+        })
+
     # ── 알림 발송 (1분 이내 + 키워드 매칭된 매물만) ──
     # TODO: DB에서 사용자 등록 키워드 목록 조회
     # TODO: 매칭된 매물에 대해 FCM 알림 발송
@@ -317,14 +761,24 @@ def collect_listings(test_keyword: str | None = None) -> dict:
     # 수집 상태 Redis에 저장
     last_run = {
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "districts_total": districts_total,
         "districts_checked": len(districts),
         "districts_success": len(all_listings),
         "total_articles": total_articles,
         "new_listings": total_new,
         "recent_listings": len(recent_articles),
+        "carried_in": len(carried),
+        "carried_over": len(unfinished),
+        "rate_limited": rate_limited,
+        "extra_pages": extra_pages,
         "duration_seconds": duration,
     }
-    _redis.set("daangn:listing:last_run", json.dumps(last_run, ensure_ascii=False))
+    if shards is not None:
+        last_run["worker_id"] = WORKER_ID
+        last_run["shards"] = shards
+        last_run["shard_count"] = SHARD_COUNT
+    last_run.update(mem.end())
+    _record_run(last_run, start_time)
 
     logger.info(
         "[listing_scheduler] 수집 완료: %d/%d 구/군, 전체 %d건, 새 매물 %d건, 1분 이내 %d건, 소요 %.1f초",
@@ -362,20 +816,210 @@ def collect_listings(test_keyword: str | None = None) -> dict:
     return result
 
 
+# ── 키워드 우선 수집 (타겟 모드) ──────────────────────────────────────────────
+
+
+def _sweep_cost() -> int | None:
+    """직전 스윕 1회의 요청 수 (전체 구/군 + 추가 페이지). 스윕 기록이 없으면 None"""
+    raw = _redis.get(LAST_RUN_KEY)
+    if not raw:
+        return None
+    last = json.loads(raw)
+    return last.get("districts_total", last.get("districts_checked", 0)) + last.get("extra_pages", 0)
+
+
+def _last_sweep_at() -> float | None:
+    latest = _redis.zrevrange(RUNS_KEY, 0, 0, withscores=True)
+    return latest[0][1] if latest else None
+
+
+async def _targeted_scans(keywords: list[str], cursors: list[str | None], deadline: float) -> list[seen_store.Scan | None]:
+    """
+    키워드별 전국 키워드 검색(최신순)을 커서와 비교 (seen_store.Scan, Redis 쓰기 없음).
+    페이지가 모두 새 매물일 때만 다음 페이지를 읽는다 (keyword_planner.MAX_PAGES까지).
+
+    Returns: 키워드 순서대로 Scan (1페이지 요청 실패면 None — 커서 유지)
+    """
+    connector = aiohttp.TCPConnector(limit=BATCH_SIZE)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+
+        async def _fetch_page(keyword: str, page: int) -> list[dict] | None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if not await upstream_budget.acquire_async(
+                redis_conn.get(), 1, upstream_budget.LANE_BACKGROUND, timeout=remaining
+            ):
+                return None
+            _, articles, _, ok, _ = await _fetch_listings_for_district(
+                session, None, district_latency.MAX_TIMEOUT, page=page, keyword=keyword
+            )
+            return articles if ok else None
+
+        async def _scan(keyword: str, cursor_raw: str | None) -> seen_store.Scan | None:
+            first = await _fetch_page(keyword, 1)
+            if first is None:
+                return None
+            scan = seen_store.Scan(cursor_raw)
+            scan.add_page(first)
+            while scan.more and scan.pages < keyword_planner.MAX_PAGES:
+                scan.add_page(await _fetch_page(keyword, scan.pages + 1) or [])
+            return scan
+
+        return await asyncio.gather(*(_scan(k, c) for k, c in zip(keywords, cursors)))
+
+
+def collect_targeted(
+    keywords: list[str], fence_token: int | None = None, deadline: float | None = None, priming: bool = False
+) -> dict:
+    """
+    타겟 검색 — 키워드마다 전국 키워드 검색(최신순)을 커서와 비교해 새 매물 감지.
+
+    1분 이내 새 매물 수는 플래너의 매칭 수로 반영된다 (스윕 쪽 측정과 같은 기준).
+
+    Args:
+        keywords:    타겟 모드 키워드 (keyword_planner.keywords_in)
+        fence_token: 리더 선출 fencing token. 지정 시 Redis 쓰기 전에 token이 최신인지 확인하고, 아니면 결과를 버린다.
+        deadline:    time.monotonic 기준 마감 (기본: 지금부터 RUN_DEADLINE_SECONDS)
+        priming:     스윕 → 타겟 모드로 바뀌는 분. 이 분은 스윕이 알림을 커버하므로 커서만 최신으로 만든다
+                     (24시간 안에 남은 예전 커서가 있어도 그 사이 매물을 알리지 않음)
+
+    Returns:
+        수집 결과 요약 dict
+    """
+    with memory_profile.run("targeted") as mem:
+        return _collect_targeted(keywords, fence_token, deadline, priming, mem)
+
+
+def _collect_targeted(
+    keywords: list[str], fence_token: int | None, deadline: float | None, priming: bool, mem: memory_profile.Run
+) -> dict:
+    """collect_targeted 본문 — 조기 반환해도 memory_profile.run이 실행을 마감한다"""
+    start_time = time.time()
+    if deadline is None:
+        deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+    cursors = _redis.mget([keyword_planner.seen_key(k) for k in keywords])
+    scans = asyncio.run(_targeted_scans(keywords, cursors, deadline))
+
+    # 수집 중 리더가 바뀌었으면 커서를 쓰지 않는다
+    if fence_token is not None and not leader.is_fence_current(_redis, fence_token):
+        logger.warning("[listing_scheduler] 리더 권한 상실 (token=%s) — 키워드 우선 수집 결과 폐기", fence_token)
+        return {"error": "리더 권한 상실 — 수집 결과 폐기"}
+
+    pipe = _redis.pipeline(transaction=False)
+    observed: dict[str, float] = {}
+    requests_made = 0
+    total_new = 0
+    recent_articles = []
+
+    for keyword, scan in zip(keywords, scans):
+        if scan is None:
+            continue
+        requests_made += scan.pages
+        pipe.setex(keyword_planner.seen_key(keyword), seen_store.TTL, scan.dumps())
+        if priming or not scan.primed:
+            continue
+        recent = _filter_recent(scan.new)
+        observed[keyword] = len(recent) / INTERVAL_MINUTES
+        total_new += len(scan.new)
+        recent_articles.extend(recent)
+
+        # ── 알림 발송 (키워드별 1분 이내 새 매물) ──
+        # TODO: DB에서 keyword 구독 사용자 조회 후 FCM 알림 발송
+
+    last_run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "keywords": len(keywords),
+        "priming": priming,
+        "failed": sum(scan is None for scan in scans),
+        "requests": requests_made,
+        "new_listings": total_new,
+        "recent_listings": len(recent_articles),
+        "duration_seconds": round(time.time() - start_time, 2),
+    }
+    last_run.update(mem.end())
+    pipe.set(keyword_planner.TARGETED_LAST_RUN_KEY, json.dumps(last_run, ensure_ascii=False))
+    pipe.execute()
+    keyword_planner.record_matches(_redis, observed)
+
+    logger.info(
+        "[listing_scheduler] 키워드 우선 수집 완료%s: 키워드 %d개, 요청 %d회, 새 매물 %d건, 1분 이내 %d건, 소요 %.1f초",
+        " (커서 준비)" if priming else "",
+        len(keywords), requests_made, total_new, len(recent_articles), last_run["duration_seconds"],
+    )
+    return last_run
+
+
+def run_collection(fence_token: int | None = None, planner: bool = True) -> dict:
+    """
+    스케줄된 매분 수집 — 플랜을 1번 정하고 그 플랜대로 타겟 검색과 전국 스윕을 순서대로 실행.
+
+      1. 플랜 갱신 (keyword_planner.make_plan)
+      2. 타겟 모드 키워드가 있으면 타겟 검색
+      3. 스윕 모드, 모드가 바뀐 분, 또는 타겟 모드의 완화 주기가 되면 전국 스윕
+
+    모드가 바뀐 분에는 스윕을 항상 실행하므로 알림 공백이 없다.
+    스윕 → 타겟 전환 분의 타겟 검색은 커서만 준비하고(priming), 다음 분부터 알림을 맡는다.
+
+    planner=False: 분산 모드의 비리더 워커 — 리더가 저장한 플랜을 읽어 필요할 때 스윕만 한다.
+    수동 실행(POST /api/daangn/listings/collect)은 이 경로 없이 collect_listings를 바로 호출한다.
+    """
+    if not redis_conn.available():
+        logger.error("[listing_scheduler] Redis 연결 없음 — 수집 중단")
+        return {"error": "Redis 연결 없음"}
+
+    deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+    result: dict = {}
+    changed = False
+
+    if planner:
+        previous = keyword_planner.current(_redis)
+        plan = keyword_planner.make_plan(_redis, _sweep_cost())
+        changed = previous is not None and previous["mode"] != plan["mode"]
+        keywords = keyword_planner.keywords_in(plan, keyword_planner.MODE_TARGETED)
+        if keywords:
+            result["targeted"] = collect_targeted(keywords, fence_token, deadline, priming=changed)
+    else:
+        plan = keyword_planner.current(_redis)
+
+    result["mode"] = plan["mode"] if plan else keyword_planner.MODE_SWEEP
+    if changed or keyword_planner.sweep_due(plan, _last_sweep_at()):
+        sweep_token = fence_token if SHARD_COUNT <= 1 else None  # 분산 모드 스윕은 shard lease가 중복을 막음
+        result["sweep"] = collect_listings(fence_token=sweep_token, deadline=deadline)
+    else:
+        logger.debug("[listing_scheduler] 타겟 모드 — 이번 분 스윕 건너뜀")
+    return result
+
+
 # ── APScheduler 등록 ──────────────────────────────────────────────────────────
 
 
-def create_listing_scheduler():
-    """스케줄러 인스턴스 생성 및 job 등록 (매분 정각 실행)"""
+def create_listing_scheduler(elector: leader.LeaderElector | None = None):
+    """
+    스케줄러 인스턴스 생성 및 job 등록 (매분 정각 실행 — run_collection).
+
+    elector가 주어지면 리더 인스턴스에서만 수집한다.
+    단, 분산 모드(SHARD_COUNT > 1)의 전국 스윕은 shard lease가 중복을 막으므로 모든 인스턴스가 수집한다
+    (플랜 갱신 / 타겟 검색은 분산 모드에서도 리더만).
+    """
     from apscheduler.schedulers.background import BackgroundScheduler
     from apscheduler.triggers.cron import CronTrigger
 
+    if elector is None:
+        job = run_collection
+    elif SHARD_COUNT <= 1:
+        job = elector.guard(run_collection)
+    else:
+        def job():
+            token = elector.token
+            return run_collection(fence_token=token, planner=token is not None)
+
     scheduler = BackgroundScheduler()
     scheduler.add_job(
-        collect_listings,
+        job,
         trigger=CronTrigger(second=0),  # 매분 00초에 실행
         id="daangn_listing_collector",
-        name="당근 전국 매물 수집 및 알림",
+        name="당근 매물 수집 (키워드 우선 수집 플랜 + 전국 스윕) 및 알림",
         replace_existing=True,
         max_instances=1,
     )
@@ -424,4 +1068,5 @@ if __name__ == "__main__":
     try:
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
+        release_shards()
         logger.info("[listing_scheduler] 스케줄러 종료")
@@ -0,0 +1,261 @@
+"""
+장시간 실행 프로세스 메모리 계측 (opt-in)
+
+서버 프로세스는 Flask + 스케줄러 2개를 며칠씩 실행하므로, 수집 실행마다 메모리 사용량을 남겨
+누수/증가 추세를 OOM 전에 찾는다.
+
+수집 실행은 `with memory_profile.run("listing") as mem:`으로 감싼다 (조기 반환/예외에도 종료 계측).
+
+  - 항상: 실행 요약에 RSS / peak RSS (MB) 기록 (/proc, getrusage — 비용 거의 없음)
+  - MEMORY_PROFILE=1: tracemalloc 추적 시작, 실행 시작(before)과 종료(after) 스냅샷을 프로세스 내에
+    최근 MAX_SNAPSHOTS개 보관하고, 실행 중 추적 메모리 peak과 상위 할당 위치를 기록한다.
+    두 스냅샷의 차이(할당 위치별 증가량)는 /api/debug/memory/diff 로 조회한다
+    (한 실행의 증가량: from=snapshot_before_id, to=snapshot_id).
+
+실행 요약(스냅샷 제외)은 Redis에도 남겨 어느 프로세스의 실행이든 /api/debug/memory 의 recent_runs로 본다.
+스냅샷 자체는 프로세스 메모리에만 있으므로 스냅샷 목록 / diff는 조회한 프로세스에서 실행된 수집만 다룬다
+(수집을 collector.py로 분리하면 API 프로세스의 스냅샷 목록은 비어 있다).
+
+Redis 키:
+  debug:memory:runs — 최근 실행 메모리 요약 (LIST, 최신이 앞, 최대 RUNS_MAX개, JSON)
+"""
+
+import itertools
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+ENABLED = os.getenv("MEMORY_PROFILE", "0") == "1"
+FRAMES = int(os.getenv("MEMORY_PROFILE_FRAMES", "10"))
+MAX_SNAPSHOTS = int(os.getenv("MEMORY_PROFILE_SNAPSHOTS", "10"))
+TOP_LIMIT = 10
+RUNS_KEY = "debug:memory:runs"
+RUNS_MAX = 200
+
+_MB = 1024 * 1024
+
+# tracemalloc 자체와 import 시스템 할당은 제외
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+@dataclass(frozen=True)
+class StoredSnapshot:
+    id: int
+    label: str
+    taken_at: float
+    rss_mb: float | None
+    traced_mb: float
+    snapshot: tracemalloc.Snapshot
+
+
+_snapshots: deque[StoredSnapshot] = deque(maxlen=MAX_SNAPSHOTS)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+
+
+# ── RSS ───────────────────────────────────────────────────────────────────────
+
+
+def rss_mb() -> float | None:
+    """현재 RSS (MB). /proc가 없는 환경에서는 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / _MB, 1)
+    except (OSError, ValueError, IndexError, AttributeError):  # AttributeError: os.sysconf 없음 (Windows)
+        return None
+
+
+def peak_rss_mb() -> float | None:
+    """프로세스 시작 이후 최대 RSS (MB). macOS는 bytes, Linux는 KB 단위. resource가 없는 환경(Windows)에서는 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / _MB if sys.platform == "darwin" else peak / 1024, 1)
+
+
+# ── 실행 계측 ─────────────────────────────────────────────────────────────────
+
+
+def start():
+    """MEMORY_PROFILE=1이면 tracemalloc 추적 시작 (이미 시작되었으면 무시)"""
+    if ENABLED and not tracemalloc.is_tracing():
+        tracemalloc.start(FRAMES)
+        logger.info("[memory_profile] tracemalloc 추적 시작 (frames=%d)", FRAMES)
+
+
+def _store(label: str) -> tuple[StoredSnapshot, int]:
+    """현재 추적 메모리 스냅샷을 보관. (스냅샷, 실행 중 peak bytes) 반환"""
+    current, peak = tracemalloc.get_traced_memory()
+    stored = StoredSnapshot(
+        id=next(_ids),
+        label=label,
+        taken_at=time.time(),
+        rss_mb=rss_mb(),
+        traced_mb=round(current / _MB, 2),
+        snapshot=tracemalloc.take_snapshot().filter_traces(_FILTERS),
+    )
+    with _lock:
+        _snapshots.append(stored)
+    return stored, peak
+
+
+def begin_run(label: str) -> int | None:
+    """
+    수집 실행 시작 — 추적 중이면 실행 전(before) 스냅샷을 저장하고 추적 메모리 peak 초기화.
+
+    Returns: before 스냅샷 id (추적 중이 아니면 None)
+    """
+    start()
+    if not tracemalloc.is_tracing():
+        return None
+    stored, _ = _store(f"{label}:before")
+    tracemalloc.reset_peak()
+    return stored.id
+
+
+def end_run(label: str, before_id: int | None = None) -> dict:
+    """
+    수집 실행 종료 — 실행 요약에 넣을 메모리 필드 반환.
+    추적 중이면 실행 후 스냅샷을 저장하고 스냅샷 id / 추적 메모리 / 실행 중 peak을 포함한다.
+    """
+    summary = {"rss_mb": rss_mb(), "peak_rss_mb": peak_rss_mb()}
+    if not tracemalloc.is_tracing():
+        return summary
+
+    stored, peak = _store(label)
+    summary.update({
+        "snapshot_id": stored.id,
+        "snapshot_before_id": before_id,
+        "traced_mb": stored.traced_mb,
+        "traced_peak_mb": round(peak / _MB, 2),
+    })
+    for row in top_allocations(stored.snapshot, limit=3):
+        logger.info("[memory_profile] %s 상위 할당: %s %.1fKB (%d개)", label, row["site"], row["size_kb"], row["count"])
+    return summary
+
+
+class Run:
+    """run()이 넘겨주는 실행 계측 핸들. end()는 1번만 계측하고 이후에는 같은 요약을 반환한다"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.before_id = begin_run(label)
+        self._summary: dict | None = None
+
+    def end(self) -> dict:
+        if self._summary is None:
+            self._summary = end_run(self.label, self.before_id)
+            _publish(self.label, self._summary)
+        return self._summary
+
+
+@contextmanager
+def run(label: str):
+    """
+    수집 실행 1회 계측. 블록 안에서 mem.end()로 요약을 먼저 받아 실행 기록에 넣을 수 있고,
+    호출하지 않고 끝나면(조기 반환 / 예외) 블록을 나갈 때 계측한다.
+    """
+    profile = Run(label)
+    try:
+        yield profile
+    finally:
+        profile.end()
+
+
+def _publish(label: str, summary: dict):
+    """실행 요약을 Redis에 기록 (다른 프로세스의 /api/debug/memory에서 조회). 실패는 무시"""
+    import redis_conn
+
+    r = redis_conn.get()
+    if r is None:
+        return
+    entry = {"label": label, "process": f"{socket.gethostname()}:{os.getpid()}", "at": round(time.time(), 3), **summary}
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.lpush(RUNS_KEY, json.dumps(entry, ensure_ascii=False))
+        pipe.ltrim(RUNS_KEY, 0, RUNS_MAX - 1)
+        pipe.execute()
+    except Exception as e:
+        logger.debug("[memory_profile] 실행 요약 기록 실패: %s", e)
+
+
+def recent_runs(r, limit: int = 20) -> list[dict]:
+    """최근 실행 메모리 요약 (모든 프로세스, 최신순)"""
+    return [json.loads(raw) for raw in r.lrange(RUNS_KEY, 0, limit - 1)]
+
+
+# ── 조회 ──────────────────────────────────────────────────────────────────────
+
+
+def _site(stat) -> str:
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = TOP_LIMIT) -> list[dict]:
+    """할당 위치(파일:줄)별 상위 메모리 사용량"""
+    return [
+        {"site": _site(stat), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def list_snapshots() -> list[dict]:
+    with _lock:
+        stored = list(_snapshots)
+    return [
+        {"id": s.id, "label": s.label, "taken_at": s.taken_at, "rss_mb": s.rss_mb, "traced_mb": s.traced_mb}
+        for s in stored
+    ]
+
+
+def _get(snapshot_id: int) -> StoredSnapshot | None:
+    with _lock:
+        return next((s for s in _snapshots if s.id == snapshot_id), None)
+
+
+def latest_top(limit: int = TOP_LIMIT) -> list[dict]:
+    with _lock:
+        latest = _snapshots[-1] if _snapshots else None
+    return top_allocations(latest.snapshot, limit) if latest else []
+
+
+def diff(from_id: int, to_id: int, limit: int = TOP_LIMIT) -> list[dict]:
+    """
+    두 스냅샷의 할당 위치별 차이 (증가량 큰 순).
+
+    Raises:
+        KeyError: 해당 id의 스냅샷이 없을 때 (보관 개수 초과로 삭제되었거나 잘못된 id)
+    """
+    old, new = _get(from_id), _get(to_id)
+    if old is None or new is None:
+        raise KeyError(from_id if old is None else to_id)
+    return [
+        {
+            "site": _site(stat),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "size_kb": round(stat.size / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in new.snapshot.compare_to(old.snapshot, "lineno")[:limit]
+    ]
@@ -0,0 +1,180 @@
+"""
+당근 시세 롤업 — 키워드 × 구/군 × 일자별 가격 통계 (count, median, p10, p90)
+
+매분 전국 매물 수집기가 감지한 새 매물 중 추적 키워드가 제목/본문에 포함된 매물의 가격을
+(키워드, 구/군, KST 일자)별 ZSET에 누적한다. 가격 순으로 정렬된 상태가 유지되므로
+백분위는 요청 시 순위 조회(ZRANGE by rank) 몇 번으로 바로 구한다 — 업스트림 요청 없음.
+
+추적 키워드:
+  - 환경변수 DAANGN_PRICE_KEYWORDS (콤마 구분)로 기본 목록 지정
+  - 그 밖의 키워드는 관리 API(PUT /api/daangn/prices/keywords)로 지정 (최대 MAX_TRACKED개).
+    시세 조회(GET)는 추적 목록을 바꾸지 않는다 — 임의 검색어가 영구히 집계 대상이 되지 않도록
+  - 가격 0(나눔/가격미정)은 집계하지 않는다
+  - _data loader 매물에는 카테고리 정보가 없으므로 키워드 기준으로만 집계한다
+
+Redis 키:
+  daangn:price:keywords                        — 추적 키워드 (SET, 관리 API로 교체 + 기본 키워드)
+  daangn:price:{keyword}:{regionId}:{YYYYMMDD} — 가격 표본 (ZSET, member=productId, score=가격, TTL 35일)
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from listing_index import normalize, to_item
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+KEYWORDS_KEY = "daangn:price:keywords"
+KEY_PREFIX = "daangn:price:"
+TTL = 86400 * 35
+MAX_TRACKED = 500
+MAX_DAYS = 30
+
+DEFAULT_KEYWORDS = [normalize(k) for k in os.getenv("DAANGN_PRICE_KEYWORDS", "").split(",") if k.strip()]
+
+KST = timezone(timedelta(hours=9))
+
+
+def _key(keyword: str, region_id: int, day: str) -> str:
+    return f"{KEY_PREFIX}{keyword}:{region_id}:{day}"
+
+
+def _day(ts: int) -> str:
+    return datetime.fromtimestamp(ts, KST).strftime("%Y%m%d")
+
+
+# ── 추적 키워드 ───────────────────────────────────────────────────────────────
+
+
+def set_tracked(r, keywords: list[str]) -> list[str]:
+    """
+    추적 키워드 목록을 통째로 교체 (기본 키워드는 항상 포함). 정규화된 목록 반환
+
+    Raises:
+        ValueError: 키워드가 MAX_TRACKED개를 넘을 때
+    """
+    normalized = sorted({normalize(k) for k in [*keywords, *DEFAULT_KEYWORDS]} - {""})
+    if len(normalized) > MAX_TRACKED:
+        raise ValueError(f"시세 추적 키워드는 최대 {MAX_TRACKED}개까지 지정할 수 있습니다.")
+    pipe = r.pipeline()
+    pipe.delete(KEYWORDS_KEY)
+    if normalized:
+        pipe.sadd(KEYWORDS_KEY, *normalized)
+    pipe.execute()
+    logger.info("[price_rollup] 추적 키워드 %d개로 교체", len(normalized))
+    return normalized
+
+
+# ── 집계 (수집기) ─────────────────────────────────────────────────────────────
+
+
+async def tracked_keywords(ar) -> list[str]:
+    """추적 키워드 목록 (redis.asyncio). 기본 키워드는 매번 등록 (SADD는 멱등)"""
+    if DEFAULT_KEYWORDS:
+        await ar.sadd(KEYWORDS_KEY, *DEFAULT_KEYWORDS)
+    return sorted(await ar.smembers(KEYWORDS_KEY))
+
+
+async def add_articles(ar, region_id: int, articles: list[dict], keywords: list[str]) -> int:
+    """
+    새 매물 가격을 키워드별 일자 ZSET에 추가 (redis.asyncio, pipeline 1회).
+    같은 매물은 member(productId)가 같으므로 중복 집계되지 않는다.
+
+    Returns: 추가한 (키워드, 매물) 표본 수
+    """
+    if not keywords or not articles:
+        return 0
+    pipe = ar.pipeline(transaction=False)
+    touched = set()
+    added = 0
+
+    for a in articles:
+        ts = a.get("ts", 0)
+        if not ts:
+            continue
+        item = to_item(a)
+        if item["price"] <= 0:
+            continue
+        text = normalize(f"{item['title']} {a.get('content') or ''}")
+        for keyword in keywords:
+            if keyword in text:
+                key = _key(keyword, region_id, _day(ts))
+                pipe.zadd(key, {item["id"]: item["price"]})
+                touched.add(key)
+                added += 1
+
+    if not added:
+        return 0
+    for key in touched:
+        pipe.expire(key, TTL)
+    await pipe.execute()
+    return added
+
+
+# ── 조회 (API) ────────────────────────────────────────────────────────────────
+
+
+_PERCENTILES = (10, 50, 90)
+
+
+def _rank(count: int, p: float) -> int:
+    """nearest-rank 백분위의 0-based 순위"""
+    return int(max(1, -(-count * p // 100))) - 1
+
+
+def _stats(count: int, p10, p50, p90) -> dict:
+    if not count:
+        return {"count": 0, "median": None, "p10": None, "p90": None}
+    return {"count": count, "median": int(p50), "p10": int(p10), "p90": int(p90)}
+
+
+def rollup(r, keyword: str, region_id: int, days: int = 7) -> dict:
+    """
+    최근 days일(KST, 오늘 포함)의 일자별 시세 + 기간 전체 요약.
+
+    일자별 값은 ZSET 순위 조회(pipeline 2회), 기간 전체는 일자별 ZSET 합집합에서 구한다.
+    Redis 쓰기 없음 — 추적하지 않는 키워드는 tracked=false (집계 표본 없음).
+
+    Returns:
+        {"keyword", "region_id", "tracked", "days": [{"date", "count", "median", "p10", "p90"}, ...],
+         "summary": {"count", "median", "p10", "p90"}}
+    """
+    keyword = normalize(keyword)
+    tracked = keyword in DEFAULT_KEYWORDS or bool(r.sismember(KEYWORDS_KEY, keyword))
+
+    today = datetime.now(KST)
+    dates = [(today - timedelta(days=i)).strftime("%Y%m%d") for i in range(days)]
+    keys = [_key(keyword, region_id, d) for d in dates]
+
+    pipe = r.pipeline(transaction=False)
+    for key in keys:
+        pipe.zcard(key)
+    counts = pipe.execute()
+
+    pipe = r.pipeline(transaction=False)
+    for key, count in zip(keys, counts):
+        for p in _PERCENTILES if count else ():
+            idx = _rank(count, p)
+            pipe.zrange(key, idx, idx, withscores=True)
+    rows = iter(pipe.execute())
+
+    daily = []
+    for date, count in zip(dates, counts):
+        values = [next(rows)[0][1] for _ in _PERCENTILES] if count else [None] * len(_PERCENTILES)
+        daily.append({"date": date, **_stats(count, *values)})
+
+    # 기간 전체: 일자별 ZSET 합집합 (score 순 정렬 상태로 반환, 같은 매물은 1번만)
+    merged = r.zunion(keys, aggregate="MAX", withscores=True) if any(counts) else []
+    total = len(merged)
+    summary = _stats(total, *(merged[_rank(total, p)][1] if total else None for p in _PERCENTILES))
+
+    return {
+        "keyword": keyword,
+        "region_id": region_id,
+        "tracked": tracked,
+        "days": daily,
+        "summary": summary,
+    }
@@ -0,0 +1,286 @@
+"""
+번개장터 / 중고나라 최신 매물 수집기 — 키워드별 커서 기반 증분 폴링
+
+매 1분마다 실행 (리더 인스턴스만):
+  1. 추적 키워드 로드 (RECENT_POLL_KEYWORDS + 최근 IDLE_HOURS시간 안에 /api/{source}/recent 로 조회된 키워드)
+  2. 소스 × 키워드마다 기존 search(sort="recent")로 1페이지 조회 (MAX_WORKERS개 병렬).
+     순서는 키워드마다 번개장터/중고나라를 번갈아 두고, 직전 실행이 데드라인으로 시작하지 못한
+     대상부터 시작한다 (시작 위치는 Redis에 저장) — 목록 뒤쪽이 매번 잘려 폴링되지 않는 일이 없도록
+  3. seen_store 커서와 비교 → 새 매물 감지. 페이지가 모두 새 매물일 때만 다음 페이지를 읽고,
+     이미 확인한 ID가 나오면 멈춘다 (변화 없는 키워드는 매분 1페이지만 요청)
+  4. 커서 갱신 + 새 매물을 소스별 최근 매물 ZSET에 기록 → /api/{source}/recent 로 조회
+  5. 알림 발송 (TODO)
+
+검색 API가 키워드로 걸러서 돌려주므로 감지된 새 매물은 곧 그 키워드의 알림 대상이다.
+커서가 없는 키워드(최초 폴링)는 커서만 만들고 기록하지 않는다 (기존 매물 알림 폭주 방지).
+검색 실패/빈 결과는 커서를 건드리지 않는다.
+
+Redis 쓰기는 모든 검색이 끝난 뒤 pipeline 1회로 하고, 그 직전에 fencing token을 확인한다.
+
+Redis 키:
+  recent:keywords:queried        — 조회된 추적 키워드 (ZSET, score=마지막 조회 epoch, 번개장터/중고나라 공용,
+                                   최대 MAX_TRACKED개, IDLE_HOURS시간 조회가 없으면 제거)
+  {source}:recent:seen:{keyword} — 키워드별 커서 (seen_store, TTL 24h)
+  {source}:recent:items          — 감지된 새 매물 (ZSET, member=JSON, score=감지 epoch, 최근 HISTORY_MINUTES분)
+  recent:poll_offset             — 다음 실행의 시작 위치 (소스 × 키워드 목록 기준)
+  recent:last_run                — 최근 수집 상태 요약
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import leader
+import memory_profile
+import redis_conn
+import seen_store
+from listing_index import normalize
+from scrapers import bunjang_scraper, joongna_scraper
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+SEARCHERS = {
+    "bunjang": bunjang_scraper.search,
+    "joongna": joongna_scraper.search,
+}
+
+# 중고나라는 사이트 페이지 크기가 고정이고 count는 결과를 자르기만 하므로 페이지 전체를 받는다
+PAGE_SIZE = {"bunjang": 40, "joongna": 100}
+MAX_PAGES = int(os.getenv("RECENT_POLL_MAX_PAGES", "5"))  # 키워드당 최대 페이지 (적응형)
+MAX_WORKERS = 5
+
+INTERVAL_MINUTES = 1
+RUN_DEADLINE_SECONDS = INTERVAL_MINUTES * 60 - 10
+
+KEYWORDS_KEY = "recent:keywords:queried"
+LAST_RUN_KEY = "recent:last_run"
+OFFSET_KEY = "recent:poll_offset"
+MAX_TRACKED = 200
+IDLE_HOURS = int(os.getenv("RECENT_POLL_IDLE_HOURS", "24"))
+HISTORY_MINUTES = 60
+HISTORY_MAX = 5000
+
+DEFAULT_KEYWORDS = [normalize(k) for k in os.getenv("RECENT_POLL_KEYWORDS", "").split(",") if k.strip()]
+
+_redis = redis_conn.client()
+
+
+def _seen_key(source: str, keyword: str) -> str:
+    return f"{source}:recent:seen:{keyword}"
+
+
+def _items_key(source: str) -> str:
+    return f"{source}:recent:items"
+
+
+# ── 추적 키워드 ───────────────────────────────────────────────────────────────
+
+
+def _evict_idle(r, now: float):
+    r.zremrangebyscore(KEYWORDS_KEY, "-inf", now - IDLE_HOURS * 3600)
+
+
+def tracked_keywords(r) -> list[str]:
+    """추적 키워드 목록 — 기본 키워드 + 최근 IDLE_HOURS시간 안에 조회된 키워드 (오래된 키워드는 여기서 제거)"""
+    _evict_idle(r, time.time())
+    return sorted(set(DEFAULT_KEYWORDS) | set(r.zrange(KEYWORDS_KEY, 0, -1)))
+
+
+def track(r, keyword: str) -> bool:
+    """
+    조회된 키워드의 마지막 조회 시각 갱신. 추적 중이 아니면 추가 (다음 수집부터 폴링).
+
+    IDLE_HOURS시간 조회가 없던 키워드를 먼저 제거하고, 그래도 MAX_TRACKED개가 차 있으면 추가하지 않는다.
+
+    Returns: 추적 중인지 (False면 이 키워드는 폴링되지 않음)
+    """
+    if keyword in DEFAULT_KEYWORDS:
+        return True
+    now = time.time()
+    if r.zscore(KEYWORDS_KEY, keyword) is not None:
+        r.zadd(KEYWORDS_KEY, {keyword: now})
+        return True
+    _evict_idle(r, now)
+    if r.zcard(KEYWORDS_KEY) >= MAX_TRACKED:
+        logger.warning("[recent_poller] 추적 키워드 %d개 가득 참 — 추적하지 않음: %s", MAX_TRACKED, keyword)
+        return False
+    r.zadd(KEYWORDS_KEY, {keyword: now})
+    logger.info("[recent_poller] 추적 키워드 추가: %s", keyword)
+    return True
+
+
+# ── 폴링 ──────────────────────────────────────────────────────────────────────
+
+
+def _poll(source: str, keyword: str, cursor_raw: str | None, deadline: float) -> seen_store.Scan | None:
+    """
+    한 소스 × 키워드를 최신순으로 읽어 커서와 비교 (Redis I/O 없음).
+
+    Returns: Scan (1페이지가 비었거나 검색 실패면 None — 커서 유지)
+    """
+    search = SEARCHERS[source]
+    page = search(keyword, page=1, count=PAGE_SIZE[source], sort="recent")["items"]
+    if not page:
+        return None
+
+    scan = seen_store.Scan(cursor_raw)
+    scan.add_page(page)
+    while scan.more and scan.pages < MAX_PAGES and time.monotonic() < deadline:
+        scan.add_page(search(keyword, page=scan.pages + 1, count=PAGE_SIZE[source], sort="recent")["items"])
+    return scan
+
+
+def poll_recent(fence_token: int | None = None) -> dict:
+    """
+    추적 키워드 전체를 번개장터/중고나라에서 증분 폴링 → 새 매물 기록.
+
+    Args:
+        fence_token: 리더 선출 fencing token (LeaderElector.guard가 전달).
+                     지정 시 Redis 쓰기 전에 token이 최신인지 확인하고, 아니면 결과를 버린다.
+
+    Returns:
+        수집 결과 요약 dict
+    """
+    if not redis_conn.available():
+        logger.error("[recent_poller] Redis 연결 없음 — 수집 중단")
+        return {"error": "Redis 연결 없음"}
+
+    with memory_profile.run("recent") as mem:
+        return _poll_recent(fence_token, mem)
+
+
+def _poll_recent(fence_token: int | None, mem: memory_profile.Run) -> dict:
+    """poll_recent 본문 — 조기 반환해도 memory_profile.run이 실행을 마감한다"""
+    start_time = time.time()
+    deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+    keywords = tracked_keywords(_redis)
+    if not keywords:
+        return {"error": "추적 키워드 없음 (RECENT_POLL_KEYWORDS 또는 /api/{source}/recent 조회로 등록)"}
+
+    targets = [(source, keyword) for keyword in keywords for source in SEARCHERS]
+    offset = int(_redis.get(OFFSET_KEY) or 0) % len(targets)
+    targets = targets[offset:] + targets[:offset]
+    cursors = _redis.mget([_seen_key(source, keyword) for source, keyword in targets])
+    started = [False] * len(targets)
+
+    def _run(i):
+        if time.monotonic() >= deadline:
+            return None
+        started[i] = True
+        target = targets[i]
+        try:
+            return _poll(*target, cursors[i], deadline)
+        except Exception as e:
+            logger.warning("[recent_poller] %s 폴링 실패 (keyword=%s): %s", target[0], target[1], e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        scans = list(pool.map(_run, range(len(targets))))
+
+    # 수집 중 리더가 바뀌었으면 커서/새 매물을 쓰지 않는다
+    if fence_token is not None and not leader.is_fence_current(_redis, fence_token):
+        logger.warning("[recent_poller] 리더 권한 상실 (token=%s) — 수집 결과 폐기", fence_token)
+        return {"error": "리더 권한 상실 — 수집 결과 폐기"}
+
+    now = time.time()
+    summary = {source: {"polled": 0, "pages": 0, "new_listings": 0} for source in SEARCHERS}
+    pipe = _redis.pipeline(transaction=False)
+
+    for (source, keyword), scan in zip(targets, scans):
+        if scan is None:
+            continue
+        stats = summary[source]
+        stats["polled"] += 1
+        stats["pages"] += scan.pages
+        pipe.setex(_seen_key(source, keyword), seen_store.TTL, scan.dumps())
+        if not scan.primed or not scan.new:
+            continue
+        stats["new_listings"] += len(scan.new)
+        pipe.zadd(_items_key(source), {
+            json.dumps({**item, "keyword": keyword}, ensure_ascii=False): now for item in scan.new
+        })
+
+        # ── 알림 발송 (키워드별 새 매물) ──
+        # TODO: DB에서 keyword 구독 사용자 조회 후 FCM 알림 발송
+
+    for source in SEARCHERS:
+        key = _items_key(source)
+        pipe.zremrangebyscore(key, "-inf", now - HISTORY_MINUTES * 60)
+        pipe.zremrangebyrank(key, 0, -HISTORY_MAX - 1)
+
+    last_run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "keywords": len(keywords),
+        "skipped": sum(scan is None for scan in scans),
+        "not_started": started.count(False),
+        **summary,
+        "duration_seconds": round(time.time() - start_time, 2),
+    }
+    last_run.update(mem.end())
+    # 데드라인으로 시작하지 못한 대상이 있으면 다음 실행은 거기서부터
+    pipe.set(OFFSET_KEY, (offset + sum(started)) % len(targets))
+    pipe.set(LAST_RUN_KEY, json.dumps(last_run, ensure_ascii=False))
+    pipe.execute()
+
+    logger.info(
+        "[recent_poller] 수집 완료: 키워드 %d개, 번개장터 새 매물 %d건 (%d페이지), 중고나라 새 매물 %d건 (%d페이지), 소요 %.1f초",
+        len(keywords),
+        summary["bunjang"]["new_listings"],
+        summary["bunjang"]["pages"],
+        summary["joongna"]["new_listings"],
+        summary["joongna"]["pages"],
+        last_run["duration_seconds"],
+    )
+    return last_run
+
+
+# ── 조회 (API) ────────────────────────────────────────────────────────────────
+
+
+def recent_items(r, source: str, within_minutes: int, keyword: str | None = None) -> list[dict]:
+    """
+    최근 within_minutes분 안에 감지된 새 매물 (최신순, 같은 매물은 1번만).
+
+    keyword 지정 시 그 키워드로 감지된 매물만 반환한다.
+    """
+    raw = r.zrevrangebyscore(_items_key(source), "+inf", time.time() - within_minutes * 60)
+    items, ids = [], set()
+    for member in raw:
+        item = json.loads(member)
+        if keyword and item["keyword"] != keyword:
+            continue
+        if item["id"] not in ids:
+            ids.add(item["id"])
+            items.append(item)
+    return items
+
+
+# ── APScheduler 등록 ──────────────────────────────────────────────────────────
+
+
+def create_recent_scheduler(elector: leader.LeaderElector | None = None):
+    """
+    스케줄러 인스턴스 생성 및 job 등록 (매분 30초 실행 — 당근 전국 수집과 CPU 사용 시점을 어긋나게).
+
+    elector가 주어지면 리더 인스턴스에서만 수집한다.
+    """
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    job = poll_recent if elector is None else elector.guard(poll_recent)
+
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        job,
+        trigger=CronTrigger(second=30),
+        id="recent_poller",
+        name="번개장터/중고나라 최신 매물 수집",
+        replace_existing=True,
+        max_instances=1,
+    )
+    return scheduler
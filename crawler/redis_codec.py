@@ -0,0 +1,48 @@
+"""
+대용량 Redis 값 압축 envelope
+
+지역 계층/구·군 목록/동 목록/location 캐시/seen_ids처럼 큰 JSON 값은 읽을 때마다
+네트워크로 그대로 전송되므로, 임계값 이상이면 압축해서 저장한다.
+
+저장 형식:
+  평문 JSON   : '[...]' / '{...}'                      — 임계값 미만 또는 롤아웃 이전 값
+  압축 envelope: 'z1:' + base64(zlib.compress(JSON, 1)) — 임계값 이상
+
+loads()는 두 형식을 모두 읽으므로 기존 평문 값과 섞여 있어도 그대로 동작한다.
+Redis 클라이언트가 decode_responses=True(문자열)이므로 압축 바이트는 base64로 감싼다.
+코덱은 표준 라이브러리 zlib(level 1 — 가장 빠른 설정)을 사용한다.
+"""
+
+import base64
+import json
+import os
+import zlib
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+PREFIX = "z1:"
+THRESHOLD = int(os.getenv("REDIS_COMPRESS_THRESHOLD", "1024"))
+LEVEL = 1
+
+
+# ── 인코딩 / 디코딩 ───────────────────────────────────────────────────────────
+
+
+def dumps(obj) -> str:
+    """obj → JSON 문자열. THRESHOLD 바이트 이상이면 압축 envelope"""
+    raw = json.dumps(obj, ensure_ascii=False)
+    encoded = raw.encode("utf-8")
+    if len(encoded) < THRESHOLD:
+        return raw
+    return PREFIX + base64.b64encode(zlib.compress(encoded, LEVEL)).decode("ascii")
+
+
+def loads(value: str | bytes | None):
+    """dumps() 결과 또는 기존 평문 JSON → obj. None이면 None"""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if value.startswith(PREFIX):
+        return json.loads(zlib.decompress(base64.b64decode(value[len(PREFIX):])).decode("utf-8"))
+    return json.loads(value)
@@ -0,0 +1,88 @@
+"""
+공유 Redis 연결 — 지연 연결 + 백그라운드 상태 확인
+
+모듈 import 시점에는 네트워크 연결을 하지 않는다 (redis.from_url은 첫 명령 때 연결).
+연결 상태는 백그라운드 스레드가 MONITOR_INTERVAL초마다 PING으로 확인하므로,
+Redis가 늦게 뜨거나 잠시 끊겨도 프로세스 재시작 없이 자동으로 복구된다.
+
+  client()    — 공유 클라이언트 (항상 반환, 명령 실패는 호출자가 처리)
+  get()       — 마지막 확인에서 연결 불가였으면 None (확인 전이면 클라이언트 반환)
+  available() — get()이 None이 아닌지
+  status()    — /health용 상태
+
+연결 시도는 CONNECT_TIMEOUT초 안에 실패하므로 Redis 장애 시에도 요청이 오래 막히지 않는다.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1"))
+MONITOR_INTERVAL = 5
+
+# ── 연결 상태 ─────────────────────────────────────────────────────────────────
+
+_client = redis.from_url(URL, decode_responses=True, socket_connect_timeout=CONNECT_TIMEOUT)
+_available: bool | None = None  # None = 아직 확인 전
+_checked_at: float | None = None
+_monitor: threading.Thread | None = None
+_monitor_lock = threading.Lock()
+
+
+def check() -> bool:
+    """PING으로 연결 상태 확인 후 기록 (상태가 바뀔 때만 로그)"""
+    global _available, _checked_at
+    try:
+        _client.ping()
+        ok = True
+    except Exception as e:
+        ok = False
+        if _available is not False:
+            logger.warning("[redis_conn] Redis 연결 실패: %s", e)
+    if ok and _available is not True:
+        logger.info("[redis_conn] Redis 연결 성공: %s", URL)
+    _available = ok
+    _checked_at = time.time()
+    return ok
+
+
+def _run_monitor():
+    while True:
+        check()
+        time.sleep(MONITOR_INTERVAL)
+
+
+def start_monitor():
+    """백그라운드 상태 확인 스레드 시작 (프로세스당 1개, 중복 호출 무시)"""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = threading.Thread(target=_run_monitor, name="redis-monitor", daemon=True)
+            _monitor.start()
+
+
+def client() -> redis.Redis:
+    start_monitor()
+    return _client
+
+
+def available() -> bool:
+    """마지막 확인 결과. 확인 전이면 True로 보고 명령을 시도한다 (실패는 호출자가 처리)"""
+    start_monitor()
+    return _available is not False
+
+
+def get() -> redis.Redis | None:
+    return _client if available() else None
+
+
+def status() -> dict:
+    return {"available": _available, "checked_at": _checked_at}
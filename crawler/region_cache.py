@@ -0,0 +1,202 @@
+"""
+당근 지역 데이터 프로세스 내 캐시 (버전 + Redis pub/sub 무효화)
+
+시/도·구/군·동 데이터는 하루 1회만 바뀌므로, 각 API 프로세스는 전체를 메모리에 올려두고
+모든 조회를 메모리에서 처리한다.
+
+  - region_scheduler가 수집을 마치면 publish_update()로 버전을 INCR하고 pub/sub으로 알린다.
+  - 구독 스레드가 메시지를 받으면 캐시를 stale로 표시하고, 다음 조회 때 1회만 Redis에서 다시 읽는다.
+  - pub/sub 메시지를 놓쳐도 VERSION_CHECK_INTERVAL초마다 버전 키를 확인하여 복구한다.
+
+Redis 키:
+  daangn:regions:version     — 지역 데이터 버전 (수집 완료 시 INCR)
+  daangn:regions:invalidate  — pub/sub 채널 (payload: 새 버전)
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+import redis_codec
+import redis_conn
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+VERSION_KEY = "daangn:regions:version"
+CHANNEL = "daangn:regions:invalidate"
+VERSION_CHECK_INTERVAL = 30
+_MGET_CHUNK = 100
+
+# ── Redis 연결 (공유 지연 연결 — import 시 네트워크 연결 없음) ───────────────
+
+_redis = redis_conn.client()
+
+
+# ── 캐시 상태 ─────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """특정 버전의 지역 데이터 (생성 후 변경하지 않음)"""
+
+    version: int
+    regions: list[dict] | None
+    districts: list[dict] | None
+    dongs: dict[int, list[dict]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+    # 저장된 원본 값의 해시 — HTTP ETag용. 버전 카운터는 Redis flush/재구축 후 같은 번호로 돌아올 수 있다
+    digest: str = ""
+
+
+_snapshot: Snapshot | None = None
+_stale = True
+_lock = threading.Lock()
+_subscriber: threading.Thread | None = None
+
+
+def _load() -> Snapshot:
+    """Redis에서 전체 지역 데이터를 읽어 스냅샷 생성"""
+    pipe = _redis.pipeline(transaction=False)
+    pipe.get(VERSION_KEY)
+    pipe.get("daangn:regions:all")
+    pipe.get("daangn:districts:all")
+    version_raw, regions_raw, districts_raw = pipe.execute()
+
+    regions = redis_codec.loads(regions_raw) if regions_raw else None
+    districts = redis_codec.loads(districts_raw) if districts_raw else None
+    digest = hashlib.blake2b(digest_size=8)
+    for raw in (regions_raw, districts_raw):
+        digest.update((raw or "").encode("utf-8"))
+
+    dongs: dict[int, list[dict]] = {}
+    region_ids = [d["regionId"] for d in districts or []]
+    for i in range(0, len(region_ids), _MGET_CHUNK):
+        chunk = region_ids[i : i + _MGET_CHUNK]
+        values = _redis.mget([f"daangn:dongs:{rid}" for rid in chunk])
+        for rid, raw in zip(chunk, values):
+            if raw:
+                dongs[rid] = redis_codec.loads(raw)
+                digest.update(f"{rid}:".encode("utf-8") + raw.encode("utf-8"))
+
+    snapshot = Snapshot(
+        version=int(version_raw or 0),
+        regions=regions,
+        districts=districts,
+        dongs=dongs,
+        loaded_at=time.time(),
+        digest=digest.hexdigest(),
+    )
+    logger.info(
+        "[region_cache] 지역 데이터 로드 (version=%d, 구/군 %d개, 동 목록 %d개)",
+        snapshot.version,
+        len(districts or []),
+        len(dongs),
+    )
+    return snapshot
+
+
+def _listen():
+    """pub/sub 구독 스레드 — 무효화 메시지를 받으면 stale 표시 (연결이 끊기면 재구독)"""
+    global _stale
+    while True:
+        try:
+            pubsub = _redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            for message in pubsub.listen():
+                if message.get("type") == "message":
+                    logger.info("[region_cache] 무효화 메시지 수신 (version=%s)", message.get("data"))
+                    _stale = True
+        except Exception as e:
+            logger.warning("[region_cache] pub/sub 구독 끊김, 5초 후 재시도: %s", e)
+            _stale = True
+            time.sleep(5)
+
+
+def _ensure_subscriber():
+    global _subscriber
+    if _subscriber is None:
+        _subscriber = threading.Thread(target=_listen, name="region-cache-sub", daemon=True)
+        _subscriber.start()
+
+
+def get_snapshot() -> Snapshot | None:
+    """
+    현재 지역 데이터 스냅샷. 무효화되었거나 버전 확인 주기가 지났으면 Redis에서 다시 로드.
+    Redis 연결 불가 중에는 마지막으로 로드한 스냅샷(없으면 None)을 그대로 반환한다.
+    """
+    global _snapshot, _stale
+    if not redis_conn.available():
+        return _snapshot
+
+    snapshot = _snapshot
+    if snapshot is not None and not _stale and time.time() - snapshot.loaded_at < VERSION_CHECK_INTERVAL:
+        return snapshot
+
+    with _lock:
+        _ensure_subscriber()
+        snapshot = _snapshot
+        if snapshot is not None and not _stale:
+            if time.time() - snapshot.loaded_at < VERSION_CHECK_INTERVAL:
+                return snapshot
+            # 주기 확인: 버전이 같으면 다시 읽지 않고 확인 시각만 갱신
+            if int(_redis.get(VERSION_KEY) or 0) == snapshot.version and snapshot.regions is not None:
+                snapshot = Snapshot(
+                    version=snapshot.version,
+                    regions=snapshot.regions,
+                    districts=snapshot.districts,
+                    dongs=snapshot.dongs,
+                    loaded_at=time.time(),
+                    digest=snapshot.digest,
+                )
+                _snapshot = snapshot
+                return snapshot
+
+        _stale = False
+        try:
+            _snapshot = _load()
+        except Exception:
+            _stale = True
+            raise
+        # 데이터가 아직 없으면 다음 조회 때 다시 확인
+        if _snapshot.regions is None:
+            _stale = True
+        return _snapshot
+
+
+def regions() -> list[dict] | None:
+    snapshot = get_snapshot()
+    return snapshot.regions if snapshot else None
+
+
+def districts() -> list[dict] | None:
+    snapshot = get_snapshot()
+    return snapshot.districts if snapshot else None
+
+
+def dongs(region_id: int) -> list[dict] | None:
+    snapshot = get_snapshot()
+    return snapshot.dongs.get(region_id) if snapshot else None
+
+
+def peek() -> Snapshot | None:
+    """로드 없이 현재 메모리의 스냅샷만 반환 (/health 등 조회 비용이 없어야 하는 곳)"""
+    return _snapshot
+
+
+def invalidate():
+    """이 프로세스의 캐시를 stale로 표시 (다음 조회 때 다시 로드)"""
+    global _stale
+    _stale = True
+
+
+def publish_update(r) -> int:
+    """지역 데이터 버전 증가 + 모든 프로세스에 무효화 알림. 새 버전 반환"""
+    version = r.incr(VERSION_KEY)
+    r.publish(CHANNEL, version)
+    invalidate()
+    logger.info("[region_cache] 지역 데이터 버전 갱신 → %d", version)
+    return version
@@ -1,27 +1,37 @@
 """
 당근 전국 지역 데이터 수집 스케줄러
 
-매일 새벽 4시 실행:
+매일 새벽 4시 실행 (증분 모드):
   1단계: https://www.daangn.com/kr/regions/ 에서 시/도 + 구/군 수집
-  2단계: 각 구/군의 동/읍/면 정보를 Location API로 40개씩 병렬 수집
+  2단계: 저장된 구/군 목록과 비교하여 새로 생기거나 바뀐 구/군, 동 목록이 없는 구/군,
+         순환 재검증 구간(REVERIFY_DAYS일에 한 바퀴)의 동/읍/면만 Location API로 50개씩 병렬 수집
+  3단계: 변경분은 파이프라인으로 일괄 저장, 나머지 키는 TTL만 연장
 
 Redis 키:
   daangn:regions:all       — 시/도 + 구/군 계층 목록 (TTL 48h)
   daangn:districts:all     — 구/군 플랫 리스트 (TTL 48h)
   daangn:dongs:{regionId}  — 구/군별 동 목록 (TTL 48h)
   daangn:location:{name}   — 기존 location 캐시 갱신 (TTL 24h)
+  daangn:regions:reverify_cursor — 순환 재검증 위치 (regionId 순 인덱스)
+  daangn:regions:retry     — 직전 실행에서 동 재수집에 실패한 구/군 regionId (SET, 다음 실행에서 다시 수집)
+  daangn:regions:version   — 수집 완료 시 INCR + daangn:regions:invalidate 발행 (region_cache 참고)
 """
 
 import asyncio
 import json
 import logging
-import os
 import re
 
 import aiohttp
-import redis
 import requests
 
+import leader
+import memory_profile
+import region_cache
+import redis_codec
+import redis_conn
+import upstream_budget
+
 logger = logging.getLogger(__name__)
 
 # ── 상수 ──────────────────────────────────────────────────────────────────────
@@ -48,22 +58,20 @@ LOCATION_API_HEADERS = {
 }
 
 BATCH_SIZE = 50
+BUDGET_WAIT_SECONDS = 60  # 배치당 업스트림 예산 대기 한도 (넘으면 그 배치는 실패로 처리)
 TTL_48H = 86400 * 2
 TTL_24H = 86400
 
-_REMIX_RE = re.compile(r"window\.__remixContext\s*=\s*(\{.*?\})\s*;", re.DOTALL)
+REVERIFY_DAYS = 7  # 변경이 없어도 모든 구/군을 7일에 한 번은 재수집
+REVERIFY_CURSOR_KEY = "daangn:regions:reverify_cursor"
+RETRY_KEY = "daangn:regions:retry"
+WRITE_BATCH_SIZE = 100
 
-# ── Redis 연결 ────────────────────────────────────────────────────────────────
+_REMIX_RE = re.compile(r"window\.__remixContext\s*=\s*(\{.*?\})\s*;", re.DOTALL)
 
-_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# ── Redis 연결 (공유 지연 연결 — import 시 네트워크 연결 없음) ───────────────
 
-try:
-    _redis = redis.from_url(_REDIS_URL, decode_responses=True)
-    _redis.ping()
-    logger.info("[region_scheduler] Redis 연결 성공: %s", _REDIS_URL)
-except Exception as e:
-    logger.warning("[region_scheduler] Redis 연결 실패: %s", e)
-    _redis = None
+_redis = redis_conn.client()
 
 
 # ── 1단계: regions 페이지에서 시/도 + 구/군 수집 ──────────────────────────────
@@ -119,15 +127,18 @@ def _parse_regions(remix_data: dict) -> tuple[list[dict], list[dict]]:
     return provinces, districts
 
 
-# ── 2단계: 동/읍/면 수집 (20개씩 병렬) ─────────────────────────────────────────
+# ── 2단계: 동/읍/면 수집 (50개씩 병렬) ─────────────────────────────────────────
 
 
 async def _fetch_dongs_for_district(
     session: aiohttp.ClientSession, district: dict
-) -> tuple[str, int]:
-    """단일 구/군의 동 목록을 비동기로 수집하여 Redis에 저장"""
+) -> tuple[dict, list[dict] | None, list[dict]]:
+    """
+    단일 구/군의 동 목록을 비동기로 수집 (Redis 쓰기는 호출자가 파이프라인으로 일괄 처리).
+
+    Returns: (district, dong_list, locations) — 실패 시 dong_list=None
+    """
     name = district["name"]
-    region_id = district["regionId"]
 
     try:
         timeout = aiohttp.ClientTimeout(total=10)
@@ -138,32 +149,21 @@ async def _fetch_dongs_for_district(
 
         locations = body.get("locations", [])
         dong_list = [loc for loc in locations if loc.get("depth") == 3]
-
-        if _redis:
-            # 구/군별 동 목록 저장
-            _redis.set(
-                f"daangn:dongs:{region_id}",
-                json.dumps(dong_list, ensure_ascii=False),
-                ex=TTL_48H,
-            )
-            # 기존 location 캐시도 갱신
-            _redis.setex(
-                f"daangn:location:{name}",
-                TTL_24H,
-                json.dumps(locations, ensure_ascii=False),
-            )
-
-        return name, len(dong_list)
+        return district, dong_list, locations
 
     except Exception as e:
         logger.error("동 수집 실패 [%s]: %s", name, e)
-        return name, -1
+        return district, None, []
+
 
+async def _collect_dongs_in_batches(districts: list[dict]) -> tuple[list[tuple], int]:
+    """
+    구/군 목록을 BATCH_SIZE(50)개씩 나누어 병렬 수집.
 
-async def _collect_dongs_in_batches(districts: list[dict]):
-    """구/군 목록을 BATCH_SIZE(20)개씩 나누어 병렬 수집"""
+    Returns: ([(district, dong_list, locations), ...] 성공 목록, 실패 수)
+    """
     total_batches = (len(districts) + BATCH_SIZE - 1) // BATCH_SIZE
-    total_success = 0
+    fetched = []
     total_fail = 0
 
     connector = aiohttp.TCPConnector(limit=BATCH_SIZE)
@@ -172,17 +172,23 @@ async def _collect_dongs_in_batches(districts: list[dict]):
     ) as session:
         for i in range(0, len(districts), BATCH_SIZE):
             batch = districts[i : i + BATCH_SIZE]
+            if not await upstream_budget.acquire_async(
+                redis_conn.get(), len(batch), upstream_budget.LANE_BACKGROUND, timeout=BUDGET_WAIT_SECONDS
+            ):
+                logger.warning("[region_scheduler] 업스트림 예산 소진 — 배치 %d개 구/군 건너뜀", len(batch))
+                total_fail += len(batch)
+                continue
             tasks = [_fetch_dongs_for_district(session, d) for d in batch]
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             batch_success = 0
             for r in results:
-                if isinstance(r, tuple) and r[1] >= 0:
+                if isinstance(r, tuple) and r[1] is not None:
+                    fetched.append(r)
                     batch_success += 1
                 else:
                     total_fail += 1
 
-            total_success += batch_success
             batch_num = i // BATCH_SIZE + 1
             logger.info(
                 "[region_scheduler] 배치 %d/%d 완료 (%d/%d 성공)",
@@ -196,19 +202,144 @@ async def _collect_dongs_in_batches(districts: list[dict]):
             if i + BATCH_SIZE < len(districts):
                 await asyncio.sleep(0.3)
 
-    return total_success, total_fail
+    return fetched, total_fail
+
+
+# ── 증분 갱신: 변경 감지 + 파이프라인 쓰기 ─────────────────────────────────────
+
+
+def _plan_refresh(
+    districts: list[dict], prev_districts: list[dict], full: bool
+) -> tuple[list[dict], list[dict], int | None]:
+    """
+    동 목록을 다시 수집할 구/군과 삭제할 구/군 결정 (Redis 읽기만 — 쓰기는 _write_region_data).
+
+    재수집 대상:
+      - 새로 생긴 구/군, 이름/소속 시도가 바뀐 구/군
+      - daangn:dongs:{regionId} 키가 없는 구/군 (TTL 만료)
+      - 직전 실행에서 재수집에 실패한 구/군 (daangn:regions:retry — 바뀐 구/군의 변경을 잊지 않도록)
+      - 순환 재검증: 매 실행마다 REVERIFY_DAYS일에 한 바퀴 도는 구간
+      - full=True이면 전체
+
+    Returns: (재수집 대상, 삭제된 구/군, 다음 순환 재검증 위치 — full이면 None)
+    """
+    new_ids = {d["regionId"] for d in districts}
+    prev_by_id = {d["regionId"]: d for d in prev_districts}
+    removed = [d for d in prev_districts if d["regionId"] not in new_ids]
+
+    if full or not prev_districts:
+        return list(districts), removed, None
+
+    retry_ids = {int(rid) for rid in _redis.smembers(RETRY_KEY)}
+    targets = {
+        d["regionId"]: d
+        for d in districts
+        if prev_by_id.get(d["regionId"]) != d or d["regionId"] in retry_ids
+    }
+
+    pipe = _redis.pipeline(transaction=False)
+    for d in districts:
+        pipe.exists(f"daangn:dongs:{d['regionId']}")
+    for d, exists in zip(districts, pipe.execute()):
+        if not exists:
+            targets[d["regionId"]] = d
+
+    # 순환 재검증 — regionId 순으로 매 실행 ceil(구/군 수 / REVERIFY_DAYS)개씩
+    ordered = sorted(districts, key=lambda d: d["regionId"])
+    per_run = -(-len(ordered) // REVERIFY_DAYS)
+    cursor = int(_redis.get(REVERIFY_CURSOR_KEY) or 0) % max(1, len(ordered))
+    for j in range(per_run):
+        d = ordered[(cursor + j) % len(ordered)]
+        targets.setdefault(d["regionId"], d)
+
+    return list(targets.values()), removed, (cursor + per_run) % max(1, len(ordered))
+
+
+def _write_region_data(
+    provinces: list[dict],
+    districts: list[dict],
+    fetched: list[tuple],
+    removed: list[dict],
+    prev_districts: list[dict],
+    failed: list[dict],
+    reverify_cursor: int | None,
+):
+    """
+    변경분을 WRITE_BATCH_SIZE개 단위 파이프라인으로 일괄 저장.
+
+    재수집하지 않은 구/군은 값을 다시 쓰지 않고 TTL만 연장한다.
+    재수집에 실패한 구/군(failed)은 다음 실행의 재수집 대상으로 남기고, 순환 재검증 위치도 여기서 함께 쓴다.
+    """
+    prev_by_id = {d["regionId"]: d for d in prev_districts}
+    fetched_ids = {district["regionId"] for district, _, _ in fetched}
+
+    commands = [
+        ("set", "daangn:regions:all", redis_codec.dumps(provinces), TTL_48H),
+        ("set", "daangn:districts:all", redis_codec.dumps(districts), TTL_48H),
+    ]
+    for district, dong_list, locations in fetched:
+        commands.append(
+            ("set", f"daangn:dongs:{district['regionId']}", redis_codec.dumps(dong_list), TTL_48H)
+        )
+        commands.append(
+            ("set", f"daangn:location:{district['name']}", redis_codec.dumps(locations), TTL_24H)
+        )
+        # 이름이 바뀐 구/군은 옛 이름의 location 캐시 삭제
+        prev = prev_by_id.get(district["regionId"])
+        if prev and prev["name"] != district["name"]:
+            commands.append(("delete", f"daangn:location:{prev['name']}", None, None))
+    for d in districts:
+        if d["regionId"] not in fetched_ids:
+            commands.append(("expire", f"daangn:dongs:{d['regionId']}", None, TTL_48H))
+            commands.append(("expire", f"daangn:location:{d['name']}", None, TTL_24H))
+    for d in removed:
+        commands.append(("delete", f"daangn:dongs:{d['regionId']}", None, None))
+        commands.append(("delete", f"daangn:location:{d['name']}", None, None))
+    commands.append(("delete", RETRY_KEY, None, None))
+    if failed:
+        commands.append(("sadd", RETRY_KEY, [d["regionId"] for d in failed], None))
+    if reverify_cursor is not None:
+        commands.append(("set", REVERIFY_CURSOR_KEY, reverify_cursor, None))
+
+    for i in range(0, len(commands), WRITE_BATCH_SIZE):
+        pipe = _redis.pipeline(transaction=False)
+        for op, key, value, ttl in commands[i : i + WRITE_BATCH_SIZE]:
+            if op == "set":
+                pipe.set(key, value, ex=ttl)
+            elif op == "expire":
+                pipe.expire(key, ttl)
+            elif op == "sadd":
+                pipe.sadd(key, *value)
+            else:
+                pipe.delete(key)
+        pipe.execute()
+
+    return len(commands)
 
 
 # ── 메인 수집 함수 ─────────────────────────────────────────────────────────────
 
 
-def collect_all_regions():
-    """전국 지역 데이터 수집 → Redis 저장 (1단계 + 2단계)"""
-    if not _redis:
+def collect_all_regions(fence_token: int | None = None, full: bool = False):
+    """
+    전국 지역 데이터 수집 → Redis 저장 (1단계 + 2단계)
+
+    기본은 증분 모드: 저장된 구/군 목록과 비교하여 바뀐 구/군(+ 순환 재검증 구간)만
+    Location API로 다시 수집한다. full=True이면 전체 구/군을 다시 수집한다.
+
+    fence_token이 주어지면 (LeaderElector.guard 경유) Redis 쓰기 전에 리더 권한을 확인한다.
+    """
+    if not redis_conn.available():
         logger.error("[region_scheduler] Redis 연결 없음 — 수집 중단")
         return
 
-    logger.info("[region_scheduler] 전국 지역 데이터 수집 시작")
+    with memory_profile.run("region"):
+        _collect_all_regions(fence_token, full)
+
+
+def _collect_all_regions(fence_token: int | None, full: bool):
+    """collect_all_regions 본문 — 조기 반환해도 memory_profile.run이 실행을 마감한다"""
+    logger.info("[region_scheduler] 전국 지역 데이터 수집 시작 (%s)", "전체" if full else "증분")
 
     # ── 1단계: 시/도 + 구/군 수집 ──
     try:
@@ -225,49 +356,69 @@ def collect_all_regions():
             logger.error("[region_scheduler] 1단계 재시도 실패: %s — 수집 중단", e2)
             return
 
-    # Redis에 저장
-    _redis.set(
-        "daangn:regions:all",
-        json.dumps(provinces, ensure_ascii=False),
-        ex=TTL_48H,
-    )
-    _redis.set(
-        "daangn:districts:all",
-        json.dumps(districts, ensure_ascii=False),
-        ex=TTL_48H,
-    )
-
     logger.info(
         "[region_scheduler] 1단계 완료: %d개 시/도, %d개 구/군",
         len(provinces),
         len(districts),
     )
 
-    # ── 2단계: 동/읍/면 수집 (20개씩 병렬) ──
-    try:
-        success, fail = asyncio.run(_collect_dongs_in_batches(districts))
-        logger.info(
-            "[region_scheduler] 2단계 완료: 성공 %d / 실패 %d (전체 %d개 구/군)",
-            success,
-            fail,
-            len(districts),
-        )
-    except Exception as e:
-        logger.error("[region_scheduler] 2단계 실패: %s", e)
+    # ── 2단계: 변경된 구/군의 동/읍/면만 수집 (50개씩 병렬) ──
+    prev_json = _redis.get("daangn:districts:all")
+    prev_districts = redis_codec.loads(prev_json) if prev_json else []
+    targets, removed, reverify_cursor = _plan_refresh(districts, prev_districts, full)
+    logger.info(
+        "[region_scheduler] 2단계 대상: %d/%d개 구/군 재수집, %d개 삭제",
+        len(targets),
+        len(districts),
+        len(removed),
+    )
 
-    logger.info("[region_scheduler] 전국 지역 데이터 수집 완료")
+    fetched, fail = [], 0
+    if targets:
+        try:
+            fetched, fail = asyncio.run(_collect_dongs_in_batches(targets))
+            logger.info(
+                "[region_scheduler] 2단계 완료: 성공 %d / 실패 %d (대상 %d개 구/군)",
+                len(fetched),
+                fail,
+                len(targets),
+            )
+        except Exception as e:
+            logger.error("[region_scheduler] 2단계 실패: %s", e)
+
+    if fence_token is not None and not leader.is_fence_current(_redis, fence_token):
+        logger.warning("[region_scheduler] 리더 권한 상실 (token=%s) — 저장 중단", fence_token)
+        return
+
+    # ── 3단계: 변경분 파이프라인 저장 ──
+    fetched_ids = {district["regionId"] for district, _, _ in fetched}
+    failed = [d for d in targets if d["regionId"] not in fetched_ids]
+    if failed:
+        logger.warning("[region_scheduler] %d개 구/군 동 재수집 실패 — 다음 실행에서 다시 수집", len(failed))
+    written = _write_region_data(
+        provinces, districts, fetched, removed, prev_districts, failed, reverify_cursor
+    )
+    # 모든 API 프로세스의 지역 캐시 무효화 (버전 INCR + pub/sub)
+    region_cache.publish_update(_redis)
+    logger.info(
+        "[region_scheduler] 전국 지역 데이터 수집 완료 (Location API %d회 호출, Redis 명령 %d개)",
+        len(targets),
+        written,
+    )
 
 
 # ── APScheduler 등록 ──────────────────────────────────────────────────────────
 
-def create_region_scheduler():
-    """스케줄러 인스턴스 생성 및 job 등록"""
+def create_region_scheduler(elector: leader.LeaderElector | None = None):
+    """스케줄러 인스턴스 생성 및 job 등록 (elector가 주어지면 리더 인스턴스에서만 실행)"""
     from apscheduler.schedulers.background import BackgroundScheduler
     from apscheduler.triggers.cron import CronTrigger
 
+    job = elector.guard(collect_all_regions) if elector is not None else collect_all_regions
+
     scheduler = BackgroundScheduler()
     scheduler.add_job(
-        collect_all_regions,
+        job,
         trigger=CronTrigger(hour=4, minute=0),
         id="daangn_region_collector",
         name="당근 전국 지역 데이터 수집",
@@ -4,8 +4,8 @@
 수집 방식: 공개 JSON REST API (api.bunjang.co.kr) 직접 호출
 참고 문서: docs/bunjang.md
 
-표준 스키마 10필드:
-  id, title, price, price_str, image_url, status, location, time, url, source
+표준 스키마 11필드:
+  id, title, price, price_str, image_url, status, location, time, ts, url, source
 """
 
 import logging
@@ -75,8 +75,13 @@ def _unix_to_iso(ts) -> str:
         return ""
 
 
+def _to_epoch(ts) -> int:
+    """update_time(Unix timestamp) → epoch 초 (실패 시 0)"""
+    return _safe_int(ts)
+
+
 def _parse_item(raw: dict) -> dict:
-    """API 응답 아이템 → 표준 스키마 10필드"""
+    """API 응답 아이템 → 표준 스키마 11필드"""
     pid = str(raw.get("pid") or raw.get("product_id", ""))
     price = _safe_int(raw.get("price"))
     status_code = _safe_int(raw.get("status"), default=-1)
@@ -90,6 +95,7 @@ def _parse_item(raw: dict) -> dict:
         "status": STATUS_MAP.get(status_code, "판매중"),
         "location": str(raw.get("location", "")),
         "time": _unix_to_iso(raw.get("update_time")),
+        "ts": _to_epoch(raw.get("update_time")),
         "url": PRODUCT_URL.format(pid=pid),
         "source": "bunjang",
     }
@@ -118,7 +124,7 @@ def search(
         sort:      정렬 (recommend | recent | price_asc | price_desc)
 
     Returns:
-        {"items": [표준스키마 10필드], "total": int}
+        {"items": [표준스키마 11필드], "total": int}
     """
     delay = float(os.getenv("CRAWLER_DELAY", "0.5"))
 
@@ -5,8 +5,8 @@
 Fallback:  BeautifulSoup HTML 파싱
 참고 문서: docs/daangn.md
 
-표준 스키마 10필드:
-  id, title, price, price_str, image_url, status, location, time, url, source
+표준 스키마 11필드:
+  id, title, price, price_str, image_url, status, location, time, ts, url, source
 
 지역 선택 방식:
   - 사용자가 당근 Location API로 검색한 location id(name3Id)를 직접 전달
@@ -16,15 +16,23 @@ Fallback:  BeautifulSoup HTML 파싱
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import os
 import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 import aiohttp
-import redis
 from bs4 import BeautifulSoup
 
+import region_cache
+import redis_codec
+import redis_conn
+import upstream_budget
+
 logger = logging.getLogger(__name__)
 
 # ── 상수 ────────────────────────────────────────────────────────────────────────
@@ -52,24 +60,33 @@ STATUS_MAP = {
 
 REQUEST_TIMEOUT = 3
 
+KST = timezone(timedelta(hours=9))
+
 # remixContext 추출 정규식
 _REMIX_RE = re.compile(r"window\.__remixContext\s*=\s*(\{.*?\})\s*;", re.DOTALL)
 
 # ── aiohttp 커넥터 (커넥션 풀) ────────────────────────────────────────────────
 _AIOHTTP_POOL_LIMIT = int(os.getenv("DAANGN_DISTRICT_WORKERS", "100"))
 
+# multi_location_search가 업스트림 예산을 받는 단위 (동 개수).
+# 전체 fan-out을 한 번에 받으면 BURST보다 큰 구/군은 유휴 상태에서도 거절되고 interactive 레인을 독점한다.
+_BUDGET_CHUNK = int(os.getenv("DAANGN_MULTI_BUDGET_CHUNK", "10"))
+
+# ── HTML 파싱 워커 풀 ─────────────────────────────────────────────────────────
+# thread : 스레드 풀 (기본) — 다운로드가 이벤트 루프에서 계속 진행됨
+# process: 프로세스 풀 — GIL 없이 CPU 코어 수만큼 파싱 병렬화
+# none   : 이벤트 루프에서 직접 파싱 (기존 동작)
+_PARSE_POOL_MODE = os.getenv("DAANGN_PARSE_POOL", "thread").lower()
+_PARSE_WORKERS = int(os.getenv("DAANGN_PARSE_WORKERS", str(os.cpu_count() or 4)))
+_parse_executor: Executor | None = None
+_parse_executor_lock = threading.Lock()
+
 # ── Redis (지역 정보 캐싱) ────────────────────────────────────────────────────
-_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 _LOCATION_CACHE_TTL = 60 * 60 * 24  # 24시간
 _LOCATION_CACHE_PREFIX = "daangn:location:"
 
-try:
-    _redis = redis.from_url(_REDIS_URL, decode_responses=True)
-    _redis.ping()
-    logger.info("Redis 연결 성공: %s", _REDIS_URL)
-except Exception as e:
-    logger.warning("Redis 연결 실패 (캐시 없이 동작): %s", e)
-    _redis = None
+# 공유 지연 연결 (import 시 네트워크 연결 없음). Redis 장애 중에는 캐시 없이 동작
+_redis = redis_conn.client()
 
 
 # ── 헬퍼 함수 ──────────────────────────────────────────────────────────────────
@@ -95,6 +112,19 @@ def _extract_product_id(raw_id) -> str:
     return str(raw_id or "")
 
 
+def _to_epoch(iso: str | None) -> int:
+    """createdAt ISO 문자열("2026-03-14T14:25:55.241+09:00") → epoch 초 (실패 시 0)"""
+    if not iso:
+        return 0
+    try:
+        dt = datetime.fromisoformat(iso)
+    except (TypeError, ValueError):
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=KST)
+    return int(dt.timestamp())
+
+
 def _extract_remix_context(html: str) -> dict | None:
     """HTML에서 window.__remixContext JSON 추출"""
     match = _REMIX_RE.search(html)
@@ -119,7 +149,7 @@ def _find_articles(remix_data: dict) -> list:
 
 
 def _parse_item(raw: dict) -> dict:
-    """remixContext 아이템 → 표준 스키마 10필드"""
+    """remixContext 아이템 → 표준 스키마 11필드"""
     pid = _extract_product_id(raw.get("id", ""))
     price = _safe_int(raw.get("price"))
     status_raw = raw.get("status", "Ongoing")
@@ -134,6 +164,7 @@ def _parse_item(raw: dict) -> dict:
         "status": STATUS_MAP.get(status_raw, "판매중"),
         "location": str(region.get("name", "") if isinstance(region, dict) else ""),
         "time": str(raw.get("createdAt") or raw.get("boostedAt", "")),
+        "ts": _to_epoch(raw.get("createdAt") or raw.get("boostedAt")),
         "url": PRODUCT_URL.format(pid=pid),
         "source": "daangn",
     }
@@ -166,6 +197,7 @@ def _parse_html_fallback(html: str) -> list[dict]:
                 "status": "판매중",
                 "location": "",
                 "time": "",
+                "ts": 0,
                 "url": PRODUCT_URL.format(pid=pid),
                 "source": "daangn",
             }
@@ -185,6 +217,32 @@ def _parse_items_from_html(html: str, keyword: str) -> list[dict]:
         return _parse_html_fallback(html)
 
 
+def _get_parse_executor() -> Executor | None:
+    """파싱 워커 풀 (최초 사용 시 생성, 프로세스 내 공유). none 모드면 None"""
+    global _parse_executor
+    if _PARSE_POOL_MODE == "none":
+        return None
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            if _PARSE_POOL_MODE == "process":
+                _parse_executor = ProcessPoolExecutor(max_workers=_PARSE_WORKERS)
+            else:
+                _parse_executor = ThreadPoolExecutor(
+                    max_workers=_PARSE_WORKERS, thread_name_prefix="daangn-parse"
+                )
+            logger.info("당근 HTML 파싱 풀 생성: %s × %d", _PARSE_POOL_MODE, _PARSE_WORKERS)
+        return _parse_executor
+
+
+async def _parse_items_off_loop(html: str, keyword: str) -> list[dict]:
+    """_parse_items_from_html을 워커 풀에서 실행 (이벤트 루프는 다른 다운로드를 계속 처리)"""
+    executor = _get_parse_executor()
+    if executor is None:
+        return _parse_items_from_html(html, keyword)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_items_from_html, html, keyword)
+
+
 # ── Location API ──────────────────────────────────────────────────────────────
 
 LOCATION_API_URL = "https://www.daangn.com/v1/api/search/kr/location"
@@ -213,14 +271,15 @@ def _fetch_from_location_api(keyword: str) -> dict:
                 resp.raise_for_status()
                 return await resp.json()
 
+    upstream_budget.require(redis_conn.get(), 1, upstream_budget.LANE_INTERACTIVE)
     body = asyncio.run(_fetch())
     locations = body.get("locations", [])
 
     # Redis 캐시 저장
     cache_key = f"{_LOCATION_CACHE_PREFIX}{keyword}"
-    if _redis and locations:
+    if redis_conn.available() and locations:
         try:
-            _redis.setex(cache_key, _LOCATION_CACHE_TTL, json.dumps(locations, ensure_ascii=False))
+            _redis.setex(cache_key, _LOCATION_CACHE_TTL, redis_codec.dumps(locations))
         except Exception as e:
             logger.warning("Redis 캐시 저장 실패: %s", e)
 
@@ -232,7 +291,7 @@ def search_location(keyword: str) -> dict:
     """
     당근 지역 검색 — Redis 우선 조회.
 
-    스케줄러가 수집한 Redis 데이터에서 검색하고,
+    스케줄러가 수집한 지역 데이터(프로세스 내 region_cache)에서 검색하고,
     Redis에 데이터가 없는 경우에만 fallback으로 Location API를 호출합니다.
 
     Args:
@@ -266,26 +325,24 @@ def search_location(keyword: str) -> dict:
         requests.exceptions.Timeout: fallback API 타임아웃 발생 시
         requests.exceptions.RequestException: fallback 네트워크 오류 발생 시
     """
-    # 1순위: Redis에서 스케줄러 수집 데이터 검색 (daangn:districts:all)
-    if _redis:
-        try:
-            districts_json = _redis.get("daangn:districts:all")
-            if districts_json:
-                all_districts = json.loads(districts_json)
-                matched = [d for d in all_districts if keyword in d["name"]]
-                if matched:
-                    logger.info("당근 지역 검색 (Redis): keyword=%s → %d건", keyword, len(matched))
-                    return {"locations": matched}
-        except Exception as e:
-            logger.warning("Redis districts 조회 실패: %s", e)
+    # 1순위: 스케줄러 수집 데이터 검색 (daangn:districts:all — 프로세스 내 지역 캐시)
+    try:
+        all_districts = region_cache.districts()
+        if all_districts:
+            matched = [d for d in all_districts if keyword in d["name"]]
+            if matched:
+                logger.info("당근 지역 검색 (캐시): keyword=%s → %d건", keyword, len(matched))
+                return {"locations": matched}
+    except Exception as e:
+        logger.warning("지역 캐시 districts 조회 실패: %s", e)
 
     # 2순위: 기존 location 캐시 확인 (daangn:location:{keyword})
     cache_key = f"{_LOCATION_CACHE_PREFIX}{keyword}"
-    if _redis:
+    if redis_conn.available():
         try:
             cached = _redis.get(cache_key)
             if cached:
-                locations = json.loads(cached)
+                locations = redis_codec.loads(cached)
                 logger.info("당근 지역 검색 (캐시): keyword=%s → %d건", keyword, len(locations))
                 return {"locations": locations}
         except Exception as e:
@@ -316,10 +373,11 @@ def search_by_district(keyword: str, district: str, count: int = 20) -> dict:
 
     Returns:
         {
-          "items": [...],       # 표준 스키마 10필드
+          "items": [...],       # 표준 스키마 11필드
           "total": 12,
           "district": "덕양구",
-          "dong_count": 18      # 실제 검색에 사용된 동 수
+          "dong_count": 18,     # 실제 검색에 사용된 동 수
+          "skipped_locations": 0  # 업스트림 예산 부족으로 검색하지 못한 동 수
         }
 
     Raises:
@@ -392,6 +450,7 @@ def search(
                 resp.raise_for_status()
                 return await resp.text(encoding="utf-8")
 
+    upstream_budget.require(redis_conn.get(), 1, upstream_budget.LANE_INTERACTIVE)
     try:
         html = asyncio.run(_fetch())
     except Exception as e:
@@ -429,7 +488,7 @@ async def _async_search_one(
         logger.warning("당근 async 검색 실패 (location_id=%s): %s", location_id, e)
         return []
 
-    items = _parse_items_from_html(html, keyword)
+    items = await _parse_items_off_loop(html, keyword)
     return items[:count]
 
 
@@ -451,7 +510,7 @@ def search_district_direct(
 
     Returns:
         {
-          "items": [...],        # 표준 스키마 10필드
+          "items": [...],        # 표준 스키마 11필드
           "total": 248,
           "district": "덕양구",
           "regionId": 1529
@@ -499,6 +558,7 @@ def search_district_direct(
                 resp.raise_for_status()
                 return await resp.json(content_type=None)
 
+    upstream_budget.require(redis_conn.get(), 1, upstream_budget.LANE_INTERACTIVE)
     try:
         data = asyncio.run(_fetch())
     except Exception as e:
@@ -527,16 +587,66 @@ def search_district_direct(
     }
 
 
+class _TopKMerger:
+    """
+    동별 검색 결과를 도착 순서대로 받아 최신순 상위 k개만 유지하는 스트리밍 병합기.
+
+    (ts, id) 기준 min-heap으로 k개만 보관하므로 전체 결과를 모아 정렬할 필요가 없고,
+    id 중복은 힙에 들어 있는 동안 set으로 걸러낸다. 힙이 가득 찬 뒤에는 가장 오래된 항목보다
+    오래된 아이템을 O(1) 비교로 버린다.
+
+    병합(메모리/정렬)만 줄이는 최적화다 — 아직 도착하지 않은 동의 결과는 ts 상한을 알 수 없어
+    상위 k개에 들 수 있으므로, 남은 동 검색을 취소하지는 않는다.
+    """
+
+    def __init__(self, k: int):
+        self.k = max(0, k)
+        self._heap: list[tuple[int, str, dict]] = []
+        self._ids: set[str] = set()
+
+    def offer(self, item: dict) -> bool:
+        """아이템 1개 제안. 상위 k개에 들어가면 True"""
+        if self.k == 0:
+            return False
+        item_id = item["id"]
+        if item_id in self._ids:
+            return False
+        entry = (item.get("ts", 0), item_id, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            self._ids.add(item_id)
+            return True
+        if entry[:2] <= self._heap[0][:2]:
+            return False
+        evicted = heapq.heapreplace(self._heap, entry)
+        self._ids.discard(evicted[1])
+        self._ids.add(item_id)
+        return True
+
+    def offer_all(self, items: list[dict]) -> int:
+        """한 동의 결과 목록을 병합. 반환값은 상위 k개에 들어간 아이템 수"""
+        return sum(self.offer(item) for item in items)
+
+    def result(self) -> list[dict]:
+        """최신순으로 정렬된 상위 k개"""
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
 def multi_location_search(
     keyword: str,
     location_ids: list[int],
     count: int = 20,
 ) -> dict:
     """
-    여러 location_id(동 레벨)에 대해 비동기 병렬 검색 → 중복 제거 → 최신순 정렬.
+    여러 location_id(동 레벨)에 대해 비동기 병렬 검색 → 중복 제거 → 최신순 상위 count개.
 
     asyncio + aiohttp로 단일 커넥션 풀을 공유하여
     스레드 오버헤드 없이 대량 동시 요청을 처리합니다.
+    HTML 파싱은 파싱 워커 풀(DAANGN_PARSE_POOL)에서 수행하므로
+    다운로드는 이벤트 루프에서 끊김 없이 계속 진행됩니다.
+    동별 결과는 도착하는 즉시 _TopKMerger에 병합되어 상위 count개만 메모리에 남습니다.
+    업스트림 예산은 _BUDGET_CHUNK개 동 단위로 받으며, 대기 한도 안에 다음 청크 예산을 받지 못하면
+    남은 동은 검색하지 않고 부분 결과를 반환합니다 (skipped_locations).
 
     Args:
         keyword:      검색어
@@ -547,41 +657,58 @@ def multi_location_search(
         logger.warning("당근 multi_location_search: location_ids 없음")
         return {"items": [], "total": 0}
 
-    async def _fetch_all():
+    merger = _TopKMerger(count)
+    r = redis_conn.get()
+    chunks = [location_ids[i:i + _BUDGET_CHUNK] for i in range(0, len(location_ids), _BUDGET_CHUNK)]
+
+    async def _launch(session, pending: set):
+        """청크마다 예산을 받고 동 검색 task 생성. 대기 한도 안에 못 받으면 남은 동 수 반환"""
+        for n, chunk in enumerate(chunks):
+            # 첫 청크는 호출 전에 require로 받았음. 다음 청크 예산은 앞 청크 검색과 겹쳐 대기
+            if n and not await upstream_budget.acquire_async(r, len(chunk), upstream_budget.LANE_INTERACTIVE):
+                return sum(len(c) for c in chunks[n:])
+            for loc_id in chunk:
+                pending.add(asyncio.create_task(_async_search_one(session, keyword, loc_id, count)))
+        return 0
+
+    async def _fetch_all() -> int:
         connector = aiohttp.TCPConnector(limit=_AIOHTTP_POOL_LIMIT)
         timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
         async with aiohttp.ClientSession(
             headers=HEADERS, connector=connector, timeout=timeout
         ) as session:
-            tasks = [
-                _async_search_one(session, keyword, loc_id, count)
-                for loc_id in location_ids
-            ]
-            return await asyncio.gather(*tasks, return_exceptions=True)
-
-    results = asyncio.run(_fetch_all())
-
-    all_items: list[dict] = []
-    seen_ids: set[str] = set()
-
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            logger.warning("당근 location_id=%s 검색 실패: %s", location_ids[i], result)
-            continue
-        for item in result:
-            if item["id"] not in seen_ids:
-                seen_ids.add(item["id"])
-                all_items.append(item)
-
-    # 최신순 정렬
-    all_items.sort(key=lambda x: x.get("time", ""), reverse=True)
-    all_items = all_items[:count]
+            pending: set[asyncio.Task] = set()
+            launcher = asyncio.create_task(_launch(session, pending))
+            waiting = {launcher}
+            skipped = 0
+            while waiting or pending:
+                waiting |= pending
+                pending.clear()
+                done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    if fut is launcher:
+                        skipped = fut.result()
+                        continue
+                    try:
+                        items = fut.result()
+                    except Exception as e:
+                        logger.warning("당근 multi_location_search 동 검색 실패: %s", e)
+                        continue
+                    merger.offer_all(items)
+            return skipped
+
+    # 전역 업스트림 예산 (interactive 레인 — 스케줄러 수집보다 우선)
+    # 첫 청크도 받지 못하면 BudgetExhausted(503), 이후 청크가 막히면 받은 동까지만 검색한 부분 결과
+    upstream_budget.require(r, len(chunks[0]), upstream_budget.LANE_INTERACTIVE)
+    skipped = asyncio.run(_fetch_all())
+    all_items = merger.result()
 
     logger.info(
-        "당근 multi_location_search: keyword=%s, %d개 location → %d건",
+        "당근 multi_location_search: keyword=%s, %d개 location → %d건 (예산 부족으로 건너뜀 %d개)",
         keyword,
         len(location_ids),
         len(all_items),
+        skipped,
     )
 
-    return {"items": all_items, "total": len(all_items)}
+    return {"items": all_items, "total": len(all_items), "skipped_locations": skipped}
@@ -4,14 +4,15 @@
 수집 방식: Next.js SSR HTML 파싱 (__NEXT_DATA__)
 참고 문서: docs/joongna.md
 
-표준 스키마 10필드:
-  id, title, price, price_str, image_url, status, location, time, url, source
+표준 스키마 11필드:
+  id, title, price, price_str, image_url, status, location, time, ts, url, source
 """
 
 import json
 import logging
 import os
 import time
+from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
 
 import requests
@@ -51,6 +52,8 @@ STATUS_MAP = {
 
 REQUEST_TIMEOUT = 15
 
+KST = timezone(timedelta(hours=9))
+
 
 # ── 헬퍼 함수 ──────────────────────────────────────────────────────────────────
 
@@ -68,6 +71,27 @@ def _format_price_str(price: int) -> str:
     return f"{price:,}원"
 
 
+def _to_epoch(value) -> int:
+    """
+    sortDate/regDate → epoch 초 (실패 시 0).
+
+    숫자(epoch 초/밀리초)와 ISO 8601 문자열("2024-01-15T10:30:00", "2024-01-15 10:30:00")을
+    모두 처리하며, 오프셋 없는 시각은 KST로 간주한다.
+    """
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        num = int(value)
+        return num // 1000 if num > 10**12 else num
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=KST)
+    return int(dt.timestamp())
+
+
 def _extract_next_data(html: str) -> dict | None:
     """HTML에서 <script id="__NEXT_DATA__"> JSON 추출"""
     soup = BeautifulSoup(html, "lxml")
@@ -113,7 +137,7 @@ STATUS_CODE_MAP = {
 
 
 def _parse_item(raw: dict) -> dict:
-    """원본 JSON → 표준 스키마 10필드"""
+    """원본 JSON → 표준 스키마 11필드"""
     pid = str(raw.get("seq") or raw.get("productSeq", ""))
     price = _safe_int(raw.get("price"))
 
@@ -140,6 +164,7 @@ def _parse_item(raw: dict) -> dict:
         "status": status,
         "location": str(raw.get("mainLocationName") or raw.get("locationName", "")),
         "time": str(raw.get("sortDate") or raw.get("regDate", "")),
+        "ts": _to_epoch(raw.get("sortDate") or raw.get("regDate")),
         "url": PRODUCT_URL.format(pid=pid),
         "source": "joongna",
     }
@@ -0,0 +1,62 @@
+"""
+seen-store — 최신순 매물 목록의 새 매물 감지 (당근 전국 수집 + 번개장터/중고나라 최신 수집 공용)
+
+커서 = 직전 실행에서 읽은 매물 ID 목록 (redis_codec 압축 JSON, TTL 24h).
+최신순 목록을 1페이지부터 읽으며 커서에 없는 매물을 새 매물로 본다.
+
+적응형 페이지 깊이: 페이지의 매물이 모두 새 매물이면 그 뒤에도 놓친 새 매물이 있을 수 있으므로
+다음 페이지를 읽고, 이미 확인한 ID가 나오면 멈춘다. 변화가 적은 목록은 매번 1페이지만 읽는다.
+커서가 없는 목록(최초 실행)은 모든 매물이 새 매물이므로 추가 페이지를 읽지 않는다.
+
+Scan은 Redis I/O를 하지 않으므로 동기(requests)/비동기(aiohttp) 수집기가 같이 쓴다.
+키 이름은 호출자가 정한다:
+  daangn:listing:seen:{regionId}    — 당근 전국 수집 (listing_scheduler)
+  {source}:recent:seen:{keyword}    — 번개장터/중고나라 최신 수집 (recent_poller)
+"""
+
+import redis_codec
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+TTL = 86400
+
+
+# ── 감지 ──────────────────────────────────────────────────────────────────────
+
+
+class Scan:
+    """
+    한 목록의 페이지 단위 새 매물 감지 상태.
+
+      scan = Scan(r.get(key))
+      scan.add_page(page1)
+      while scan.more and scan.pages < max_pages:
+          scan.add_page(fetch(scan.pages + 1))
+      r.setex(key, TTL, scan.dumps())
+    """
+
+    def __init__(self, cursor_raw: str | None):
+        self.primed = bool(cursor_raw)
+        self._seen = set(redis_codec.loads(cursor_raw)) if cursor_raw else set()
+        self._ids: set = set()
+        self.new: list[dict] = []
+        self.pages = 0
+        self.more = False
+
+    def add_page(self, page: list[dict]) -> list[dict]:
+        """
+        다음 페이지 반영. 이번 스캔에서 처음 보는 매물만 반환 (페이지 경계 중복 제거).
+
+        more: 다음 페이지를 읽어야 하는지 (커서가 있고, 페이지가 비어 있지 않고, 모두 새 매물)
+        """
+        fresh = [a for a in page if a["id"] not in self._ids]
+        self._ids.update(a["id"] for a in fresh)
+        new = [a for a in fresh if a["id"] not in self._seen]
+        self.new.extend(new)
+        self.pages += 1
+        self.more = self.primed and bool(fresh) and len(new) == len(fresh)
+        return fresh
+
+    def dumps(self) -> str:
+        """다음 실행의 커서 (이번에 읽은 매물 ID 목록)"""
+        return redis_codec.dumps(list(self._ids))
@@ -9,13 +9,29 @@ ProjectYO Crawler - Flask REST API 서버
   성공: _success(data)  또는  _success(data, count=N, source="bunjang")
   실패: _error("메시지", 상태코드)
   직접 jsonify() 사용 금지
+
+동시 실행 제한:
+  업스트림으로 요청을 보내는 엔드포인트에는 @_admission("이름", weight=...)을 붙인다.
+  용량 초과 시 대기열에서 잠시 기다리고, 그래도 안 되면 즉시 503 + Retry-After로 응답한다.
 """
 
+import functools
+import gzip
 import logging
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+
+from admission import Saturated, WeightedLimiter
+from upstream_budget import BudgetExhausted
+
+try:  # 선택 의존성: 설치되어 있으면 brotli 응답 압축 지원
+    import brotli
+except ImportError:
+    brotli = None
 
 load_dotenv()
 
@@ -41,11 +57,181 @@ def _success(data, *, count: int | None = None, source: str | None = None):
     return jsonify(payload), 200
 
 
-def _error(message: str, status: int = 400):
+def _error(message: str, status: int = 400, *, retry_after: int | None = None):
     """표준 에러 응답 — 직접 jsonify() 사용 금지, 반드시 이 함수 경유"""
+    if retry_after is not None:
+        return jsonify({"ok": False, "error": message}), status, {"Retry-After": str(retry_after)}
     return jsonify({"ok": False, "error": message}), status
 
 
+# ── HTTP 캐싱 (지역 데이터) ──────────────────────────────────────────────────────
+# 지역 데이터는 하루 1회만 바뀌므로 데이터 내용 해시(region_cache.Snapshot.digest)로 강한 ETag를 만들고,
+# If-None-Match가 일치하면 본문 없이 304를 반환한다. 본문은 Accept-Encoding에 따라 압축.
+# 버전 카운터(INCR)만 쓰면 Redis flush/재구축 후 같은 번호가 다른 데이터를 가리켜 잘못된 304가 나간다.
+# 응답 본문(envelope JSON + 압축 결과) 바이트는 데이터 해시마다 1번만 만들고 재사용한다.
+
+_REGION_MAX_AGE = int(os.getenv("REGION_CACHE_MAX_AGE", "3600"))
+_COMPRESS_MIN_BYTES = 512
+_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+_BODY_CACHE_MAX = 1024
+
+_body_cache: dict[tuple[str, str | None], tuple[bytes, str | None]] = {}
+_body_cache_version: str | None = None
+_body_cache_lock = threading.Lock()
+
+
+def _negotiate_encoding() -> str | None:
+    """클라이언트가 허용하는 압축 방식 중 우선순위가 가장 높은 것"""
+    for encoding in _ENCODINGS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def _etag_for(tag: str, encoding: str | None) -> str:
+    """압축 방식마다 본문 바이트가 다르므로 강한 ETag도 구분한다"""
+    return f"{tag}-{encoding}" if encoding else tag
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _cached_body(data, *, tag: str, version: str, encoding: str | None, count: int | None) -> tuple[bytes, str | None]:
+    """
+    (tag, encoding)별 응답 본문 바이트. 캐시에 없을 때만 _success()로 직렬화·압축한다.
+    데이터 해시(version)가 바뀌면 이전 데이터의 본문은 모두 버린다.
+
+    Returns: (본문 바이트, 실제 적용한 압축 방식 — 작은 본문은 압축하지 않으므로 None일 수 있음)
+    """
+    global _body_cache_version
+    key = (tag, encoding)
+    if _body_cache_version == version:
+        cached = _body_cache.get(key)
+        if cached is not None:
+            return cached
+
+    resp, _ = _success(data, count=count)
+    body = resp.get_data()
+    if encoding and len(body) >= _COMPRESS_MIN_BYTES:
+        entry = (_compress(body, encoding), encoding)
+    else:
+        entry = (body, None)
+
+    with _body_cache_lock:
+        if _body_cache_version != version or len(_body_cache) >= _BODY_CACHE_MAX:
+            _body_cache.clear()
+            _body_cache_version = version
+        _body_cache[key] = entry
+    return entry
+
+
+def _cached_success(data, *, tag: str, version: str, count: int | None = None):
+    """
+    _success()와 같은 envelope를 ETag/Cache-Control/304/압축과 함께 반환.
+    본문 바이트는 _cached_body()에서 재사용하므로 요청마다 직렬화하지 않는다.
+
+    tag:     데이터 해시에서 만든 식별자 (예: "regions-3f9a…") — 데이터가 바뀌면 tag도 바뀌어야 한다.
+    version: 본문 캐시 세대 (region_cache.Snapshot.digest)
+    """
+    encoding = _negotiate_encoding()
+    headers = {
+        "Cache-Control": f"public, max-age={_REGION_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    inm = request.if_none_match
+    if inm.star_tag or any(inm.contains(_etag_for(tag, enc)) for enc in (None, *_ENCODINGS)):
+        return "", 304, {**headers, "ETag": f'"{_etag_for(tag, encoding)}"'}
+
+    body, encoding = _cached_body(data, tag=tag, version=version, encoding=encoding, count=count)
+    resp = Response(body, mimetype="application/json")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    resp.set_etag(_etag_for(tag, encoding))
+    resp.headers.update(headers)
+    return resp, 200
+
+
+# ── 동시 실행 제한 (admission control) ──────────────────────────────────────────
+# 용량 단위 = 동시에 열리는 업스트림 연결 수. multi-search는 검색할 동 수만큼 점유한다.
+
+_ADMISSION_MAX_WAITING = int(os.getenv("ADMISSION_MAX_WAITING", "20"))
+_ADMISSION_WAIT_SECONDS = float(os.getenv("ADMISSION_WAIT_SECONDS", "2"))
+
+
+def _limiter(name: str, env: str, default: int) -> WeightedLimiter:
+    return WeightedLimiter(
+        name,
+        capacity=int(os.getenv(env, str(default))),
+        max_waiting=_ADMISSION_MAX_WAITING,
+        wait_timeout=_ADMISSION_WAIT_SECONDS,
+    )
+
+
+_LIMITERS = {
+    "bunjang_search": _limiter("bunjang_search", "ADMISSION_BUNJANG_CAPACITY", 20),
+    "joongna_search": _limiter("joongna_search", "ADMISSION_JOONGNA_CAPACITY", 20),
+    "daangn_search": _limiter("daangn_search", "ADMISSION_DAANGN_SEARCH_CAPACITY", 50),
+    "daangn_multi_search": _limiter("daangn_multi_search", "ADMISSION_MULTI_SEARCH_CAPACITY", 200),
+    "daangn_district_search": _limiter("daangn_district_search", "ADMISSION_DISTRICT_SEARCH_CAPACITY", 20),
+    "search_batch": _limiter("search_batch", "ADMISSION_SEARCH_BATCH_CAPACITY", 50),
+    "daangn_listings_collect": _limiter("daangn_listings_collect", "ADMISSION_LISTINGS_COLLECT_CAPACITY", 1),
+}
+
+
+def _admission(name: str, weight=1):
+    """
+    엔드포인트 동시 실행 제한 데코레이터.
+
+    weight: 정수 또는 요청 시점에 팬아웃 비용을 계산하는 함수 (인자 없음, request 사용)
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cost = weight() if callable(weight) else weight
+            try:
+                with _LIMITERS[name].admit(cost):
+                    return func(*args, **kwargs)
+            except Saturated as e:
+                logger.warning("요청 거절 (%s 포화, weight=%d): %s", name, cost, _LIMITERS[name].stats())
+                return _error(
+                    "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+                    503,
+                    retry_after=e.retry_after,
+                )
+
+        return wrapper
+
+    return decorator
+
+
+_MULTI_SEARCH_FALLBACK_WEIGHT = 20  # 지역 캐시에 없는 구/군 — 구/군당 동 수의 대략적인 값
+
+
+def _multi_search_weight() -> int:
+    """
+    multi-search 팬아웃 비용 = 검색할 동 수 (최대 커넥션 풀 한도).
+
+    입장 전에 계산하므로 업스트림 요청 없이 지역 캐시(region_cache)의 동 목록으로만 센다.
+    캐시에 없으면 _MULTI_SEARCH_FALLBACK_WEIGHT.
+    """
+    import region_cache
+    from scrapers.daangn_scraper import _AIOHTTP_POOL_LIMIT
+
+    district = request.args.get("district", "").strip()
+    if not district:
+        return 1
+    try:
+        matched = [d for d in region_cache.districts() or [] if district in d["name"]]
+        dong_count = sum(len(region_cache.dongs(d["regionId"]) or []) for d in matched)
+    except Exception:
+        dong_count = 0
+    return max(1, min(dong_count or _MULTI_SEARCH_FALLBACK_WEIGHT, _AIOHTTP_POOL_LIMIT))
+
+
 # ── 엔드포인트 ──────────────────────────────────────────────────────────────────
 
 
@@ -55,38 +241,130 @@ def index():
     endpoints = {
         # ── 기본 ──
         "GET /health": "서버 상태 확인",
+        "GET /api/debug/memory": "메모리 상태 (이 프로세스 RSS / tracemalloc 스냅샷 — MEMORY_PROFILE=1, 전체 프로세스 최근 실행 요약 recent_runs)",
+        "GET /api/debug/memory/diff": "tracemalloc 스냅샷 비교 (from, to, limit) — 할당 위치별 증가량",
         # ── 번개장터 ──
         "GET /api/bunjang/search": "번개장터 키워드 검색 (keyword, page, count, min_price, max_price, sort)",
+        "GET /api/bunjang/recent": "번개장터 최신 매물 (within_minutes, keyword) — 키워드별 증분 폴링으로 감지된 새 매물",
         # ── 중고나라 ──
         "GET /api/joongna/search": "중고나라 키워드 검색 (keyword, page, count, min_price, max_price, sort)",
+        "GET /api/joongna/recent": "중고나라 최신 매물 (within_minutes, keyword) — 키워드별 증분 폴링으로 감지된 새 매물",
+        # ── 배치 검색 ──
+        "POST /api/search/batch": "여러 {source, keyword, filters} 쿼리를 병렬 검색 (결과는 쿼리 id별)",
         # ── 당근 ──
-        "POST /api/daangn/regions/collect": "당근 전국 지역 데이터 즉시 수집 (스케줄러 수동 실행)",
+        "POST /api/daangn/regions/collect": "당근 전국 지역 데이터 즉시 수집 (full=true면 전체 재수집, 기본 증분)",
         "GET /api/daangn/regions": "전국 시/도 + 구/군 계층 목록 (Redis 스케줄러 데이터)",
         "GET /api/daangn/regions/<regionId>/dongs": "특정 구/군의 동/읍/면 목록 (Redis 스케줄러 데이터)",
         "GET /api/daangn/location": "당근 지역 검색 (keyword) — Redis 우선, fallback Location API",
         "POST /api/daangn/listings/collect": "당근 전국 매물 즉시 수집 (test_keyword로 키워드 매칭 테스트 가능)",
         "GET /api/daangn/listings/status": "당근 매물 수집 최근 상태 조회",
+        "GET /api/daangn/listings/stats": "당근 매물 수집 이력 통계 (windows=60,1440 — 분 단위 p50/p95/p99 소요시간, 성공률, 새 매물 처리량)",
+        "GET /api/daangn/listings/search": "수집된 당근 매물 로컬 검색 (keyword, region_id, count) — 업스트림 요청 없음",
+        "GET /api/daangn/prices": "당근 시세 (keyword, region_id, days) — 일자별 count/median/p10/p90, 업스트림 요청 없음",
+        "PUT /api/daangn/prices/keywords": "시세 추적 키워드 지정 ({keywords: [키워드]}) — 기존 목록 교체, DAANGN_PRICE_KEYWORDS 항상 포함",
+        "PUT /api/daangn/keywords/subscribers": "알림 키워드별 구독자 수 동기화 ({keywords: {키워드: 구독자 수}}) — 키워드 우선 수집 플래너 입력",
+        "GET /api/daangn/keywords/plan": "키워드 우선 수집 플랜 (스윕 vs 키워드별 전국 검색, 키워드별 사유)",
         "GET /api/daangn/search": "당근 단건 검색 (keyword, location_id, page, count)",
         "GET /api/daangn/multi-search": "당근 구/군 단위 병렬 검색 (keyword, district, count) — 구/군명으로 하위 동 자동 조회 후 병렬 검색",
         "GET /api/daangn/district-search": "당근 구 레벨 직접 검색 (keyword, district, count) — _data loader로 1번 요청, 최대 300건",
-        # ── Phase 2-2: 번개장터 최신 수집 (Step 2-2에서 추가) ──
-        # "GET /api/bunjang/recent": "번개장터 최신 매물 수집 (within_minutes)",
-        # ── Phase 2-3: 중고나라 최신 수집 (Step 2-3에서 추가) ──
-        # "GET /api/joongna/recent": "중고나라 최신 매물 수집 (within_minutes)",
     }
     return _success({"message": "ProjectYO Crawler API", "endpoints": endpoints})
 
 
 @app.get("/health")
 def health():
-    """서버 및 의존성 상태 확인"""
-    return _success({"status": "ok", "service": "crawler"})
+    """
+    서버 상태 + 준비 상태. 외부 호출을 기다리지 않고 마지막으로 확인된 상태만 반환한다.
+
+    ready = Redis 연결 가능 + 지역 데이터가 메모리 캐시에 로드됨
+    checks.schedulers: 이 프로세스의 스케줄러 (CRAWLER_RUN_SCHEDULERS=false면 비어 있음)
+    checks.collectors: 별도 수집 워커(collector.py) heartbeat
+    """
+    import collector
+    import redis_conn
+    import region_cache
+
+    snapshot = region_cache.peek()
+    redis_state = redis_conn.status()
+    region_ready = bool(snapshot and snapshot.regions)
+
+    collectors = None
+    if redis_state["available"]:
+        try:
+            collectors = collector.heartbeats(redis_conn.client())
+        except Exception as e:
+            logger.warning("수집 워커 heartbeat 조회 실패: %s", e)
+
+    return _success({
+        "status": "ok",
+        "service": "crawler",
+        "ready": bool(redis_state["available"]) and region_ready,
+        "checks": {
+            "redis": redis_state,
+            "region_data": {"ready": region_ready, "version": snapshot.version if snapshot else None},
+            "schedulers": collector.status(),
+            "collectors": collectors,
+        },
+    })
+
+
+# ── 최신 매물 (번개장터 / 중고나라 공용) ──────────────────────────────────────
+
+
+def _recent_listings(source: str):
+    """
+    최신 매물 수집기(recent_poller)가 감지한 새 매물 조회 (업스트림 요청 없음).
+
+    Query Parameters:
+        within_minutes (int, 선택): 최근 N분 안에 감지된 매물 (기본 1, 최대 60)
+        keyword        (str, 선택): 이 키워드로 감지된 매물만. 추적 중이 아니면 추적 목록에
+                                    추가되어 다음 수집부터 폴링된다
+
+    keyword 지정 시 응답에 keyword / tracked가 추가된다.
+    tracked=false: 추적 목록이 가득 차 이 키워드는 폴링되지 않음 (결과가 계속 비어 있음)
+    """
+    import recent_poller
+    import redis_conn
+    from listing_index import normalize
+
+    keyword = request.args.get("keyword", "").strip()
+    try:
+        within_minutes = int(request.args.get("within_minutes", 1))
+    except ValueError:
+        return _error("within_minutes는 정수여야 합니다.", 400)
+    if not 1 <= within_minutes <= recent_poller.HISTORY_MINUTES:
+        return _error(f"within_minutes는 1~{recent_poller.HISTORY_MINUTES} 사이여야 합니다.", 400)
+    r = redis_conn.get()
+    if not r:
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        tracked = None
+        if keyword:
+            keyword = normalize(keyword)
+            tracked = recent_poller.track(r, keyword)
+        items = recent_poller.recent_items(r, source, within_minutes, keyword or None)
+    except Exception as e:
+        logger.error("최신 매물 조회 실패 (source=%s, keyword=%s): %s", source, keyword, e)
+        return _error("최신 매물 조회에 실패했습니다.", 500)
+
+    if tracked is None:
+        return _success(items, count=len(items), source=source)
+    return jsonify({
+        "ok": True,
+        "data": items,
+        "count": len(items),
+        "source": source,
+        "keyword": keyword,
+        "tracked": tracked,
+    }), 200
 
 
 # ── 번개장터 ────────────────────────────────────────────────────────────────────
 
 
 @app.get("/api/bunjang/search")
+@_admission("bunjang_search")
 def bunjang_search():
     """번개장터 키워드 검색"""
     from scrapers.bunjang_scraper import search
@@ -115,10 +393,17 @@ def bunjang_search():
     )
 
 
+@app.get("/api/bunjang/recent")
+def bunjang_recent():
+    """번개장터 최신 매물 (키워드별 증분 폴링으로 감지된 새 매물)"""
+    return _recent_listings("bunjang")
+
+
 # ── 중고나라 ──────────────────────────────────────────────────────────────────
 
 
 @app.get("/api/joongna/search")
+@_admission("joongna_search")
 def joongna_search():
     """중고나라 키워드 검색"""
     from scrapers.joongna_scraper import search
@@ -147,6 +432,64 @@ def joongna_search():
     )
 
 
+@app.get("/api/joongna/recent")
+def joongna_recent():
+    """중고나라 최신 매물 (키워드별 증분 폴링으로 감지된 새 매물)"""
+    return _recent_listings("joongna")
+
+
+# ── 배치 검색 ─────────────────────────────────────────────────────────────────
+
+
+def _batch_weight() -> int:
+    """배치 검색 비용 = 쿼리 수"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return 1  # 형식 오류는 search_batch의 검증이 400으로 응답
+    queries = body.get("queries")
+    return len(queries) if isinstance(queries, list) and queries else 1
+
+
+@app.post("/api/search/batch")
+@_admission("search_batch", weight=_batch_weight)
+def search_batch():
+    """
+    여러 플랫폼/키워드 검색을 한 번에 병렬 실행.
+
+    Request Body (JSON):
+        {
+          "queries": [
+            {"id": "u12-k3", "source": "bunjang", "keyword": "닌텐도",
+             "filters": {"min_price": 10000, "sort": "recent"}},
+            {"source": "joongna", "keyword": "아이폰"}
+          ]
+        }
+
+    Response:
+        {
+          "ok": true,
+          "data": {
+            "u12-k3":         {"ok": true, "source": "bunjang", "keyword": "닌텐도", "items": [...], "total": 120},
+            "joongna:아이폰": {"ok": true, "source": "joongna", "keyword": "아이폰", "items": [...], "total": 80}
+          },
+          "count": 2
+        }
+    """
+    from batch_search import run_batch, validate
+
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return _error("JSON 본문이 필요합니다. (예: {\"queries\": [...]})", 400)
+
+    try:
+        queries = validate(body.get("queries"))
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    results = run_batch(queries)
+    return _success(results, count=len(results))
+
+
 # ── 당근 ──────────────────────────────────────────────────────────────────────
 
 
@@ -156,23 +499,24 @@ def daangn_regions_collect():
     당근 전국 지역 데이터 즉시 수집 (스케줄러 수동 실행).
 
     collect_all_regions()를 즉시 실행하고 수집 결과를 반환합니다.
-    """
-    import json
-    import redis as _redis_mod
 
+    Query Parameters:
+        full (bool, 선택): true면 변경 감지 없이 전체 구/군의 동 목록을 다시 수집 (기본 false = 증분)
+    """
+    import region_cache
     from region_scheduler import collect_all_regions
 
+    full = request.args.get("full", "false").lower() == "true"
+
     try:
-        collect_all_regions()
+        collect_all_regions(full=full)
     except Exception as e:
         logger.error("지역 데이터 수동 수집 실패: %s", e)
         return _error(f"수집 실패: {e}", 500)
 
-    _redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     try:
-        r = _redis_mod.from_url(_redis_url, decode_responses=True)
-        regions = json.loads(r.get("daangn:regions:all") or "[]")
-        districts = json.loads(r.get("daangn:districts:all") or "[]")
+        regions = region_cache.regions() or []
+        districts = region_cache.districts() or []
         return _success({
             "message": "지역 데이터 수집 완료",
             "provinces": len(regions),
@@ -187,28 +531,25 @@ def daangn_regions():
     """
     전국 시/도 + 구/군 계층 목록 반환.
 
-    스케줄러가 수집한 Redis 데이터에서 반환합니다.
+    스케줄러가 수집한 데이터를 프로세스 내 지역 캐시(region_cache)에서 반환합니다.
     데이터가 없으면 즉시 수집을 실행합니다.
+
+    HTTP 캐싱: 지역 데이터 내용 해시 기반 ETag + Cache-Control. If-None-Match 일치 시 304.
     """
-    import json
-    import redis as _redis_mod
+    import region_cache
 
-    _redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     try:
-        r = _redis_mod.from_url(_redis_url, decode_responses=True)
-        data = r.get("daangn:regions:all")
-        if data:
-            regions = json.loads(data)
-            return _success(regions, count=len(regions))
+        snapshot = region_cache.get_snapshot()
+        if snapshot and snapshot.regions:
+            return _cached_success(snapshot.regions, tag=f"regions-{snapshot.digest}", version=snapshot.digest, count=len(snapshot.regions))
 
         # 데이터 없으면 즉시 수집
         from region_scheduler import collect_all_regions
         collect_all_regions()
 
-        data = r.get("daangn:regions:all")
-        if data:
-            regions = json.loads(data)
-            return _success(regions, count=len(regions))
+        snapshot = region_cache.get_snapshot()
+        if snapshot and snapshot.regions:
+            return _cached_success(snapshot.regions, tag=f"regions-{snapshot.digest}", version=snapshot.digest, count=len(snapshot.regions))
 
         return _error("지역 데이터 수집에 실패했습니다.", 503)
     except Exception as e:
@@ -221,18 +562,16 @@ def daangn_region_dongs(region_id: int):
     """
     특정 구/군의 동/읍/면 목록 반환.
 
-    Redis에서 daangn:dongs:{regionId} 조회.
+    daangn:dongs:{regionId} 데이터를 프로세스 내 지역 캐시(region_cache)에서 조회.
+    HTTP 캐싱은 /api/daangn/regions와 동일 (ETag + Cache-Control + 304).
     """
-    import json
-    import redis as _redis_mod
+    import region_cache
 
-    _redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     try:
-        r = _redis_mod.from_url(_redis_url, decode_responses=True)
-        data = r.get(f"daangn:dongs:{region_id}")
-        if data:
-            dongs = json.loads(data)
-            return _success(dongs, count=len(dongs))
+        snapshot = region_cache.get_snapshot()
+        dongs = snapshot.dongs.get(region_id) if snapshot else None
+        if dongs is not None:
+            return _cached_success(dongs, tag=f"dongs-{region_id}-{snapshot.digest}", version=snapshot.digest, count=len(dongs))
         return _error(f"regionId={region_id}에 해당하는 동 데이터가 없습니다.", 404)
     except Exception as e:
         logger.error("동 목록 조회 실패 (regionId=%s): %s", region_id, e)
@@ -240,6 +579,7 @@ def daangn_region_dongs(region_id: int):
 
 
 @app.post("/api/daangn/listings/collect")
+@_admission("daangn_listings_collect")
 def daangn_listings_collect():
     """
     당근 전국 매물 즉시 수집 (수동 실행 / 테스트용).
@@ -281,6 +621,289 @@ def daangn_listings_status():
         return _error("상태 조회에 실패했습니다.", 500)
 
 
+@app.get("/api/daangn/listings/stats")
+def daangn_listings_stats():
+    """
+    당근 매물 수집 실행 이력 통계 (용량 계획용).
+
+    Query Parameters:
+        windows (str, 선택): 집계 기간(분) 목록, 콤마 구분 (기본 "60,1440,10080" = 1시간/1일/7일)
+
+    Response data:
+        [{"window_minutes": 60, "runs": 60, "duration_p50": 24.1, "duration_p95": 31.0,
+          "duration_p99": 38.2, "success_rate": 0.998, "new_listings_per_minute": 1.4, ...}, ...]
+    """
+    import redis_conn
+    from listing_scheduler import run_stats
+
+    if not redis_conn.available():
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        windows = [int(w) for w in request.args.get("windows", "60,1440,10080").split(",") if w.strip()]
+    except ValueError:
+        return _error("windows 파라미터는 분 단위 정수 목록입니다. (예: ?windows=60,1440)", 400)
+    if not windows or any(w <= 0 for w in windows):
+        return _error("windows 파라미터는 양의 정수여야 합니다.", 400)
+
+    try:
+        stats = [run_stats(w) for w in windows]
+    except Exception as e:
+        logger.error("매물 수집 통계 조회 실패: %s", e)
+        return _error("통계 조회에 실패했습니다.", 500)
+
+    return _success(stats, count=len(stats))
+
+
+@app.get("/api/daangn/listings/search")
+def daangn_listings_search():
+    """
+    수집된 당근 매물 로컬 검색 (업스트림 요청 없음).
+
+    매분 매물 수집기가 유지하는 구/군별 역색인(listing_index)에서 최근 매물을 찾는다.
+    색인 보존 기간(DAANGN_INDEX_MAX_AGE_HOURS, 기본 24시간) 안에 새로 감지된 매물만 대상.
+
+    Query Parameters:
+        keyword   (str, 필수): 검색 키워드 (2글자 이상의 한글 또는 영문/숫자 포함)
+        region_id (str, 필수): 구/군 regionId, 콤마로 최대 20개 (예: "3600,3601")
+        count     (int, 선택): 최대 결과 수 (기본 20, 최대 100)
+    """
+    import listing_index
+    import redis_conn
+
+    keyword = request.args.get("keyword", "").strip()
+    if not keyword:
+        return _error("keyword 파라미터가 필요합니다.", 400)
+    try:
+        region_ids = [int(v) for v in request.args.get("region_id", "").split(",") if v.strip()]
+        count = min(int(request.args.get("count", 20)), 100)
+    except ValueError:
+        return _error("region_id와 count는 정수여야 합니다.", 400)
+    if not region_ids:
+        return _error("region_id 파라미터가 필요합니다.", 400)
+    if len(region_ids) > 20:
+        return _error("region_id는 최대 20개까지 지정할 수 있습니다.", 400)
+    listing_redis = redis_conn.get()
+    if not listing_redis:
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        items = listing_index.search(listing_redis, keyword, region_ids, limit=count)
+    except ValueError as e:
+        return _error(str(e), 400)
+    except Exception as e:
+        logger.error("매물 색인 검색 실패 (keyword=%s): %s", keyword, e)
+        return _error("검색에 실패했습니다.", 500)
+
+    return _success(items, count=len(items), source="daangn")
+
+
+@app.get("/api/daangn/prices")
+def daangn_prices():
+    """
+    당근 시세 조회 — 키워드 × 구/군 일자별 가격 통계 (업스트림 요청 없음).
+
+    매분 매물 수집기가 새 매물에서 누적한 롤업(price_rollup)을 반환한다.
+    추적하지 않는 키워드는 tracked=false로 빈 통계를 반환한다 (추적 목록은 PUT /api/daangn/prices/keywords).
+
+    Query Parameters:
+        keyword   (str, 필수): 시세 키워드 (예: "스위치")
+        region_id (int, 필수): 구/군 regionId
+        days      (int, 선택): 최근 일수 (기본 7, 최대 30)
+
+    Response data:
+        {"keyword": "스위치", "region_id": 3600, "tracked": true,
+         "days": [{"date": "20260315", "count": 12, "median": 250000, "p10": 150000, "p90": 330000}, ...],
+         "summary": {"count": 80, "median": 240000, "p10": 140000, "p90": 340000}}
+    """
+    import price_rollup
+    import redis_conn
+
+    keyword = request.args.get("keyword", "").strip()
+    if not keyword:
+        return _error("keyword 파라미터가 필요합니다.", 400)
+    try:
+        region_id = int(request.args.get("region_id", ""))
+        days = int(request.args.get("days", 7))
+    except ValueError:
+        return _error("region_id와 days는 정수여야 합니다.", 400)
+    if not 1 <= days <= price_rollup.MAX_DAYS:
+        return _error(f"days는 1~{price_rollup.MAX_DAYS} 사이여야 합니다.", 400)
+    listing_redis = redis_conn.get()
+    if not listing_redis:
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        data = price_rollup.rollup(listing_redis, keyword, region_id, days=days)
+    except Exception as e:
+        logger.error("시세 조회 실패 (keyword=%s, regionId=%s): %s", keyword, region_id, e)
+        return _error("시세 조회에 실패했습니다.", 500)
+
+    return _success(data)
+
+
+@app.put("/api/daangn/prices/keywords")
+def daangn_price_keywords():
+    """
+    시세 추적 키워드 지정 (관리용). 기존 목록을 통째로 교체하며 DAANGN_PRICE_KEYWORDS는 항상 포함된다.
+
+    Request Body (JSON):
+        {"keywords": ["스위치", "아이폰 15"]}
+
+    Response data: 정규화된 추적 키워드 목록 (다음 수집부터 집계)
+    """
+    import price_rollup
+    import redis_conn
+
+    body = request.get_json(silent=True)
+    keywords = body.get("keywords") if isinstance(body, dict) else None
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return _error("JSON 본문이 필요합니다. (예: {\"keywords\": [\"스위치\"]})", 400)
+    r = redis_conn.get()
+    if not r:
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        saved = price_rollup.set_tracked(r, keywords)
+    except ValueError as e:
+        return _error(str(e), 400)
+    except Exception as e:
+        logger.error("시세 추적 키워드 저장 실패: %s", e)
+        return _error("시세 추적 키워드 저장에 실패했습니다.", 500)
+
+    return _success(saved, count=len(saved))
+
+
+@app.put("/api/daangn/keywords/subscribers")
+def daangn_keyword_subscribers():
+    """
+    알림 키워드별 구독자 수 동기화 (키워드 우선 수집 플래너 입력). 기존 목록을 통째로 교체한다.
+
+    Request Body (JSON):
+        {"keywords": {"아이폰": 120, "닌텐도 스위치": 3}}
+
+    Response data: 정규화된 {키워드: 구독자 수} (구독자 0명 키워드는 제외)
+    """
+    import keyword_planner
+    import redis_conn
+
+    body = request.get_json(silent=True)
+    keywords = body.get("keywords") if isinstance(body, dict) else None
+    if not isinstance(keywords, dict) or not all(
+        isinstance(k, str) and isinstance(v, int) and not isinstance(v, bool) for k, v in keywords.items()
+    ):
+        return _error("JSON 본문이 필요합니다. (예: {\"keywords\": {\"아이폰\": 120}})", 400)
+    r = redis_conn.get()
+    if not r:
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        saved = keyword_planner.set_subscribers(r, keywords)
+    except Exception as e:
+        logger.error("키워드 구독자 수 저장 실패: %s", e)
+        return _error("구독자 수 저장에 실패했습니다.", 500)
+
+    return _success(saved, count=len(saved))
+
+
+@app.get("/api/daangn/keywords/plan")
+def daangn_keyword_plan():
+    """
+    키워드 우선 수집 플랜 조회 — 수집 모드(sweep | targeted), 키워드별 구독자 수 / 분당 매칭 수 / 사유.
+
+    Response data:
+        {"plan": {"mode": "targeted", "sweep_cost": 281, "targeted_cost": 12, "computed_at": ...,
+                  "keywords": {"아이폰": {"subscribers": 120, "match_rate": 3.2, "pages": 1,
+                                        "mode": "targeted", "reason": "eligible"}, ...}},
+         "targeted_last_run": {...}}
+    """
+    import json
+
+    import keyword_planner
+    import redis_conn
+
+    r = redis_conn.get()
+    if not r:
+        return _error("Redis 연결 없음", 503)
+
+    try:
+        plan = keyword_planner.current(r)
+        last_run = r.get(keyword_planner.TARGETED_LAST_RUN_KEY)
+    except Exception as e:
+        logger.error("수집 플랜 조회 실패: %s", e)
+        return _error("수집 플랜 조회에 실패했습니다.", 500)
+    if plan is None:
+        return _error("아직 수집 플랜이 없습니다. (스케줄러 실행 필요)", 404)
+
+    return _success({"plan": plan, "targeted_last_run": json.loads(last_run) if last_run else None})
+
+
+@app.get("/api/debug/memory")
+def debug_memory():
+    """
+    메모리 상태 — 이 프로세스의 RSS / tracemalloc 스냅샷 목록 / 최근 스냅샷 상위 할당 위치와,
+    모든 프로세스(API, collector)의 최근 수집 실행 메모리 요약(recent_runs, Redis).
+
+    tracemalloc 스냅샷은 MEMORY_PROFILE=1일 때만 수집 실행 전/후로 저장되며 프로세스 메모리에만 있다.
+    수집이 collector.py에서 돌면 snapshots는 비어 있고 recent_runs만 채워진다.
+
+    Query Parameters:
+        runs (int, 선택): recent_runs 최대 개수 (기본 20, 최대 memory_profile.RUNS_MAX)
+    """
+    import memory_profile
+
+    try:
+        runs_limit = min(int(request.args.get("runs", 20)), memory_profile.RUNS_MAX)
+    except ValueError:
+        return _error("runs 파라미터는 정수여야 합니다.", 400)
+
+    r = redis_conn.get()
+    recent_runs = None
+    if r is not None:
+        try:
+            recent_runs = memory_profile.recent_runs(r, limit=runs_limit)
+        except Exception as e:
+            logger.warning("실행 메모리 요약 조회 실패: %s", e)
+
+    return _success({
+        "enabled": memory_profile.ENABLED,
+        "rss_mb": memory_profile.rss_mb(),
+        "peak_rss_mb": memory_profile.peak_rss_mb(),
+        "snapshots": memory_profile.list_snapshots(),
+        "top_allocations": memory_profile.latest_top(),
+        "recent_runs": recent_runs,
+    })
+
+
+@app.get("/api/debug/memory/diff")
+def debug_memory_diff():
+    """
+    두 tracemalloc 스냅샷의 할당 위치별 차이 (증가량 큰 순).
+
+    Query Parameters:
+        from  (int, 필수): 기준 스냅샷 id
+        to    (int, 필수): 비교 스냅샷 id
+        limit (int, 선택): 최대 위치 수 (기본 20, 최대 100)
+    """
+    import memory_profile
+
+    if not memory_profile.ENABLED:
+        return _error("메모리 프로파일링이 꺼져 있습니다. (MEMORY_PROFILE=1)", 404)
+    try:
+        from_id = int(request.args.get("from", ""))
+        to_id = int(request.args.get("to", ""))
+        limit = min(int(request.args.get("limit", 20)), 100)
+    except ValueError:
+        return _error("from, to, limit 파라미터는 정수여야 합니다.", 400)
+
+    try:
+        rows = memory_profile.diff(from_id, to_id, limit=limit)
+    except KeyError as e:
+        return _error(f"스냅샷 id={e.args[0]}를 찾을 수 없습니다.", 404)
+
+    return _success(rows, count=len(rows))
+
+
 @app.get("/api/daangn/location")
 def daangn_location():
     """
@@ -341,6 +964,7 @@ def daangn_location():
 
 
 @app.get("/api/daangn/search")
+@_admission("daangn_search")
 def daangn_search():
     """
     당근 단건 검색.
@@ -371,6 +995,7 @@ def daangn_search():
 
 
 @app.get("/api/daangn/multi-search")
+@_admission("daangn_multi_search", weight=_multi_search_weight)
 def daangn_multi_search():
     """
     당근 구/군 단위 병렬 매물 검색.
@@ -434,6 +1059,7 @@ def daangn_multi_search():
 
 
 @app.get("/api/daangn/district-search")
+@_admission("daangn_district_search")
 def daangn_district_search():
     """
     당근 구 레벨 직접 키워드 검색 (Remix _data loader).
@@ -462,6 +1088,8 @@ def daangn_district_search():
         result = search_district_direct(keyword=keyword, district=district, count=count)
     except ValueError as e:
         return _error(str(e), 404)
+    except BudgetExhausted:
+        raise  # 전역 핸들러가 503으로 응답
     except Exception as e:
         logger.error("당근 district-search 오류 (district=%s): %s", district, e)
         return _error("당근 구 레벨 검색에 실패했습니다.", 502)
@@ -489,6 +1117,12 @@ def method_not_allowed(e):
     return _error(f"허용되지 않는 HTTP 메서드입니다. {e}", 405)
 
 
+@app.errorhandler(BudgetExhausted)
+def budget_exhausted(e):
+    logger.warning("업스트림 요청 거절: %s", e)
+    return _error("요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.", 503, retry_after=e.retry_after)
+
+
 @app.errorhandler(500)
 def internal_error(e):
     logger.exception("내부 서버 오류: %s", e)
@@ -497,6 +1131,23 @@ def internal_error(e):
 
 # ── 서버 시작 ───────────────────────────────────────────────────────────────────
 
+def _warm_up():
+    """백그라운드 준비 — Redis 연결을 기다린 뒤 지역 데이터를 메모리 캐시에 로드 (없으면 주기적으로 재시도)"""
+    import redis_conn
+    import region_cache
+
+    while True:
+        if redis_conn.check():
+            try:
+                snapshot = region_cache.get_snapshot()
+                if snapshot and snapshot.regions:
+                    logger.info("준비 완료: 지역 데이터 캐시 로드 (version=%d)", snapshot.version)
+                    return
+            except Exception as e:
+                logger.warning("지역 데이터 캐시 로드 실패: %s", e)
+        time.sleep(redis_conn.MONITOR_INTERVAL)
+
+
 def _log_endpoints():
     """등록된 엔드포인트 목록을 로그로 출력"""
     rules = sorted(
@@ -515,36 +1166,25 @@ if __name__ == "__main__":
     port = int(os.getenv("FLASK_PORT", "5000"))
     debug = os.getenv("FLASK_DEBUG", "false").lower() == "true"
 
-    # 당근 지역 데이터 스케줄러 시작
-    try:
-        import redis as _redis_mod
-        from region_scheduler import collect_all_regions, create_region_scheduler
-
-        _redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        r = _redis_mod.from_url(_redis_url, decode_responses=True)
-        r.ping()
-
-        region_scheduler = create_region_scheduler()
-        region_scheduler.start()
-        logger.info("당근 지역 스케줄러 시작 (매일 04:00 실행)")
+    # 메모리 계측 (MEMORY_PROFILE=1일 때만 tracemalloc 추적 — 스케줄러 시작 전에 켠다)
+    import memory_profile
+    memory_profile.start()
 
-        # 최초 실행: Redis에 지역 데이터가 없으면 즉시 수집
-        if not r.exists("daangn:regions:all"):
-            logger.info("Redis에 지역 데이터 없음 — 최초 수집 시작")
-            collect_all_regions()
-    except Exception as e:
-        logger.warning("당근 지역 스케줄러 시작 실패 (서버는 정상 동작): %s", e)
+    # 준비 작업은 모두 백그라운드 — Redis/지역 데이터를 기다리지 않고 바로 요청을 받는다.
+    #   Redis 연결 확인 → 지역 데이터 메모리 캐시 로드 (준비 상태는 /health)
+    #   스케줄러 (리더 선출 + 지역/매물 수집). CRAWLER_RUN_SCHEDULERS=false면 수집은
+    #   별도 워커(collector.py)에 맡기고 이 프로세스는 API 요청만 처리한다.
+    import collector
 
-    # 당근 매물 수집 스케줄러 시작 (매분 정각 실행)
-    try:
-        from listing_scheduler import create_listing_scheduler
-
-        listing_scheduler = create_listing_scheduler()
-        listing_scheduler.start()
-        logger.info("당근 매물 수집 스케줄러 시작 (매분 정각 실행)")
-    except Exception as e:
-        logger.warning("당근 매물 수집 스케줄러 시작 실패 (서버는 정상 동작): %s", e)
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    if os.getenv("CRAWLER_RUN_SCHEDULERS", "true").lower() == "true":
+        collector.start_in_background()
+    else:
+        logger.info("CRAWLER_RUN_SCHEDULERS=false — 수집은 별도 워커(collector.py)가 담당")
 
     logger.info("크롤러 서버 시작: http://%s:%s (debug=%s)", host, port, debug)
     _log_endpoints()
-    app.run(host=host, port=port, debug=debug)
+    try:
+        app.run(host=host, port=port, debug=debug)
+    finally:
+        collector.stop_schedulers(wait=False)
@@ -0,0 +1,217 @@
+"""
+테스트 공통 — crawler/ 모듈 import 경로 + Redis 없이 쓰는 인메모리 fake
+
+  cd crawler && python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leader  # noqa: E402
+import lease  # noqa: E402
+
+
+class FakeRedis:
+    """
+    테스트 대상 모듈이 쓰는 명령만 구현한 인메모리 Redis (decode_responses=True).
+
+    TTL은 값만 기록하고 만료시키지 않는다 — 만료는 테스트에서 expire_now(key)로 흉내낸다.
+    EVAL은 scripts에 등록한 Lua 스크립트 대응 함수(fn(r, keys, args))로 실행한다.
+    """
+
+    def __init__(self):
+        self.data: dict[str, object] = {}
+        self.ttl: dict[str, int] = {}
+        self.scripts = {
+            lease._RENEW_LUA: _renew_lua,
+            lease._RELEASE_LUA: _release_lua,
+            leader._ACQUIRE_LUA: _leader_acquire_lua,
+        }
+
+    def expire_now(self, key):
+        self.data.pop(key, None)
+        self.ttl.pop(key, None)
+
+    # Keys
+    def delete(self, *keys):
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    def exists(self, *keys):
+        return sum(k in self.data for k in keys)
+
+    def expire(self, key, seconds):
+        if key not in self.data:
+            return 0
+        self.ttl[key] = int(seconds)
+        return 1
+
+    def eval(self, script, numkeys, *args):
+        return self.scripts[script](self, list(args[:numkeys]), list(args[numkeys:]))
+
+    # String
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        if ex is not None:
+            self.ttl[key] = int(ex)
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def incr(self, key):
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value)
+        return value
+
+    # Hash
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hmget(self, key, fields):
+        h = self.data.get(key, {})
+        return [h.get(f) for f in fields]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        h = self.data.setdefault(key, {})
+        if field is not None:
+            h[field] = str(value)
+        for k, v in (mapping or {}).items():
+            h[k] = str(v)
+        return len(h)
+
+    # List
+    def lpush(self, key, *values):
+        lst = self.data.setdefault(key, [])
+        for v in values:
+            lst.insert(0, str(v))
+        return len(lst)
+
+    def lrange(self, key, start, end):
+        lst = self.data.get(key, [])
+        return lst[start:] if end == -1 else lst[start : end + 1]
+
+    def ltrim(self, key, start, end):
+        if key in self.data:
+            self.data[key] = self.lrange(key, start, end)
+        return True
+
+    # Set
+    def sadd(self, key, *members):
+        s = self.data.setdefault(key, set())
+        before = len(s)
+        s.update(str(m) for m in members)
+        return len(s) - before
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    # Sorted set
+    def zadd(self, key, mapping, nx=False):
+        z = self.data.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            member = str(member)
+            if nx and member in z:
+                continue
+            added += member not in z
+            z[member] = float(score)
+        return added
+
+    def zrem(self, key, *members):
+        z = self.data.get(key, {})
+        return sum(z.pop(str(m), None) is not None for m in members)
+
+    def zrange(self, key, start, end, withscores=False):
+        rows = sorted(self.data.get(key, {}).items(), key=lambda kv: (kv[1], kv[0]))
+        rows = rows[start:] if end == -1 else rows[start : end + 1]
+        return rows if withscores else [m for m, _ in rows]
+
+    # pipeline — 명령을 바로 실행하고 결과를 모아 execute()에서 반환
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, r: FakeRedis):
+        self._r = r
+        self._results = []
+
+    def __getattr__(self, name):
+        command = getattr(self._r, name)
+
+        def _queue(*args, **kwargs):
+            self._results.append(command(*args, **kwargs))
+            return self
+
+        return _queue
+
+    def execute(self):
+        results, self._results = self._results, []
+        return results
+
+
+class FakeAsyncRedis:
+    """FakeRedis를 감싼 redis.asyncio 클라이언트 흉내 (명령은 코루틴, pipeline.execute()만 await)"""
+
+    def __init__(self, r: FakeRedis):
+        self.sync = r
+
+    def __getattr__(self, name):
+        command = getattr(self.sync, name)
+
+        async def _command(*args, **kwargs):
+            return command(*args, **kwargs)
+
+        return _command
+
+    def pipeline(self, transaction=True):
+        return _FakeAsyncPipeline(self.sync)
+
+
+class _FakeAsyncPipeline(_FakePipeline):
+    async def execute(self):
+        return super().execute()
+
+
+# ── Lua 스크립트 대응 ──────────────────────────────────────────────────────────
+
+
+def _renew_lua(r, keys, args):
+    if r.get(keys[0]) == str(args[0]):
+        return r.expire(keys[0], args[1])
+    return 0
+
+
+def _release_lua(r, keys, args):
+    if r.get(keys[0]) == str(args[0]):
+        return r.delete(keys[0])
+    return 0
+
+
+def _leader_acquire_lua(r, keys, args):
+    if r.set(keys[0], args[0], nx=True, ex=args[1]):
+        return r.incr(keys[1])
+    return 0
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_aredis(fake_redis):
+    """fake_redis와 같은 데이터를 보는 비동기 클라이언트"""
+    return FakeAsyncRedis(fake_redis)
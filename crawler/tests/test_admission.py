@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from admission import Saturated, WeightedLimiter
+
+
+def test_admits_within_capacity_and_releases():
+    limiter = WeightedLimiter("t", capacity=10)
+
+    with limiter.admit(4), limiter.admit(6):
+        assert limiter.stats()["in_use"] == 10
+    assert limiter.stats()["in_use"] == 0
+
+
+def test_weight_is_capped_to_capacity():
+    limiter = WeightedLimiter("t", capacity=5)
+
+    with limiter.admit(50):
+        assert limiter.stats()["in_use"] == 5
+
+
+def test_full_queue_is_rejected_immediately():
+    limiter = WeightedLimiter("t", capacity=1, max_waiting=0)
+
+    with limiter.admit(1):
+        with pytest.raises(Saturated) as exc:
+            with limiter.admit(1):
+                pass
+    assert exc.value.retry_after >= 1
+
+
+def test_waiter_times_out():
+    limiter = WeightedLimiter("t", capacity=1, wait_timeout=0.05)
+
+    with limiter.admit(1):
+        with pytest.raises(Saturated):
+            with limiter.admit(1):
+                pass
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_waiter_is_admitted_when_capacity_frees():
+    limiter = WeightedLimiter("t", capacity=2, wait_timeout=2.0)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def _hold():
+        with limiter.admit(2):
+            holding.set()
+            release.wait(2)
+
+    t = threading.Thread(target=_hold)
+    t.start()
+    holding.wait(2)
+    threading.Timer(0.05, release.set).start()
+
+    with limiter.admit(1):
+        assert limiter.stats()["in_use"] == 1
+    t.join()
@@ -0,0 +1,75 @@
+import pytest
+
+import batch_search
+
+
+def test_normalizes_query_and_default_key():
+    [q] = batch_search.validate([{"source": " bunjang ", "keyword": " 닌텐도 "}])
+
+    assert q == {"key": "bunjang:닌텐도", "source": "bunjang", "keyword": "닌텐도", "filters": {}}
+
+
+def test_filters_are_coerced_and_part_of_default_key():
+    [q] = batch_search.validate([
+        {"source": "joongna", "keyword": "아이폰", "filters": {"sort": "recent", "min_price": "10000", "page": None}},
+    ])
+
+    assert q["filters"] == {"sort": "recent", "min_price": 10000}
+    assert q["key"] == "joongna:아이폰?min_price=10000&sort=recent"
+
+
+def test_explicit_id_is_key():
+    [q] = batch_search.validate([{"id": "u12-k3", "source": "daangn", "keyword": "자전거"}])
+
+    assert q["key"] == "u12-k3"
+
+
+def test_same_query_twice_shares_key():
+    queries = batch_search.validate([
+        {"source": "bunjang", "keyword": "닌텐도"},
+        {"source": "bunjang", "keyword": "닌텐도"},
+    ])
+
+    assert [q["key"] for q in queries] == ["bunjang:닌텐도", "bunjang:닌텐도"]
+
+
+def test_different_filters_get_different_keys():
+    queries = batch_search.validate([
+        {"source": "bunjang", "keyword": "닌텐도", "filters": {"page": 1}},
+        {"source": "bunjang", "keyword": "닌텐도", "filters": {"page": 2}},
+    ])
+
+    assert queries[0]["key"] != queries[1]["key"]
+
+
+def test_conflicting_ids_are_rejected():
+    with pytest.raises(ValueError, match="겹칩니다"):
+        batch_search.validate([
+            {"id": "k", "source": "bunjang", "keyword": "닌텐도"},
+            {"id": "k", "source": "joongna", "keyword": "닌텐도"},
+        ])
+
+
+@pytest.mark.parametrize(
+    "queries, message",
+    [
+        ([], "비어 있지 않은 배열"),
+        ({"source": "bunjang"}, "비어 있지 않은 배열"),
+        (["bunjang"], "객체"),
+        ([{"source": "coupang", "keyword": "x"}], "source"),
+        ([{"source": "bunjang", "keyword": "  "}], "keyword"),
+        ([{"source": "bunjang", "keyword": "x", "filters": ["page"]}], "filters는 객체"),
+        ([{"source": "daangn", "keyword": "x", "filters": {"sort": "recent"}}], "지원하지 않는"),
+        ([{"source": "bunjang", "keyword": "x", "filters": {"page": "two"}}], "숫자"),
+    ],
+)
+def test_invalid_queries(queries, message):
+    with pytest.raises(ValueError, match=message):
+        batch_search.validate(queries)
+
+
+def test_too_many_queries():
+    queries = [{"source": "bunjang", "keyword": f"k{i}"} for i in range(batch_search.MAX_QUERIES + 1)]
+
+    with pytest.raises(ValueError, match="최대"):
+        batch_search.validate(queries)
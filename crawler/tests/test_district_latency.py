@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+import district_latency as dl
+
+
+def test_no_samples_is_unknown():
+    stats = dl._summarize([])
+
+    assert stats.samples == 0
+    assert stats.p95 is None
+    assert stats.timeout == dl.DEFAULT_TIMEOUT
+
+
+def test_p95_from_successes():
+    stats = dl._summarize([str(ms) for ms in range(100, 2100, 100)])  # 100..2000ms, 20개
+
+    assert stats.samples == 20
+    assert stats.p95 == pytest.approx(1.9)
+    assert stats.failure_rate == 0
+    assert stats.timeout == pytest.approx(1.9 * dl.TIMEOUT_FACTOR + dl.TIMEOUT_PADDING)
+
+
+def test_too_few_samples_use_default_timeout():
+    stats = dl._summarize(["200"] * (dl.MIN_SAMPLES - 1))
+
+    assert stats.p95 == pytest.approx(0.2)
+    assert stats.timeout == dl.DEFAULT_TIMEOUT
+
+
+def test_timeout_is_clamped():
+    assert dl._summarize(["10"] * 10).timeout == dl.MIN_TIMEOUT
+    assert dl._summarize(["9000"] * 10).timeout == dl.MAX_TIMEOUT
+
+
+def test_censored_timeouts_raise_p95():
+    fast = ["200"] * 8
+    stats = dl._summarize(fast + ["x500", "x500"])  # 500ms timeout에 2번 끊김
+
+    assert stats.failure_rate == pytest.approx(0.2)
+    assert stats.p95 == pytest.approx(0.5)
+    assert stats.timeout > dl._summarize(fast).timeout
+
+
+def test_plain_failures_only_count_in_failure_rate():
+    stats = dl._summarize(["200"] * 8 + ["x", "x"])
+
+    assert stats.failure_rate == pytest.approx(0.2)
+    assert stats.p95 == pytest.approx(0.2)
+
+
+def test_all_plain_failures_have_no_p95():
+    stats = dl._summarize(["x"] * 6)
+
+    assert stats.p95 is None
+    assert stats.failure_rate == 1
+    assert stats.timeout == dl.DEFAULT_TIMEOUT
+    assert stats.priority == dl.DEFAULT_TIMEOUT
+
+
+def test_record_then_load_round_trip(fake_redis, fake_aredis):
+    samples = [(7, 0.25, True)] * 5 + [(7, 0.8, False), (7, None, False), (8, 0.1, True)]
+    asyncio.run(dl.record(fake_aredis, samples))
+
+    stats = asyncio.run(dl.load(fake_aredis, [7, 8, 9]))
+
+    assert fake_redis.lrange(f"{dl.KEY_PREFIX}7", 0, 1) == ["x", "x800"]
+    assert fake_redis.ttl[f"{dl.KEY_PREFIX}7"] == dl.TTL
+    assert stats[7].samples == 7
+    assert stats[7].p95 == pytest.approx(0.8)
+    assert stats[7].failure_rate == pytest.approx(2 / 7, abs=1e-3)
+    assert stats[9].samples == 0
+
+
+def test_record_keeps_only_recent_samples(fake_redis, fake_aredis):
+    asyncio.run(dl.record(fake_aredis, [(7, 0.1, True)] * (dl.SAMPLE_MAX + 10)))
+
+    assert len(fake_redis.lrange(f"{dl.KEY_PREFIX}7", 0, -1)) == dl.SAMPLE_MAX
+
+
+def test_redis_errors_fall_back_to_defaults():
+    class Down:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("down")
+
+    assert asyncio.run(dl.load(Down(), [1])) == {}
+    asyncio.run(dl.record(Down(), [(1, 0.1, True)]))  # 예외 없이 무시
@@ -0,0 +1,131 @@
+import json
+
+import keyword_planner as kp
+
+
+def _seed(r, subscribers: dict[str, int], rates: dict[str, float] | None = None):
+    r.hset(kp.SUBSCRIBERS_KEY, mapping=subscribers)
+    if rates:
+        r.hset(kp.MATCH_RATE_KEY, mapping=rates)
+
+
+# ── make_plan ────────────────────────────────────────────────────────────────
+
+
+def test_no_keywords_is_sweep(fake_redis):
+    plan = kp.make_plan(fake_redis, 281)
+
+    assert plan["mode"] == kp.MODE_SWEEP
+    assert plan["keywords"] == {}
+    assert kp.current(fake_redis) == plan
+
+
+def test_no_sweep_history_is_sweep(fake_redis):
+    _seed(fake_redis, {"아이폰": 3}, {"아이폰": 1.0})
+
+    assert kp.make_plan(fake_redis, None)["mode"] == kp.MODE_SWEEP
+
+
+def test_cheap_measured_keywords_go_targeted(fake_redis):
+    _seed(fake_redis, {"아이폰": 120, "닌텐도": 3}, {"아이폰": 3.2, "닌텐도": 0.5})
+
+    plan = kp.make_plan(fake_redis, 281)
+
+    assert plan["mode"] == kp.MODE_TARGETED
+    assert plan["targeted_cost"] == 2
+    assert plan["keywords"]["아이폰"] == {
+        "subscribers": 120, "match_rate": 3.2, "pages": 1, "mode": kp.MODE_TARGETED, "reason": "eligible",
+    }
+    assert sorted(kp.keywords_in(plan, kp.MODE_TARGETED)) == ["닌텐도", "아이폰"]
+
+
+def test_unmeasured_keyword_forces_sweep(fake_redis):
+    _seed(fake_redis, {"아이폰": 120, "닌텐도": 3}, {"아이폰": 3.2})
+
+    plan = kp.make_plan(fake_redis, 281)
+
+    assert plan["mode"] == kp.MODE_SWEEP
+    assert plan["keywords"]["닌텐도"]["reason"] == "unmeasured"
+    assert plan["keywords"]["아이폰"]["reason"] == "sweep_required"
+    assert kp.keywords_in(plan, kp.MODE_TARGETED) == []
+
+
+def test_busy_keyword_forces_sweep(fake_redis):
+    _seed(fake_redis, {"아이폰": 120, "폰": 5}, {"아이폰": 3.2, "폰": 1000})
+
+    plan = kp.make_plan(fake_redis, 281)
+
+    assert plan["mode"] == kp.MODE_SWEEP
+    assert plan["keywords"]["폰"]["reason"] == "too_busy"
+    assert plan["keywords"]["폰"]["pages"] > kp.MAX_PAGES
+
+
+def test_keyword_below_min_subscribers_is_ignored(fake_redis):
+    _seed(fake_redis, {"아이폰": 120, "자전거": 0}, {"아이폰": 3.2})
+
+    plan = kp.make_plan(fake_redis, 281)
+
+    assert plan["mode"] == kp.MODE_TARGETED
+    assert plan["keywords"]["자전거"] == {
+        "subscribers": 0, "match_rate": None, "pages": None, "mode": None, "reason": "ignored",
+    }
+
+
+def test_switch_hysteresis(fake_redis):
+    # ΣT = 7, S = 10 → 7 + 10 / 5 = 9: 전환 기준(S × 0.8 = 8)보다 크고 유지 기준(S)보다 작다
+    keywords = {f"k{i}": 1 for i in range(7)}
+    _seed(fake_redis, keywords, {k: 1.0 for k in keywords})
+
+    assert kp.make_plan(fake_redis, 10)["mode"] == kp.MODE_SWEEP
+
+    previous = json.loads(fake_redis.get(kp.PLAN_KEY))
+    previous["mode"] = kp.MODE_TARGETED
+    fake_redis.set(kp.PLAN_KEY, json.dumps(previous))
+
+    assert kp.make_plan(fake_redis, 10)["mode"] == kp.MODE_TARGETED
+
+
+def test_record_matches_is_ewma(fake_redis):
+    kp.record_matches(fake_redis, {"아이폰": 10.0})
+    kp.record_matches(fake_redis, {"아이폰": 0.0})
+
+    rate = float(fake_redis.hmget(kp.MATCH_RATE_KEY, ["아이폰"])[0])
+    assert rate == round((1 - kp.EWMA_ALPHA) * 10.0, 3)
+
+
+def test_set_subscribers_normalizes_and_drops_zero(fake_redis):
+    saved = kp.set_subscribers(fake_redis, {"아이폰": 3, " 아이폰 ": 2, "자전거": 0, "PS5": 1})
+
+    assert saved == {"아이폰": 5, "ps5": 1}
+    assert kp.subscribers(fake_redis) == saved
+
+
+# ── sweep_due ────────────────────────────────────────────────────────────────
+
+
+def _targeted_plan(computed_at: float) -> dict:
+    return {"mode": kp.MODE_TARGETED, "computed_at": computed_at, "keywords": {}}
+
+
+def test_sweep_due_without_plan_or_in_sweep_mode():
+    assert kp.sweep_due(None, 1000.0, now=1010.0)
+    assert kp.sweep_due({"mode": kp.MODE_SWEEP, "computed_at": 1000.0}, 1000.0, now=1010.0)
+
+
+def test_sweep_due_without_previous_sweep():
+    assert kp.sweep_due(_targeted_plan(1000.0), None, now=1000.0)
+
+
+def test_targeted_mode_sweeps_every_relaxed_interval():
+    interval = kp.SWEEP_RELAXED_MINUTES * 60
+    plan = _targeted_plan(10_000.0)
+
+    assert not kp.sweep_due(plan, 10_000.0 - 60, now=10_000.0)
+    assert kp.sweep_due(plan, 10_000.0 - interval + 30, now=10_000.0)  # 정각 tick 지터 여유
+
+
+def test_stale_targeted_plan_sweeps():
+    now = 10_000.0
+    plan = _targeted_plan(now - kp.PLAN_STALE_SECONDS - 1)
+
+    assert kp.sweep_due(plan, now - 60, now=now)
@@ -0,0 +1,80 @@
+import asyncio
+
+import leader
+
+
+def test_first_instance_becomes_leader_with_token(fake_redis):
+    a = leader.LeaderElector(fake_redis, owner="a:1")
+    b = leader.LeaderElector(fake_redis, owner="b:2")
+    a._tick()
+    b._tick()
+
+    assert a.is_leader and a.token == 1
+    assert not b.is_leader and b.token is None
+    assert leader.is_fence_current(fake_redis, 1)
+
+
+def test_failover_bumps_fence_and_old_leader_steps_down(fake_redis):
+    a = leader.LeaderElector(fake_redis, owner="a:1")
+    b = leader.LeaderElector(fake_redis, owner="b:2")
+    a._tick()
+
+    fake_redis.expire_now(leader.LEADER_KEY)  # a가 멈춘 사이 lease 만료
+    b._tick()
+    a._tick()
+
+    assert b.token == 2
+    assert a.token is None
+    assert not leader.is_fence_current(fake_redis, 1)
+    assert leader.is_fence_current(fake_redis, 2)
+
+
+def test_redis_error_drops_leadership(fake_redis):
+    a = leader.LeaderElector(fake_redis, owner="a:1")
+    a._tick()
+
+    def _down(*args):
+        raise ConnectionError("down")
+
+    fake_redis.eval = _down
+    a._tick()
+
+    assert not a.is_leader
+
+
+def test_guard_passes_token_only_to_leader(fake_redis):
+    calls = []
+
+    def job(fence_token=None):
+        calls.append(fence_token)
+        return "ran"
+
+    a = leader.LeaderElector(fake_redis, owner="a:1")
+    guarded = a.guard(job)
+
+    assert guarded() is None
+    a._tick()
+    assert guarded() == "ran"
+    assert calls == [1]
+
+
+def test_stop_releases_lease(fake_redis):
+    a = leader.LeaderElector(fake_redis, owner="a:1")
+    a._tick()
+    a.stop()
+
+    assert fake_redis.get(leader.LEADER_KEY) is None
+    assert not a.is_leader
+
+
+def test_fence_check_fails_closed_on_error():
+    class Broken:
+        def get(self, key):
+            raise ConnectionError("down")
+
+    class BrokenAsync:
+        async def get(self, key):
+            raise ConnectionError("down")
+
+    assert not leader.is_fence_current(Broken(), 1)
+    assert not asyncio.run(leader.is_fence_current_async(BrokenAsync(), 1))
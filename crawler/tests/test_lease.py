@@ -0,0 +1,43 @@
+import lease
+
+KEY = "daangn:listing:shard:0"
+
+
+def test_acquire_free_lease(fake_redis):
+    assert lease.acquire(fake_redis, KEY, "a:1", 90)
+
+    assert fake_redis.get(KEY) == "a:1"
+    assert fake_redis.ttl[KEY] == 90
+
+
+def test_acquire_held_by_other_fails(fake_redis):
+    lease.acquire(fake_redis, KEY, "a:1", 90)
+
+    assert not lease.acquire(fake_redis, KEY, "b:2", 90)
+    assert fake_redis.get(KEY) == "a:1"
+
+
+def test_acquire_again_renews_own_lease(fake_redis):
+    lease.acquire(fake_redis, KEY, "a:1", 30)
+
+    assert lease.acquire(fake_redis, KEY, "a:1", 90)
+    assert fake_redis.ttl[KEY] == 90
+
+
+def test_renew_and_release_only_by_owner(fake_redis):
+    lease.acquire(fake_redis, KEY, "a:1", 90)
+
+    assert not lease.renew(fake_redis, KEY, "b:2", 90)
+    assert not lease.release(fake_redis, KEY, "b:2")
+    assert fake_redis.get(KEY) == "a:1"
+
+    assert lease.release(fake_redis, KEY, "a:1")
+    assert fake_redis.get(KEY) is None
+
+
+def test_expired_lease_is_taken_over(fake_redis):
+    lease.acquire(fake_redis, KEY, "a:1", 90)
+    fake_redis.expire_now(KEY)  # 워커가 죽어 TTL 만료
+
+    assert lease.acquire(fake_redis, KEY, "b:2", 90)
+    assert not lease.renew(fake_redis, KEY, "a:1", 90)
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import listing_scheduler as ls
+import seen_store
+
+
+@pytest.fixture
+def redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(ls, "_redis", fake_redis)
+    return fake_redis
+
+
+def _districts(*ids):
+    return [{"regionId": rid} for rid in ids]
+
+
+def test_load_keeps_only_this_run_and_prunes_removed(redis, fake_aredis):
+    redis.zadd(ls.CARRYOVER_KEY, {1: 100.0, 2: 200.0, 3: 300.0, 99: 50.0})
+
+    # 이번 shard는 1, 2 / 3은 다른 shard / 99는 목록에서 사라진 구/군
+    carried = asyncio.run(ls._load_carryover(fake_aredis, _districts(1, 2), {1, 2, 3}))
+
+    assert carried == {1: 100.0, 2: 200.0}
+    assert redis.zrange(ls.CARRYOVER_KEY, 0, -1) == ["1", "2", "3"]
+
+
+def test_save_drops_finished_and_keeps_first_carry_time(redis):
+    redis.zadd(ls.CARRYOVER_KEY, {1: 100.0, 2: 200.0})
+
+    ls._save_carryover({1: 100.0, 2: 200.0}, finished={1}, unfinished=[2, 5], now=900.0)
+
+    assert redis.zrange(ls.CARRYOVER_KEY, 0, -1, withscores=True) == [("2", 200.0), ("5", 900.0)]
+
+
+def test_window_widens_by_missed_minutes():
+    assert ls._carryover_window(1000.0, 1000.0 - 5 * 60) == ls.INTERVAL_MINUTES + 6
+
+
+def test_window_is_clamped_to_seen_cursor_ttl():
+    assert ls._carryover_window(10**7, 0.0) == ls.INTERVAL_MINUTES + seen_store.TTL // 60
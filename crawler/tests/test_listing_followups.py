@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+import listing_scheduler as ls
+import redis_conn
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """업스트림 요청 없이 구/군마다 매물 1건을 바로 돌려주고, 예산은 Redis 없이 통과"""
+
+    async def _fetch(session, region_id, timeout=None, page=1, keyword=None):
+        return region_id, [{"id": f"{region_id}-1"}], False, True, 0.01
+
+    monkeypatch.setattr(ls, "_fetch_listings_for_district", _fetch)
+    monkeypatch.setattr(redis_conn, "get", lambda: None)
+
+
+def _collect(districts, deadline, on_success):
+    samples = []
+    result = asyncio.run(ls._collect_all_listings(districts, {}, samples, deadline=deadline, on_success=on_success))
+    return result, samples
+
+
+def test_followups_finish_before_return():
+    detected = []
+
+    async def on_success(session, region_id, articles):
+        await asyncio.sleep(0.01)
+        detected.append(region_id)
+
+    (listings, rate_limited), samples = _collect([{"regionId": 1}, {"regionId": 2}], None, on_success)
+
+    assert sorted(listings) == [1, 2]
+    assert sorted(detected) == [1, 2]
+    assert rate_limited == 0
+    assert sorted((rid, ok) for rid, _, ok in samples) == [(1, True), (2, True)]
+
+
+def test_followups_are_cancelled_at_deadline():
+    cancelled = []
+
+    async def on_success(session, region_id, articles):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(region_id)
+            raise
+
+    started = time.monotonic()
+    (listings, _), _ = _collect([{"regionId": 1}], time.monotonic() + 0.2, on_success)
+
+    assert time.monotonic() - started < 5
+    assert listings == {1: [{"id": "1-1"}]}  # 수집은 됐지만 감지가 취소됨 → 호출자가 이월
+    assert cancelled == [1]
@@ -0,0 +1,69 @@
+import asyncio
+
+import redis_codec
+import listing_scheduler as ls
+
+SEEN_KEY = "daangn:listing:seen:7"
+
+
+def _page(*ids):
+    return [{"id": i} for i in ids]
+
+
+def _detect(ar, articles, pages: dict[int, list[dict]]):
+    requested = []
+
+    async def fetch_page(n):
+        requested.append(n)
+        return pages.get(n)
+
+    new, extra = asyncio.run(ls._detect_new_listings(ar, 7, articles, fetch_page))
+    return new, extra, requested
+
+
+def test_quiet_district_reads_one_page(fake_redis, fake_aredis):
+    fake_redis.set(SEEN_KEY, redis_codec.dumps([1, 2]))
+
+    new, extra, requested = _detect(fake_aredis, _page(3, 2, 1), {})
+
+    assert [a["id"] for a in new] == [3]
+    assert extra == 0 and requested == []
+
+
+def test_busy_district_reads_until_seen_id(fake_redis, fake_aredis):
+    fake_redis.set(SEEN_KEY, redis_codec.dumps([1]))
+    articles = _page(6, 5)
+
+    new, extra, requested = _detect(fake_aredis, articles, {2: _page(4, 3), 3: _page(2, 1)})
+
+    assert [a["id"] for a in new] == [6, 5, 4, 3, 2]
+    assert requested == [2, 3]
+    assert extra == 2
+    assert len(articles) == 6  # 추가 페이지 매물도 호출자 집계에 반영
+    assert sorted(redis_codec.loads(fake_redis.get(SEEN_KEY))) == [1, 2, 3, 4, 5, 6]
+
+
+def test_page_depth_is_capped(fake_redis, fake_aredis, monkeypatch):
+    monkeypatch.setattr(ls, "MAX_PAGE_DEPTH", 2)
+    fake_redis.set(SEEN_KEY, redis_codec.dumps([1]))
+
+    _, extra, requested = _detect(fake_aredis, _page(9, 8), {2: _page(7, 6), 3: _page(5, 4)})
+
+    assert requested == [2]
+    assert extra == 1
+
+
+def test_first_scan_does_not_page(fake_aredis):
+    new, extra, requested = _detect(fake_aredis, _page(3, 2), {2: _page(1)})
+
+    assert [a["id"] for a in new] == [3, 2]
+    assert requested == [] and extra == 0
+
+
+def test_failed_page_stops_paging(fake_redis, fake_aredis):
+    fake_redis.set(SEEN_KEY, redis_codec.dumps([1]))
+
+    _, extra, requested = _detect(fake_aredis, _page(5, 4), {})  # 2페이지 요청 실패(None)
+
+    assert requested == [2]
+    assert extra == 1
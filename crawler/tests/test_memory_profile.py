@@ -0,0 +1,83 @@
+import tracemalloc
+
+import pytest
+
+import memory_profile
+import redis_conn
+
+
+@pytest.fixture
+def redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(redis_conn, "get", lambda: fake_redis)
+    return fake_redis
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    monkeypatch.setattr(memory_profile, "ENABLED", True)
+    yield
+    tracemalloc.stop()
+
+
+def _collect(mem, early: bool):
+    if early:
+        return {"error": "구/군 목록 없음"}
+    return {"ok": True, **mem.end()}
+
+
+def test_early_return_still_publishes_run(redis):
+    with memory_profile.run("listing") as mem:
+        _collect(mem, early=True)
+
+    [entry] = memory_profile.recent_runs(redis)
+    assert entry["label"] == "listing"
+    assert "rss_mb" in entry and "peak_rss_mb" in entry
+    assert "snapshot_id" not in entry  # 추적 꺼짐
+
+
+def test_exception_still_publishes_run(redis):
+    with pytest.raises(RuntimeError):
+        with memory_profile.run("region"):
+            raise RuntimeError("boom")
+
+    assert [e["label"] for e in memory_profile.recent_runs(redis)] == ["region"]
+
+
+def test_end_is_idempotent(redis):
+    with memory_profile.run("recent") as mem:
+        summary = _collect(mem, early=False)
+        assert mem.end() == {k: v for k, v in summary.items() if k != "ok"}
+
+    assert len(memory_profile.recent_runs(redis)) == 1
+
+
+def test_tracing_takes_before_and_after_snapshots(redis, tracing):
+    with memory_profile.run("listing") as mem:
+        blob = [bytes(1024) for _ in range(200)]
+        summary = mem.end()
+    del blob
+
+    labels = {s["id"]: s["label"] for s in memory_profile.list_snapshots()}
+    assert labels[summary["snapshot_before_id"]] == "listing:before"
+    assert labels[summary["snapshot_id"]] == "listing"
+    assert summary["traced_peak_mb"] >= summary["traced_mb"] > 0
+
+    rows = memory_profile.diff(summary["snapshot_before_id"], summary["snapshot_id"])
+    assert rows and max(r["size_diff_kb"] for r in rows) >= 100
+
+
+def test_recent_runs_are_newest_first_and_capped(redis, monkeypatch):
+    monkeypatch.setattr(memory_profile, "RUNS_MAX", 3)
+    for label in ["a", "b", "c", "d"]:
+        with memory_profile.run(label):
+            pass
+
+    assert [e["label"] for e in memory_profile.recent_runs(redis)] == ["d", "c", "b"]
+
+
+def test_publish_without_redis_is_skipped(monkeypatch):
+    monkeypatch.setattr(redis_conn, "get", lambda: None)
+
+    with memory_profile.run("targeted") as mem:
+        pass
+    assert "rss_mb" in mem.end()
@@ -0,0 +1,34 @@
+import json
+
+import redis_codec
+
+
+def test_small_value_is_plain_json():
+    value = {"a": [1, 2, 3], "name": "강남구"}
+    encoded = redis_codec.dumps(value)
+
+    assert not encoded.startswith(redis_codec.PREFIX)
+    assert json.loads(encoded) == value
+    assert redis_codec.loads(encoded) == value
+
+
+def test_large_value_round_trips_compressed():
+    value = [{"regionId": i, "name": f"동{i}"} for i in range(500)]
+    encoded = redis_codec.dumps(value)
+
+    assert encoded.startswith(redis_codec.PREFIX)
+    assert len(encoded) < len(json.dumps(value, ensure_ascii=False))
+    assert redis_codec.loads(encoded) == value
+
+
+def test_loads_accepts_bytes_and_none():
+    value = list(range(1000))
+
+    assert redis_codec.loads(redis_codec.dumps(value).encode("utf-8")) == value
+    assert redis_codec.loads(None) is None
+
+
+def test_loads_reads_legacy_plain_json():
+    legacy = json.dumps(list(range(1000)))
+
+    assert redis_codec.loads(legacy) == list(range(1000))
@@ -0,0 +1,66 @@
+import pytest
+
+import redis_codec
+import region_cache
+import server
+
+REGIONS = [{"regionId": 1, "name": "서울특별시", "districts": [{"regionId": 11, "name": "강남구"}] * 40}]
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    """get_snapshot()이 돌려줄 스냅샷 — 테스트가 current["snapshot"]을 바꿔 데이터 갱신을 흉내낸다"""
+    current = {"snapshot": region_cache.Snapshot(version=1, regions=REGIONS, districts=[], digest="aaaa")}
+    monkeypatch.setattr(region_cache, "get_snapshot", lambda: current["snapshot"])
+    return current
+
+
+def test_matching_etag_gets_304(client, snapshot):
+    first = client.get("/api/daangn/regions")
+    etag = first.headers["ETag"]
+
+    assert first.status_code == 200
+    assert first.json["data"] == REGIONS
+    assert "max-age" in first.headers["Cache-Control"]
+
+    again = client.get("/api/daangn/regions", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_etag_of_other_encoding_also_matches(client, snapshot):
+    gzipped = client.get("/api/daangn/regions", headers={"Accept-Encoding": "gzip"})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert client.get("/api/daangn/regions", headers={"If-None-Match": gzipped.headers["ETag"]}).status_code == 304
+
+
+def test_same_version_with_different_data_is_not_304(client, snapshot):
+    etag = client.get("/api/daangn/regions").headers["ETag"]
+
+    # Redis flush 후 재구축 — 버전 카운터는 다시 1이지만 데이터가 다름
+    rebuilt = REGIONS + [{"regionId": 2, "name": "부산광역시", "districts": []}]
+    snapshot["snapshot"] = region_cache.Snapshot(version=1, regions=rebuilt, districts=[], digest="bbbb")
+
+    resp = client.get("/api/daangn/regions", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json["data"] == rebuilt
+
+
+def test_snapshot_digest_follows_stored_content(fake_redis, monkeypatch):
+    monkeypatch.setattr(region_cache, "_redis", fake_redis)
+    fake_redis.set(region_cache.VERSION_KEY, 1)
+    fake_redis.set("daangn:regions:all", redis_codec.dumps(REGIONS))
+    fake_redis.set("daangn:districts:all", redis_codec.dumps([{"regionId": 11}]))
+    fake_redis.set("daangn:dongs:11", redis_codec.dumps([{"regionId": 111}]))
+
+    digest = region_cache._load().digest
+    assert region_cache._load().digest == digest
+
+    fake_redis.set("daangn:dongs:11", redis_codec.dumps([{"regionId": 112}]))
+    assert region_cache._load().digest != digest
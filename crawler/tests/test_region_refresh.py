@@ -0,0 +1,64 @@
+import pytest
+
+import region_scheduler as rs
+
+
+@pytest.fixture
+def redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(rs, "_redis", fake_redis)
+    monkeypatch.setattr(rs, "REVERIFY_DAYS", 100)  # 순환 재검증은 실행마다 1개
+    return fake_redis
+
+
+def _district(rid, name=None):
+    return {"regionId": rid, "name": name or f"구{rid}", "province": "서울특별시"}
+
+
+def _with_dongs(r, *districts):
+    for d in districts:
+        r.set(f"daangn:dongs:{d['regionId']}", "[]")
+    return list(districts)
+
+
+def _ids(districts):
+    return sorted(d["regionId"] for d in districts)
+
+
+def test_full_or_first_run_refetches_everything(redis):
+    districts = [_district(1), _district(2)]
+
+    assert rs._plan_refresh(districts, [], full=False) == (districts, [], None)
+    assert rs._plan_refresh(districts, districts, full=True) == (districts, [], None)
+
+
+def test_unchanged_districts_only_reverify_one(redis):
+    districts = _with_dongs(redis, _district(1), _district(2), _district(3))
+
+    targets, removed, cursor = rs._plan_refresh(districts, districts, full=False)
+
+    assert _ids(targets) == [1]
+    assert removed == []
+    assert cursor == 1
+
+
+def test_changed_new_and_removed_districts(redis):
+    prev = _with_dongs(redis, _district(1), _district(2), _district(3))
+    districts = [_district(1), _district(2, "새이름"), _district(4)]
+    redis.set(rs.REVERIFY_CURSOR_KEY, 2)  # 재검증 구간은 이미 다른 대상과 겹치지 않게
+
+    targets, removed, _ = rs._plan_refresh(districts, prev, full=False)
+
+    assert _ids(targets) == [2, 4]
+    assert _ids(removed) == [3]
+
+
+def test_missing_dongs_and_retry_set_are_refetched(redis):
+    districts = [_district(1), _district(2), _district(3)]
+    _with_dongs(redis, districts[0], districts[1])
+    redis.sadd(rs.RETRY_KEY, 2)
+    redis.set(rs.REVERIFY_CURSOR_KEY, 2)
+
+    targets, _, cursor = rs._plan_refresh(districts, districts, full=False)
+
+    assert _ids(targets) == [2, 3]
+    assert cursor == 0  # 한 바퀴 돌아 처음으로
@@ -0,0 +1,64 @@
+import redis_codec
+import seen_store
+
+
+def _page(*ids):
+    return [{"id": i} for i in ids]
+
+
+def test_first_scan_is_unprimed_and_reads_one_page():
+    scan = seen_store.Scan(None)
+    fresh = scan.add_page(_page(1, 2, 3))
+
+    assert not scan.primed
+    assert fresh == _page(1, 2, 3)
+    assert scan.new == _page(1, 2, 3)
+    assert scan.pages == 1
+    assert not scan.more  # 커서가 없으면 추가 페이지를 읽지 않는다
+
+
+def test_all_new_page_asks_for_next_page():
+    scan = seen_store.Scan(redis_codec.dumps([1, 2]))
+    scan.add_page(_page(5, 4, 3))
+
+    assert scan.primed
+    assert scan.more
+    assert [a["id"] for a in scan.new] == [5, 4, 3]
+
+
+def test_seen_id_stops_paging():
+    scan = seen_store.Scan(redis_codec.dumps([1, 2]))
+    scan.add_page(_page(4, 3, 2, 1))
+
+    assert not scan.more
+    assert [a["id"] for a in scan.new] == [4, 3]
+
+
+def test_page_boundary_duplicates_are_dropped():
+    scan = seen_store.Scan(redis_codec.dumps([1]))
+    scan.add_page(_page(4, 3))
+    fresh = scan.add_page(_page(3, 2, 1))  # 목록이 밀려 3이 다시 나옴
+
+    assert fresh == _page(2, 1)
+    assert [a["id"] for a in scan.new] == [4, 3, 2]
+    assert scan.pages == 2
+    assert not scan.more
+
+
+def test_empty_page_stops_paging():
+    scan = seen_store.Scan(redis_codec.dumps([1]))
+    scan.add_page(_page(3, 2))
+    scan.add_page([])
+
+    assert not scan.more
+
+
+def test_dumps_is_next_cursor():
+    scan = seen_store.Scan(None)
+    scan.add_page(_page(2, 1))
+
+    nxt = seen_store.Scan(scan.dumps())
+    nxt.add_page(_page(3, 2, 1))
+
+    assert nxt.primed
+    assert [a["id"] for a in nxt.new] == [3]
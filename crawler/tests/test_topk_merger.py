@@ -0,0 +1,46 @@
+from scrapers.daangn_scraper import _TopKMerger
+
+
+def _item(item_id, ts):
+    return {"id": item_id, "ts": ts}
+
+
+def test_keeps_newest_k_across_dongs():
+    merger = _TopKMerger(3)
+    merger.offer_all([_item("a", 10), _item("b", 50)])
+    merger.offer_all([_item("c", 30), _item("d", 40), _item("e", 20)])
+
+    assert [i["id"] for i in merger.result()] == ["b", "d", "c"]
+
+
+def test_duplicate_ids_are_merged_once():
+    merger = _TopKMerger(5)
+
+    assert merger.offer_all([_item("a", 10), _item("b", 20)]) == 2
+    assert merger.offer_all([_item("a", 10)]) == 0  # 인접 동에서 같은 매물
+    assert len(merger.result()) == 2
+
+
+def test_evicted_id_can_come_back_newer():
+    merger = _TopKMerger(1)
+    merger.offer(_item("a", 10))
+    merger.offer(_item("b", 20))
+
+    assert merger.offer(_item("a", 30))
+    assert merger.result() == [_item("a", 30)]
+
+
+def test_unsorted_lists_are_fully_merged():
+    merger = _TopKMerger(2)
+    merger.offer_all([_item("a", 50), _item("b", 60)])
+
+    # 가장 오래된 항목이 앞에 있어도 뒤의 최신 항목을 놓치지 않는다
+    assert merger.offer_all([_item("c", 1), _item("d", 2), _item("e", 70)]) == 1
+    assert [i["id"] for i in merger.result()] == ["e", "b"]
+
+
+def test_zero_k_keeps_nothing():
+    merger = _TopKMerger(0)
+
+    assert merger.offer_all([_item("a", 1)]) == 0
+    assert merger.result() == []
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+import upstream_budget as ub
+
+
+@pytest.fixture
+def bucket(fake_redis):
+    """_TAKE_LUA 대응 — 시계는 테스트가 움직일 때만 흐른다 (clock["now"])"""
+    clock = {"now": 1000.0}
+
+    def _take(r, keys, args):
+        rate, burst, want, floor = (float(a) for a in args)
+        state = r.hmget(keys[0], ["tokens", "ts"])
+        tokens = float(state[0]) if state[0] is not None else burst
+        ts = float(state[1]) if state[1] is not None else clock["now"]
+        tokens = min(burst, tokens + max(0.0, clock["now"] - ts) * rate)
+        grant = int(max(0, min(want, tokens - floor)))
+        r.hset(keys[0], mapping={"tokens": tokens - grant, "ts": clock["now"]})
+        return grant
+
+    fake_redis.scripts[ub._TAKE_LUA] = _take
+    return fake_redis, clock
+
+
+def test_background_lane_leaves_reserve_for_interactive(bucket):
+    r, _ = bucket
+    reserve = int(ub.BURST * ub.RESERVE_RATIO)
+
+    assert ub._take(r, ub.DAANGN_HOST, ub.BURST, ub.LANE_BACKGROUND) == ub.BURST - reserve
+    assert ub._take(r, ub.DAANGN_HOST, 1, ub.LANE_BACKGROUND) == 0
+    assert ub._take(r, ub.DAANGN_HOST, ub.BURST, ub.LANE_INTERACTIVE) == reserve
+
+
+def test_bucket_refills_at_rate(bucket):
+    r, clock = bucket
+    ub._take(r, ub.DAANGN_HOST, ub.BURST, ub.LANE_INTERACTIVE)
+    clock["now"] += 1
+
+    assert ub._take(r, ub.DAANGN_HOST, ub.BURST, ub.LANE_INTERACTIVE) == int(ub.RATE_PER_SEC)
+
+
+def test_require_raises_when_interactive_budget_runs_out(bucket):
+    r, _ = bucket
+    ub.require(r, ub.BURST)
+
+    with pytest.raises(ub.BudgetExhausted) as exc:
+        ub.require(r, 5, timeout=0.05)
+    assert exc.value.retry_after >= 1
+
+
+def test_acquire_async_waits_for_partial_grants(bucket):
+    r, clock = bucket
+    ub._take(r, ub.DAANGN_HOST, ub.BURST - 2, ub.LANE_INTERACTIVE)
+
+    async def _refill_later():
+        await asyncio.sleep(0.05)
+        clock["now"] += 1
+
+    async def _run():
+        refill = asyncio.create_task(_refill_later())
+        granted = await ub.acquire_async(r, 5, ub.LANE_INTERACTIVE, timeout=2.0)
+        await refill
+        return granted
+
+    assert asyncio.run(_run())
+
+
+def test_no_redis_or_redis_error_fails_open(fake_redis):
+    assert ub.acquire(None, 10**6)
+
+    def _down(*args):
+        raise ConnectionError("down")
+
+    fake_redis.eval = _down
+    assert ub.acquire(fake_redis, 10**6)
+
+
+# ── multi_location_search: 청크 단위 예산 ──────────────────────────────────────
+
+
+@pytest.fixture
+def multi_search(monkeypatch):
+    from scrapers import daangn_scraper
+
+    searched = []
+
+    async def _search_one(session, keyword, location_id, count):
+        searched.append(location_id)
+        return [{"id": str(location_id), "ts": location_id}]
+
+    monkeypatch.setattr(daangn_scraper, "_async_search_one", _search_one)
+    monkeypatch.setattr(daangn_scraper, "_BUDGET_CHUNK", 2)
+    monkeypatch.setattr(daangn_scraper.redis_conn, "get", lambda: object())
+    monkeypatch.setattr(ub, "acquire", lambda r, n, lane, host=ub.DAANGN_HOST, timeout=None: True)
+    return daangn_scraper, searched
+
+
+def test_multi_search_takes_budget_per_chunk(multi_search, monkeypatch):
+    daangn_scraper, searched = multi_search
+    requested = []
+
+    async def _acquire_async(r, n, lane, host=ub.DAANGN_HOST, timeout=None):
+        requested.append((n, lane))
+        return True
+
+    monkeypatch.setattr(ub, "acquire_async", _acquire_async)
+    result = daangn_scraper.multi_location_search("x", [1, 2, 3, 4, 5], count=10)
+
+    assert requested == [(2, ub.LANE_INTERACTIVE), (1, ub.LANE_INTERACTIVE)]  # 첫 청크는 require
+    assert sorted(searched) == [1, 2, 3, 4, 5]
+    assert result["skipped_locations"] == 0
+    assert [i["id"] for i in result["items"]] == ["5", "4", "3", "2", "1"]
+
+
+def test_multi_search_returns_partial_result_when_budget_runs_out(multi_search, monkeypatch):
+    daangn_scraper, searched = multi_search
+
+    async def _denied(r, n, lane, host=ub.DAANGN_HOST, timeout=None):
+        return False
+
+    monkeypatch.setattr(ub, "acquire_async", _denied)
+    result = daangn_scraper.multi_location_search("x", [1, 2, 3, 4, 5], count=10)
+
+    assert sorted(searched) == [1, 2]
+    assert result["skipped_locations"] == 3
+    assert result["total"] == 2
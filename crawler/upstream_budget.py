@@ -0,0 +1,156 @@
+"""
+업스트림 요청 예산 — 프로세스 간 공유 토큰 버킷 (Redis)
+
+매물 수집 스케줄러와 사용자 검색이 같은 호스트(daangn.com)를 호출하므로,
+호스트별 요청 속도를 Redis 토큰 버킷 하나로 모든 프로세스가 함께 나눠 쓴다.
+
+우선순위 레인:
+  interactive — 사용자 검색. 버킷이 빌 때까지 사용 가능.
+                최대 INTERACTIVE_MAX_WAIT초만 기다리고, 그래도 부족하면 BudgetExhausted (API는 503)
+  background  — 스케줄러 수집. 버킷의 RESERVE_RATIO만큼은 interactive 몫으로 남겨두고
+                그 위의 여유분만 사용하며, 토큰이 모일 때까지 기다린다.
+                timeout 안에 토큰을 못 받으면 그 요청은 건너뛴다 (다음 실행으로 이월).
+
+Redis 장애 시에는 예산 없이 통과시킨다 (fail-open).
+
+Redis 키:
+  upstream:budget:{host} — 토큰 버킷 상태 (Hash: tokens, ts, TTL 60s)
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# ── 상수 ──────────────────────────────────────────────────────────────────────
+
+DAANGN_HOST = "www.daangn.com"
+
+RATE_PER_SEC = float(os.getenv("UPSTREAM_RATE_PER_SEC", "30"))
+BURST = int(os.getenv("UPSTREAM_BURST", "100"))
+RESERVE_RATIO = float(os.getenv("UPSTREAM_RESERVE_RATIO", "0.3"))
+INTERACTIVE_MAX_WAIT = 1.0
+
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+
+_KEY_PREFIX = "upstream:budget:"
+
+# 버킷 보충 후 floor(남겨둘 토큰) 위로 최대 want개 지급. 지급한 토큰 수 반환
+_TAKE_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
+local floor = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local grant = math.max(0, math.min(want, math.floor(tokens - floor)))
+tokens = tokens - grant
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], 60)
+return grant
+"""
+
+
+# ── 예외 ──────────────────────────────────────────────────────────────────────
+
+
+class BudgetExhausted(Exception):
+    """대기 한도 안에 토큰을 받지 못해 업스트림 요청을 보내지 않을 때 발생. retry_after: 재시도 권장 초"""
+
+    def __init__(self, host: str, n: int):
+        super().__init__(f"{host} 업스트림 요청 예산 소진 ({n}건)")
+        self.host = host
+        self.retry_after = max(1, round(_wait_seconds(n)))
+
+
+# ── 토큰 획득 ─────────────────────────────────────────────────────────────────
+
+
+def _take(r, host: str, want: int, lane: str) -> int:
+    """버킷에서 최대 want개 토큰을 가져온다. Redis 오류 시 want 전부 지급 (fail-open)"""
+    floor = BURST * RESERVE_RATIO if lane == LANE_BACKGROUND else 0
+    try:
+        return int(r.eval(_TAKE_LUA, 1, f"{_KEY_PREFIX}{host}", RATE_PER_SEC, BURST, want, floor))
+    except Exception as e:
+        logger.debug("[upstream_budget] 토큰 버킷 조회 실패 (fail-open): %s", e)
+        return want
+
+
+def _wait_seconds(missing: int) -> float:
+    return max(0.05, missing / RATE_PER_SEC)
+
+
+def acquire(
+    r,
+    n: int = 1,
+    lane: str = LANE_INTERACTIVE,
+    host: str = DAANGN_HOST,
+    timeout: float | None = None,
+) -> bool:
+    """
+    n개 요청 분량의 토큰 획득 (동기). 모두 획득하면 True.
+
+    timeout(기본: interactive=INTERACTIVE_MAX_WAIT, background=무제한)이 지나면 False를 반환한다.
+    False면 호출자는 요청을 보내지 않는다 (require 참고). 이미 받은 토큰은 돌려주지 않는다.
+    """
+    if r is None or n <= 0:
+        return True
+    if timeout is None and lane == LANE_INTERACTIVE:
+        timeout = INTERACTIVE_MAX_WAIT
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    granted = 0
+    while True:
+        granted += _take(r, host, n - granted, lane)
+        if granted >= n:
+            return True
+        wait = _wait_seconds(n - granted)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            wait = min(wait, remaining)
+        time.sleep(wait)
+
+
+def require(r, n: int = 1, lane: str = LANE_INTERACTIVE, host: str = DAANGN_HOST, timeout: float | None = None):
+    """acquire()와 같지만 토큰을 받지 못하면 BudgetExhausted"""
+    if not acquire(r, n, lane, host, timeout):
+        raise BudgetExhausted(host, n)
+
+
+async def acquire_async(
+    r,
+    n: int = 1,
+    lane: str = LANE_BACKGROUND,
+    host: str = DAANGN_HOST,
+    timeout: float | None = None,
+) -> bool:
+    """acquire()의 비동기 버전 — 버킷 조회(EVAL)와 대기 모두 이벤트 루프를 막지 않는다"""
+    if r is None or n <= 0:
+        return True
+    if timeout is None and lane == LANE_INTERACTIVE:
+        timeout = INTERACTIVE_MAX_WAIT
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    # 동기 클라이언트의 EVAL은 네트워크 왕복이므로 executor 스레드에서 실행
+    loop = asyncio.get_running_loop()
+    granted = 0
+    while True:
+        granted += await loop.run_in_executor(None, _take, r, host, n - granted, lane)
+        if granted >= n:
+            return True
+        wait = _wait_seconds(n - granted)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            wait = min(wait, remaining)
+        await asyncio.sleep(wait)